@@ -158,7 +158,7 @@ export class ApiDataManager extends DataManager {
 
       const numericColumns = response.columns.filter((c: any) => c.type.includes('int') || c.type.includes('float'));
 
-      const vectorColumns = response.columns.filter((c: any) => c.type.includes('object'));
+      const vectorColumns = response.columns.filter((c: any) => c.type.includes('object') || c.type.startsWith('vector'));
 
       const definitions: ColumnDefinition[] = [];
       for (const col of numericColumns) {
@@ -172,7 +172,7 @@ export class ApiDataManager extends DataManager {
         definitions.push({
           name: col.name,
           type: "vector",
-          dimension: 2 // Assuming 2 is the correct placeholder for vector dimension
+          dimension: parseInt(col.type.replace('vector', '')) || 2 // 2 is the placeholder for untyped vectors
         });
       }
 
@@ -1,14 +1,22 @@
+import hashlib
 import logging
 import subprocess
 from pathlib import Path
-from typing import List, Optional, Dict, Union, Any, Generator
+from typing import Callable, Hashable, Iterator, List, Optional, Dict, Union, Any, Generator, Literal
 
+import pyarrow as pa
+from pyarrow import feather
 from fastapi import APIRouter, Depends, HTTPException, Query, Request
 from fastapi.responses import StreamingResponse, FileResponse, Response
 
 from pydantic import BaseModel
 
-from ...dependencies import get_settings, get_testdata_manager
+from ...models.columnStatistics import ColumnStatistics
+from ...models.derivedChannelInfo import DerivedChannelInfo
+from ...services.arrowStream import IPC_STREAM_MEDIA_TYPE, iter_ipc_stream, to_arrow_table
+from ...services.jsonEncoding import NDJSON_MEDIA_TYPE, encode_json, iter_ndjson, to_columnar
+from ...services.responseCompression import IDENTITY, ResponseCache, choose_encoding, compress, iter_compressed
+from ...dependencies import get_response_cache, get_settings, get_testdata_manager
 from ...services.testDriveDataService import TestDriveDataService
 from ...settings import Settings
 
@@ -30,6 +38,18 @@ class ThumbnailsResponse(BaseModel):
 class ColumnInfo(BaseModel):
     name: str
     type: str
+    statistics: Optional[ColumnStatistics] = None
+    derived: bool = False
+
+
+class DerivedChannelPayload(BaseModel):
+    name: str
+    expression: str
+    description: str = ""
+
+
+class DerivedChannelsResponse(BaseModel):
+    channels: List[DerivedChannelInfo]
 
 
 class ColumnsResponse(BaseModel):
@@ -40,10 +60,116 @@ class JsonResponseModel(BaseModel):
     data: List[Dict[str, Any]]
 
 
+class DownsampledSeries(BaseModel):
+    timestamps: List[float]
+    values: List[float]
+
+
+class DownsampledResponseModel(BaseModel):
+    data: Dict[str, DownsampledSeries]
+
+
+class RowResponseModel(BaseModel):
+    data: Dict[str, Any]
+
+
 class FeatherResponseModel(BaseModel):
     detail: str
 
 
+def _to_records(data) -> List[Dict[str, Any]]:
+    """
+    Convert data to JSON compatible rows, missing values become null.
+    """
+    return data.astype(object).where(data.notna(), None).to_dict(orient="records")
+
+
+# data responses may be stored by the client, but have to be revalidated, the active test drive can change
+DATA_CACHE_CONTROL = "private, no-cache"
+THUMBNAIL_CACHE_CONTROL = "public, max-age=3600"
+
+
+def _make_etag(*parts: Hashable) -> str:
+    """
+    Create a strong entity tag from the version of the content and the parameters it was created with.
+    """
+    return '"' + hashlib.sha1(repr(parts).encode()).hexdigest() + '"'
+
+
+def _is_not_modified(request: Request, etag: Optional[str]) -> bool:
+    """
+    Check if the If-None-Match header of the request matches the entity tag.
+    """
+    if_none_match = request.headers.get("if-none-match")
+    if etag is None or not if_none_match:
+        return False
+    tags = [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
+    return "*" in tags or etag in tags
+
+
+def _cache_headers(etag: Optional[str], cache_control: str = DATA_CACHE_CONTROL) -> Dict[str, str]:
+    if etag is None:
+        # live data changes all the time
+        return {"Cache-Control": "no-store"}
+    return {"ETag": etag, "Cache-Control": cache_control}
+
+
+def _dataset_etag(service: TestDriveDataService, key: Hashable) -> Optional[str]:
+    """
+    Create the entity tag of a response computed from the active data set.
+    :return: The entity tag, or None if there is no versioned data set.
+    """
+    version = service.get_dataset_version()
+    return None if version is None else _make_etag(version, key)
+
+
+def _not_modified(etag: str, cache_control: str = DATA_CACHE_CONTROL) -> Response:
+    return Response(status_code=304, headers=_cache_headers(etag, cache_control))
+
+
+def _encoded_response(request: Request, service: TestDriveDataService, cache: ResponseCache, key: Hashable,
+                      encode: Callable[[], bytes | Iterator[bytes | memoryview]], media_type: str,
+                      headers: Optional[Dict[str, str]] = None) -> Response:
+    """
+    Create a response compressed with the content coding preferred by the client. The compressed body is cached
+    with the version of the active data set, so the same request is answered without encoding it again.
+    Requests with a matching If-None-Match header are answered with 304 Not Modified.
+    :param key: Identifies the response within the data set, e.g. the endpoint and its parameters.
+    :param encode: Creates the uncompressed body. Large bodies can be returned as chunks, they are compressed and
+        sent while they are created and not cached.
+    :param headers: Additional headers of the response.
+    """
+    encoding = choose_encoding(request.headers.get("accept-encoding"))
+    version = service.get_dataset_version()
+    cache_key = None if version is None else (version, key, encoding)
+    # each content coding is a representation of its own with its own entity tag
+    etag = None if version is None else _make_etag(*cache_key)
+    if _is_not_modified(request, etag):
+        return _not_modified(etag)
+
+    headers = {"Vary": "Accept-Encoding", **(headers or {}), **_cache_headers(etag)}
+    entry = cache.get(cache_key) if cache_key is not None else None
+    if entry is None:
+        body = encode()
+        if not isinstance(body, bytes):
+            if encoding != IDENTITY:
+                headers["Content-Encoding"] = encoding
+            return StreamingResponse(iter_compressed(body, encoding), media_type=media_type, headers=headers)
+        entry = compress(body, encoding)
+        if cache_key is not None:
+            cache.put(cache_key, *entry)
+
+    body, content_encoding = entry
+    if content_encoding != IDENTITY:
+        headers["Content-Encoding"] = content_encoding
+    return Response(content=body, media_type=media_type, headers=headers)
+
+
+def _to_channel_info(channel) -> DerivedChannelInfo:
+    return DerivedChannelInfo(name=channel.name, inputs=channel.inputs, description=channel.description,
+                              expression=channel.expression)
+
+
 class PlayerController:
     def __init__(self):
         self.router = APIRouter()
@@ -80,48 +206,229 @@ class PlayerController:
             return FileResponse(file_path)
 
         @self.router.get("/thumbnail/{filename}")
-        def get_thumbnail(filename: str, settings: Settings = Depends(get_settings)) -> FileResponse:
+        def get_thumbnail(filename: str, request: Request, settings: Settings = Depends(get_settings)) -> FileResponse:
             self.logger.info(f"Thumbnail file requested: {filename}")
             file_path = Path(settings.SPRITE_FOLDER) / filename
             self.logger.info(f"Thumbnail requested: {file_path}")
             if not file_path.exists():
                 raise HTTPException(status_code=404, detail="Thumbnail not found")
-            return FileResponse(file_path, media_type="image/png")
+
+            # a regenerated sprite has a new size or modification time
+            stat = file_path.stat()
+            etag = _make_etag(filename, stat.st_size, stat.st_mtime_ns)
+            if _is_not_modified(request, etag):
+                return _not_modified(etag, THUMBNAIL_CACHE_CONTROL)
+            return FileResponse(file_path, media_type="image/png",
+                                headers=_cache_headers(etag, THUMBNAIL_CACHE_CONTROL))
 
         @self.router.get("/columns")
-        async def get_data(service: TestDriveDataService = Depends(get_testdata_manager)) -> ColumnsResponse:
+        async def get_data(
+                request: Request,
+                response: Response,
+                statistics: bool = Query(False, description="Include the statistics of the numeric columns"),
+                service: TestDriveDataService = Depends(get_testdata_manager)) -> ColumnsResponse:
+            etag = _dataset_etag(service, ("columns", statistics))
+            if _is_not_modified(request, etag):
+                return _not_modified(etag)
+            response.headers.update(_cache_headers(etag))
+
+            column_statistics = service.get_column_statistics() if statistics else {}
+            derived = {channel.name for channel in service.get_derived_channels()}
             columns_info = [
-                {"name": col, "type": str(dtype)} for col, dtype in service.get_csv_data_columns()
+                {"name": col, "type": str(dtype), "statistics": column_statistics.get(col), "derived": col in derived}
+                for col, dtype in service.get_csv_data_columns()
             ]
 
             return {"columns": columns_info}
 
+        @self.router.get("/derived", summary="Get derived channels",
+                         description="Retrieve all registered derived channels, also the ones that cannot be "
+                                     "computed for the active test drive.")
+        async def get_derived_channels(
+                service: TestDriveDataService = Depends(get_testdata_manager)) -> DerivedChannelsResponse:
+            return {"channels": [_to_channel_info(channel) for channel in service.derived_channels.get_channels()]}
+
+        @self.router.post("/derived", summary="Add a derived channel",
+                          description="Register a channel computed from an expression over other columns, "
+                                      "e.g. car0_velocity * 3.6. It is offered like a recorded column.")
+        async def add_derived_channel(
+                payload: DerivedChannelPayload,
+                service: TestDriveDataService = Depends(get_testdata_manager)) -> DerivedChannelInfo:
+            try:
+                channel = service.register_derived_channel(payload.name, payload.expression, payload.description)
+            except ValueError as e:
+                raise HTTPException(status_code=400, detail=str(e))
+            return _to_channel_info(channel)
+
+        @self.router.delete("/derived/{name}", summary="Remove a derived channel")
+        async def remove_derived_channel(
+                name: str, service: TestDriveDataService = Depends(get_testdata_manager)) -> DerivedChannelsResponse:
+            if not service.derived_channels.unregister(name):
+                raise HTTPException(status_code=404, detail="Derived channel not found")
+            return {"channels": [_to_channel_info(channel) for channel in service.derived_channels.get_channels()]}
+
         @self.router.get("/data/json", summary="Get data as JSON",
                          description="Retrieve the selected data as a JSON response.")
         async def get_data_as_json(
+                request: Request,
                 columns: str = Query(None, description="Comma-separated list of columns to include"),
-                service: TestDriveDataService = Depends(get_testdata_manager)) -> JsonResponseModel:
+                start: Optional[float] = Query(None, description="Start of the time range in simulation seconds"),
+                end: Optional[float] = Query(None, description="End of the time range in simulation seconds"),
+                layout: Literal["records", "columnar"] = Query(
+                    "records", description="records returns one object per row, "
+                                           "columnar one array per column: {\"data\": {\"timestamp\": [...]}}"),
+                service: TestDriveDataService = Depends(get_testdata_manager),
+                cache: ResponseCache = Depends(get_response_cache)) -> JsonResponseModel:
             # Parse the columns
             column_list = columns.split(",") if columns else []
-            data = service.get_csv_data(column_list)
-            return {"data": data.to_dict(orient="records")}
+
+            def encode() -> bytes:
+                if layout == "columnar":
+                    data = service.get_csv_data(column_list, start, end, combine_vectors=False)
+                    # encoded straight from the arrays
+                    return encode_json({"data": to_columnar(data, column_list)})
+                return encode_json({"data": _to_records(service.get_csv_data(column_list, start, end))})
+
+            # the encoded body is returned without validating a response model
+            return _encoded_response(request, service, cache, ("json", layout, columns, start, end), encode,
+                                     "application/json")
+
+        @self.router.get("/data/ndjson", summary="Stream data as NDJSON",
+                         description="Stream the selected data as newline delimited JSON while it is read, "
+                                     "for exports of whole test drives. The records layout sends one object per "
+                                     "row, the columnar layout one object of column arrays per chunk of rows.",
+                         response_class=StreamingResponse)
+        async def get_data_as_ndjson(
+                request: Request,
+                columns: str = Query(None, description="Comma-separated list of columns to include"),
+                start: Optional[float] = Query(None, description="Start of the time range in simulation seconds"),
+                end: Optional[float] = Query(None, description="End of the time range in simulation seconds"),
+                layout: Literal["records", "columnar"] = Query("records", description="Layout of the lines"),
+                chunk_rows: int = Query(10_000, ge=1, le=1_000_000, description="Rows read and encoded at once"),
+                service: TestDriveDataService = Depends(get_testdata_manager)):
+            column_list = columns.split(",") if columns else []
+            etag = _dataset_etag(service, ("ndjson", columns, start, end, layout, chunk_rows))
+            if _is_not_modified(request, etag):
+                return _not_modified(etag)
+
+            chunks = service.iter_csv_data(column_list, start, end, chunk_rows,
+                                           combine_vectors=layout == "records")
+            # the chunks are read and encoded one at a time while they are sent
+            return StreamingResponse(iter_ndjson(chunks, column_list, layout), media_type=NDJSON_MEDIA_TYPE,
+                                     headers=_cache_headers(etag))
+
+        @self.router.get("/data/downsampled", summary="Get downsampled data",
+                         description="Retrieve the selected numeric columns downsampled for display. "
+                                     "Composite vector columns are returned as their components.")
+        async def get_data_downsampled(
+                request: Request,
+                columns: str = Query(None, description="Comma-separated list of columns to include"),
+                start: Optional[float] = Query(None, description="Start of the time range in simulation seconds"),
+                end: Optional[float] = Query(None, description="End of the time range in simulation seconds"),
+                max_points: int = Query(2000, ge=3, le=100_000, description="Maximum number of points per column"),
+                method: Literal["minmax", "lttb"] = Query("minmax", description="Downsampling method"),
+                service: TestDriveDataService = Depends(get_testdata_manager),
+                cache: ResponseCache = Depends(get_response_cache)) -> DownsampledResponseModel:
+            column_list = columns.split(",") if columns else []
+
+            def encode() -> bytes:
+                data = service.get_downsampled_data(column_list, max_points, start, end, method)
+                return encode_json({"data": {
+                    column: {"timestamps": timestamps, "values": values}
+                    for column, (timestamps, values) in data.items()
+                }})
+
+            key = ("downsampled", columns, start, end, max_points, method)
+            return _encoded_response(request, service, cache, key, encode, "application/json")
+
+        @self.router.get("/data/at", summary="Get data at a simulation time",
+                         description="Retrieve the selected columns at one simulation time, "
+                                     "either from the nearest row or interpolated.")
+        async def get_data_at(
+                request: Request,
+                response: Response,
+                timestamp: float = Query(..., description="Simulation time in seconds"),
+                columns: str = Query(None, description="Comma-separated list of columns to include"),
+                method: Literal["nearest", "linear"] = Query("nearest", description="Sampling method"),
+                service: TestDriveDataService = Depends(get_testdata_manager)) -> RowResponseModel:
+            etag = _dataset_etag(service, ("at", timestamp, columns, method))
+            if _is_not_modified(request, etag):
+                return _not_modified(etag)
+            response.headers.update(_cache_headers(etag))
+
+            column_list = columns.split(",") if columns else []
+            rows = _to_records(service.get_data_at(column_list, [timestamp], method))
+            return {"data": rows[0] if rows else {}}
+
+        @self.router.get("/data/at/batch", summary="Get data at several simulation times",
+                         description="Retrieve the selected columns at many simulation times at once, "
+                                     "one row per timestamp.")
+        async def get_data_at_batch(
+                request: Request,
+                response: Response,
+                timestamps: str = Query(..., description="Comma-separated list of simulation times in seconds"),
+                columns: str = Query(None, description="Comma-separated list of columns to include"),
+                method: Literal["nearest", "linear"] = Query("nearest", description="Sampling method"),
+                service: TestDriveDataService = Depends(get_testdata_manager)) -> JsonResponseModel:
+            try:
+                timestamp_list = [float(timestamp) for timestamp in timestamps.split(",") if timestamp]
+            except ValueError:
+                raise HTTPException(status_code=400, detail="Timestamps must be comma-separated numbers")
+            etag = _dataset_etag(service, ("at", tuple(timestamp_list), columns, method))
+            if _is_not_modified(request, etag):
+                return _not_modified(etag)
+            response.headers.update(_cache_headers(etag))
+
+            column_list = columns.split(",") if columns else []
+            return {"data": _to_records(service.get_data_at(column_list, timestamp_list, method))}
+
+        @self.router.get("/data/arrow", summary="Get data as Arrow stream",
+                         description="Stream the selected data in the Arrow IPC stream format. "
+                                     "Composite vector columns are fixed size lists.",
+                         response_class=StreamingResponse)
+        async def get_data_as_arrow(
+                request: Request,
+                columns: str = Query(None, description="Comma-separated list of columns to include"),
+                start: Optional[float] = Query(None, description="Start of the time range in simulation seconds"),
+                end: Optional[float] = Query(None, description="End of the time range in simulation seconds"),
+                batch_rows: int = Query(65_536, ge=1, description="Maximum number of rows per record batch"),
+                service: TestDriveDataService = Depends(get_testdata_manager),
+                cache: ResponseCache = Depends(get_response_cache),
+                settings: Settings = Depends(get_settings)):
+            column_list = columns.split(",") if columns else []
+
+            def encode() -> bytes | Iterator[memoryview]:
+                table = to_arrow_table(service.get_csv_data(column_list, start, end, combine_vectors=False),
+                                       column_list)
+                messages = iter_ipc_stream(table, batch_rows)
+                if table.nbytes > settings.ARROW_STREAM_MIN_BYTES:
+                    # the record batches are serialized and compressed one at a time while they are sent
+                    return messages
+                return b"".join(messages)
+
+            return _encoded_response(request, service, cache, ("arrow", columns, start, end, batch_rows), encode,
+                                     IPC_STREAM_MEDIA_TYPE)
 
         @self.router.get("/data/feather", summary="Get data as Feather",
                          description="Retrieve the selected data as a Feather file download.")
         async def get_data_as_feather(
+                request: Request,
                 columns: str = Query(None, description="Comma-separated list of columns to include"),
-                service: TestDriveDataService = Depends(get_testdata_manager)) -> FeatherResponseModel:
+                start: Optional[float] = Query(None, description="Start of the time range in simulation seconds"),
+                end: Optional[float] = Query(None, description="End of the time range in simulation seconds"),
+                service: TestDriveDataService = Depends(get_testdata_manager),
+                cache: ResponseCache = Depends(get_response_cache)) -> FeatherResponseModel:
             # Parse the columns
             column_list = columns.split(",") if columns else []
-            data = service.get_csv_data(column_list)
-
-            # Save to a Feather file
-            feather_file = "data.feather"
-            data.reset_index().to_feather(feather_file)  # Feather requires no index issues
-
-            # Return the Feather file as a response
-            return FileResponse(
-                feather_file,
-                media_type="application/octet-stream",
-                filename="data.feather"
-            )
+
+            def encode() -> bytes:
+                data = service.get_csv_data(column_list, start, end, combine_vectors=False)
+                # Write the Feather file to memory, so concurrent requests do not share a file
+                sink = pa.BufferOutputStream()
+                feather.write_feather(to_arrow_table(data, column_list), sink)
+                return sink.getvalue().to_pybytes()
+
+            # the buffers of the file are LZ4 compressed already, a content coding still saves a good share
+            return _encoded_response(request, service, cache, ("feather", columns, start, end), encode,
+                                     "application/octet-stream",
+                                     {"Content-Disposition": 'attachment; filename="data.feather"'})
@@ -1,18 +1,29 @@
+import asyncio
 import logging
 import os
 import shutil
 from pathlib import Path
-from typing import List, Optional
+from typing import Dict, List, Optional
 
-from fastapi import APIRouter, Depends, BackgroundTasks, HTTPException, UploadFile, File
+from fastapi import APIRouter, Depends, BackgroundTasks, HTTPException, UploadFile, File, Query
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel, Field
 
-from app.dependencies import get_testdata_manager, get_settings
+from app.dependencies import get_testdata_manager, get_settings, get_connection_manager_activation, \
+    get_response_cache, get_connection_manager_data, get_connection_manager_simulation_time
+from app.models.activationStatus import ActivationStatus
+from app.models.broadcastStatistics import BroadcastStatistics
+from app.models.cacheStatistics import CacheStatistics
+from app.models.liveSessionInfo import LiveSessionInfo
+from app.models.stepStatistics import StepStatistics
 from app.models.testDriveDataInfo import TestDriveDataInfo
 from app.models.testDriveMetaData import TestDriveMetaData
 from app.models.testDriveProjectInfo import TestDriveProjectInfo
 from app.models.testDriveTagInfo import TestDriveTagInfo
 from app.models.testDriveVideoInfo import TestDriveVideoInfo
+from app.models.writerStatistics import WriterStatistics
+from app.services.arrowStream import IPC_STREAM_MEDIA_TYPE, iter_ipc_stream
+from app.services.responseCompression import ResponseCache
 from app.services.testDriveDataService import TestDriveDataService
 from app.settings import Settings
 
@@ -52,6 +63,10 @@ class OptionalTestDriveResponse(BaseModel):
     testdrive: Optional[TestDriveProjectInfo]
 
 
+class ActivationStatusResponse(BaseModel):
+    status: Optional[ActivationStatus]
+
+
 class UploadResponse(BaseModel):
     filename: str = Field("", title="Filename", description="The name of the file")
 
@@ -166,9 +181,70 @@ class ProjectController:
             if activated_testdrive.is_live:
                 service.create_new_live_data(activated_testdrive, settings)
 
-            background_tasks.add_task(service.load_csv_data, activated_testdrive)
+            loop = asyncio.get_running_loop()
+            connection_manager = get_connection_manager_activation()
+
+            def publish_progress(status: ActivationStatus):
+                asyncio.run_coroutine_threadsafe(
+                    connection_manager.broadcast_json(status.model_dump(mode="json")),
+                    loop
+                )
+
+            background_tasks.add_task(service.load_csv_data, activated_testdrive, publish_progress)
             return {"testdrive": activated_testdrive}
 
+        @self.router.get("/activation", response_model=ActivationStatusResponse)
+        async def get_activation_status(service: TestDriveDataService = Depends(get_testdata_manager)):
+            return {"status": service.get_activation_status()}
+
+        @self.router.post("/activation/cancel", response_model=ActivationStatusResponse)
+        async def cancel_activation(service: TestDriveDataService = Depends(get_testdata_manager)):
+            if not service.cancel_activation():
+                raise HTTPException(status_code=404, detail="No running activation found")
+            return {"status": service.get_activation_status()}
+
+        @self.router.get("/cache", response_model=Dict[str, CacheStatistics])
+        async def get_cache_statistics(service: TestDriveDataService = Depends(get_testdata_manager),
+                                       response_cache: ResponseCache = Depends(get_response_cache)):
+            return {**service.get_cache_statistics(), "responses": response_cache.get_statistics()}
+
+        @self.router.get("/live/recording", response_model=Dict[str, WriterStatistics])
+        async def get_live_recording_statistics(service: TestDriveDataService = Depends(get_testdata_manager)):
+            return service.get_live_recording_statistics()
+
+        @self.router.get("/live/source", response_model=StepStatistics)
+        async def get_live_source_statistics(service: TestDriveDataService = Depends(get_testdata_manager)):
+            statistics = service.get_live_source_statistics()
+            if statistics is None:
+                raise HTTPException(status_code=404, detail="No live session was started")
+            return statistics
+
+        @self.router.get("/live/sessions", response_model=List[LiveSessionInfo])
+        async def get_live_sessions(service: TestDriveDataService = Depends(get_testdata_manager)):
+            return service.get_live_sessions()
+
+        @self.router.get("/live/sessions/{name}/arrow", response_class=StreamingResponse,
+                         summary="Get the recording of a live session as Arrow stream",
+                         description="Stream the Parquet recording of a live session in the Arrow IPC stream format. "
+                                     "Vector fields are split into their component columns.")
+        async def get_live_session_data(
+                name: str,
+                columns: str = Query(None, description="Comma-separated list of columns to include"),
+                service: TestDriveDataService = Depends(get_testdata_manager)):
+            try:
+                table = service.read_live_session(name, columns.split(",") if columns else None)
+            except (KeyError, ValueError) as e:
+                # e.g. an unknown column
+                raise HTTPException(status_code=400, detail=str(e))
+            if table is None:
+                raise HTTPException(status_code=404, detail="Live session not found")
+            return StreamingResponse(iter_ipc_stream(table, 65_536), media_type=IPC_STREAM_MEDIA_TYPE)
+
+        @self.router.get("/live/broadcast", response_model=Dict[str, BroadcastStatistics])
+        async def get_live_broadcast_statistics():
+            managers = [get_connection_manager_data(), get_connection_manager_simulation_time()]
+            return {manager.name: manager.broadcaster.get_statistics() for manager in managers}
+
         @self.router.post("/deactivate", response_model=TestDriveResponse)
         async def deactivate_testdrive(service: TestDriveDataService = Depends(get_testdata_manager)):
             deactivated_testdrive = service.deactivate_testdrive()
@@ -1,9 +1,13 @@
 import logging
-from fastapi import APIRouter, WebSocket, WebSocketDisconnect, Depends
+from fastapi import APIRouter, WebSocket, WebSocketDisconnect, Depends, Query, status
 import asyncio
 
+from pydantic import ValidationError
+
 from app.dependencies import get_connection_manager_data, get_connection_manager_simulation_time, \
-    get_connection_manager_tag
+    get_connection_manager_tag, get_connection_manager_activation
+from app.models.liveSubscription import LiveSubscription
+from app.services.liveFrameEncoding import LiveFrameEncoding
 from app.services.websocketConnectionManager import WebsocketConnectionManager
 
 
@@ -17,14 +21,38 @@ class WebSockets:
 
         @self.router.websocket("/data")
         async def data_ws(websocket: WebSocket,
+                          encoding: LiveFrameEncoding = Query(
+                              "json", description="json sends each sample as JSON text, binary sends the frame "
+                                                  "schema as JSON once and then each sample as binary frame"),
                           connection_manager: WebsocketConnectionManager = Depends(get_connection_manager_data)):
 
-            await connection_manager.connect(websocket)
+            await connection_manager.connect(websocket, encoding)
             try:
+                await websocket.send_text("ping")
                 while True:
-                    await websocket.send_text("ping")
-                    await asyncio.sleep(20)
+                    # clients may send a subscription at any time, e.g.
+                    # {"type": "subscribe", "channels": ["car0_velocity"], "max_rate_hz": 1}
+                    try:
+                        message = await asyncio.wait_for(websocket.receive(), timeout=20)
+                    except asyncio.TimeoutError:
+                        await websocket.send_text("ping")
+                        continue
+                    if message["type"] == "websocket.disconnect":
+                        return
+                    if message.get("text") is None:
+                        self.logger.warning(f"WebSocket data received a binary message, closing: {websocket}")
+                        await websocket.close(code=status.WS_1008_POLICY_VIOLATION,
+                                              reason="Subscriptions are sent as JSON text")
+                        return
+                    try:
+                        subscription = LiveSubscription.model_validate_json(message["text"])
+                    except ValidationError as e:
+                        await websocket.send_json({"type": "error", "detail": str(e)})
+                        continue
+                    await connection_manager.subscribe(websocket, subscription)
             except WebSocketDisconnect:
+                pass
+            finally:
                 connection_manager.disconnect(websocket)
 
         @self.router.websocket("/simulationTime")
@@ -60,3 +88,15 @@ class WebSockets:
                         }, sender=websocket)
             except WebSocketDisconnect:
                 connection_manager.disconnect(websocket)
+
+        @self.router.websocket("/activation")
+        async def activation_ws(websocket: WebSocket, connection_manager: WebsocketConnectionManager = Depends(
+            get_connection_manager_activation)):
+
+            await connection_manager.connect(websocket)
+            try:
+                while True:
+                    await websocket.send_text("ping")
+                    await asyncio.sleep(20)
+            except WebSocketDisconnect:
+                connection_manager.disconnect(websocket)
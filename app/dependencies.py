@@ -1,4 +1,6 @@
 # app/dependencies.py
+from .services.liveFrameEncoding import LiveFrameSchema
+from .services.responseCompression import ResponseCache
 from .services.testDriveDataService import TestDriveDataService
 from .services.testDriveTagService import TestDriveTagService
 from .services.websocketConnectionManager import WebsocketConnectionManager
@@ -6,12 +8,17 @@ from .settings import Settings
 
 settings = Settings()
 
-connection_manager_data_instance = WebsocketConnectionManager('data')
-connection_manager_simulation_time_instance = WebsocketConnectionManager('simulation time')
+connection_manager_data_instance = WebsocketConnectionManager(
+    'data', LiveFrameSchema.from_field_map(), broadcast_rate_hz=settings.LIVE_DATA_BROADCAST_RATE_HZ,
+    keyframe_interval=settings.LIVE_KEYFRAME_INTERVAL)
+connection_manager_simulation_time_instance = WebsocketConnectionManager(
+    'simulation time', broadcast_rate_hz=settings.SIMULATION_TIME_BROADCAST_RATE_HZ)
 connection_manager_tag_instance = WebsocketConnectionManager('tag')
+connection_manager_activation_instance = WebsocketConnectionManager('activation')
 
 testdata_manager = TestDriveDataService(settings)
 tagdata_manager = TestDriveTagService(settings)
+response_cache = ResponseCache(settings.RESPONSE_CACHE_MAX_BYTES)
 
 
 def get_connection_manager_data() -> WebsocketConnectionManager:
@@ -26,6 +33,10 @@ def get_connection_manager_tag() -> WebsocketConnectionManager:
     return connection_manager_tag_instance
 
 
+def get_connection_manager_activation() -> WebsocketConnectionManager:
+    return connection_manager_activation_instance
+
+
 def get_testdata_manager() -> TestDriveDataService:
     return testdata_manager
 
@@ -36,3 +47,7 @@ def get_settings() -> Settings:
 
 def get_tagdata_manager() -> TestDriveTagService:
     return tagdata_manager
+
+
+def get_response_cache() -> ResponseCache:
+    return response_cache
@@ -0,0 +1,22 @@
+from enum import Enum
+
+from pydantic import BaseModel, Field
+
+
+class ActivationState(str, Enum):
+    PENDING = "pending"
+    LOADING = "loading"
+    COMPLETED = "completed"
+    CANCELLED = "cancelled"
+    FAILED = "failed"
+
+
+class ActivationStatus(BaseModel):
+    project_id: int = Field(-1, title="Project ID", description="The id of the test drive that is activated")
+    state: ActivationState = Field(ActivationState.PENDING, title="State", description="The state of the activation")
+    bytes_read: int = Field(0, title="Bytes read", description="The number of bytes of the recording read so far")
+    bytes_total: int = Field(0, title="Bytes total", description="The size of the recording in bytes")
+    rows_read: int = Field(0, title="Rows read", description="The number of rows of the recording read so far")
+    elapsed_s: float = Field(0.0, title="Elapsed time", description="The time spent loading in seconds")
+    eta_s: float = Field(0.0, title="ETA", description="The estimated remaining loading time in seconds")
+    message: str = Field("", title="Message", description="Details about the activation, e.g. the error")
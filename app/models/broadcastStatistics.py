@@ -0,0 +1,12 @@
+from pydantic import BaseModel, Field
+
+
+class BroadcastStatistics(BaseModel):
+    rate_hz: float = Field(0.0, title="Rate", description="The maximum number of broadcasts per second")
+    samples_received: int = Field(0, title="Samples received",
+                                  description="The number of samples handed to the broadcaster")
+    samples_emitted: int = Field(0, title="Samples emitted", description="The number of broadcasts sent")
+    pending_fields: int = Field(0, title="Pending fields",
+                                description="The number of fields waiting for the next broadcast")
+    last_send_ms: float = Field(0.0, title="Last send", description="Time to send the last broadcast in ms")
+    max_send_ms: float = Field(0.0, title="Maximum send", description="Longest time to send a broadcast in ms")
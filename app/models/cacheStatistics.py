@@ -0,0 +1,10 @@
+from pydantic import BaseModel, Field
+
+
+class CacheStatistics(BaseModel):
+    entries: int = Field(0, title="Entries", description="The number of cached entries")
+    current_bytes: int = Field(0, title="Current bytes", description="The memory used by the cached entries")
+    max_bytes: int = Field(0, title="Maximum bytes", description="The memory limit of the cache")
+    hits: int = Field(0, title="Hits", description="The number of lookups that found a cached entry")
+    misses: int = Field(0, title="Misses", description="The number of lookups that found no cached entry")
+    evictions: int = Field(0, title="Evictions", description="The number of entries evicted to stay within the limit")
@@ -0,0 +1,19 @@
+from typing import Dict, Optional
+
+from pydantic import BaseModel, Field
+
+
+class ColumnStatistics(BaseModel):
+    name: str = Field("", title="Column name", description="The name of the column")
+    count: int = Field(0, title="Count", description="The number of rows with a value")
+    null_count: int = Field(0, title="Null count", description="The number of rows without a value")
+    min: Optional[float] = Field(None, title="Minimum", description="The minimum value")
+    max: Optional[float] = Field(None, title="Maximum", description="The maximum value")
+    mean: Optional[float] = Field(None, title="Mean", description="The mean value")
+    std: Optional[float] = Field(None, title="Standard deviation", description="The standard deviation of the values")
+    percentiles: Dict[str, float] = Field(default_factory=dict, title="Percentiles",
+                                          description="Percentiles of the values, keyed like p50")
+    sample_rate_hz: Optional[float] = Field(None, title="Sample rate",
+                                            description="The estimated rate of the rows with a value in Hertz")
+    change_rate_hz: Optional[float] = Field(None, title="Change rate",
+                                            description="The average rate at which the value changes in Hertz")
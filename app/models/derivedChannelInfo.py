@@ -0,0 +1,13 @@
+from typing import List, Optional
+
+from pydantic import BaseModel, Field
+
+
+class DerivedChannelInfo(BaseModel):
+    name: str = Field("", title="Name", description="The name of the derived channel")
+    inputs: List[str] = Field(default_factory=list, title="Inputs",
+                              description="The columns the channel is computed from")
+    description: str = Field("", title="Description", description="What the channel shows")
+    expression: Optional[str] = Field(None, title="Expression",
+                                      description="The expression of the channel, None if it is computed by a "
+                                                  "registered function")
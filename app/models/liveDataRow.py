@@ -139,8 +139,11 @@ FIELD_NAME_MAP = [
     ("world_camera_quat", None),
 ]
 
+# columns of live recordings: the fields that are read from the simulator and the simulation time
+LIVE_CSV_FIELDNAMES = [name for name, getter in FIELD_NAME_MAP if getter is not None] + ["timestamp"]
 
-def create_random_instance(field_map, generator_map):
+
+def create_random_instance(field_map=FIELD_NAME_MAP, generator_map=None):
     random_instance = {}
 
     for name, generator in field_map:
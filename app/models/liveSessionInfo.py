@@ -0,0 +1,13 @@
+from datetime import datetime
+from typing import List, Optional
+
+from pydantic import BaseModel, Field
+
+
+class LiveSessionInfo(BaseModel):
+    name: str = Field("", title="Name", description="The name of the session and of its recording directory")
+    start_time: Optional[datetime] = Field(None, title="Start time", description="When the session was started")
+    csv_file_full_path: str = Field("", title="CSV full path", description="The full path of the CSV recording")
+    parquet_files: List[str] = Field(default_factory=list, title="Parquet files",
+                                     description="The completed Parquet files of the session, relative to its "
+                                                 "recording directory")
@@ -0,0 +1,17 @@
+from typing import List, Literal, Optional
+
+from pydantic import BaseModel, Field
+
+
+class LiveSubscription(BaseModel):
+    type: Literal["subscribe"] = Field("subscribe", title="Type", description="The type of the message")
+    channels: Optional[List[str]] = Field(None, title="Channels",
+                                          description="The fields sent to the client, the timestamp is always sent. "
+                                                      "None subscribes to all fields")
+    max_rate_hz: Optional[float] = Field(None, gt=0, title="Maximum rate",
+                                         description="The maximum number of samples per second sent to the client. "
+                                                     "None sends every broadcast sample")
+    delta: bool = Field(False, title="Delta",
+                        description="Send only the fields that changed since the last frame. Keyframes with all fields "
+                                    "are sent after subscribing and periodically, JSON keyframes are marked with "
+                                    "\"keyframe\": true")
@@ -0,0 +1,19 @@
+from pydantic import BaseModel, Field
+
+
+class StepStatistics(BaseModel):
+    steps: int = Field(0, title="Steps", description="The number of samples read from the simulator")
+    interval_ms: float = Field(0.0, title="Interval", description="The time between two steps in ms")
+    last_read_ms: float = Field(0.0, title="Last read", description="Time to read the last sample in ms")
+    mean_read_ms: float = Field(0.0, title="Mean read", description="Mean time to read a sample in ms")
+    max_read_ms: float = Field(0.0, title="Maximum read", description="Longest time to read a sample in ms")
+    last_callback_ms: float = Field(0.0, title="Last callback",
+                                    description="Time to buffer, record and broadcast the last sample in ms")
+    mean_callback_ms: float = Field(0.0, title="Mean callback",
+                                    description="Mean time to buffer, record and broadcast a sample in ms")
+    max_callback_ms: float = Field(0.0, title="Maximum callback",
+                                   description="Longest time to buffer, record and broadcast a sample in ms")
+    busy_percent: float = Field(0.0, title="Busy",
+                                description="Mean share of the interval spent reading and handling a sample in %")
+    overruns: int = Field(0, title="Overruns",
+                          description="The number of steps that took longer than the interval")
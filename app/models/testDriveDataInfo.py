@@ -1,9 +1,13 @@
+from typing import List
+
 from pydantic import BaseModel, Field
 
 
 class TestDriveDataInfo(BaseModel):
     csv_file_name: str = Field("", title="CSV path", description="The name of the CSV file")
     csv_file_full_path: str = Field("", title="CSV full path", description="The full path of the CSV file")
+    parquet_files: List[str] = Field(default_factory=list, title="Parquet files",
+                                     description="The full paths of the completed Parquet files of a live recording")
     driven_distance_m: float = Field(0.0, title="Driven distance",
                                      description="The distance driven in meters")
     driven_time_s: float = Field(0.0, title="Driven time",
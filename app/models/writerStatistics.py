@@ -0,0 +1,15 @@
+from pydantic import BaseModel, Field
+
+
+class WriterStatistics(BaseModel):
+    rows_written: int = Field(0, title="Rows written", description="The number of samples written to the file")
+    rows_dropped: int = Field(0, title="Rows dropped",
+                              description="The number of samples dropped because the queue was full")
+    queue_depth: int = Field(0, title="Queue depth", description="The number of samples waiting to be written")
+    max_queue_depth: int = Field(0, title="Maximum queue depth",
+                                 description="The highest number of samples that were waiting at once")
+    queue_capacity: int = Field(0, title="Queue capacity", description="The number of samples the queue can hold")
+    flushes: int = Field(0, title="Flushes", description="The number of batches written and flushed")
+    last_flush_ms: float = Field(0.0, title="Last flush", description="Time to write and flush the last batch in ms")
+    max_flush_ms: float = Field(0.0, title="Maximum flush", description="Longest time to write and flush a batch in ms")
+    mean_flush_ms: float = Field(0.0, title="Mean flush", description="Mean time to write and flush a batch in ms")
@@ -0,0 +1,131 @@
+import logging
+import threading
+import time
+from pathlib import Path
+from typing import Callable, Optional
+
+import pandas as pd
+
+from app.models.activationStatus import ActivationState, ActivationStatus
+from app.models.testDriveProjectInfo import TestDriveProjectInfo
+from app.services.columnCache import ColumnCache
+from app.services.csvReaders import CsvReader
+from app.services.derivedChannels import DerivedChannelRegistry
+from app.services.columnStatistics import compute_column_statistics, read_statistics, write_statistics
+from app.services.recordingCache import is_cache_valid, read_recording_csv_chunks, write_cache
+from app.services.recordingDataSet import RecordingDataSet
+
+logger = logging.getLogger('uvicorn.error')
+
+
+class ActivationJob:
+    """
+    Loads the recording of a test drive for activation. Recordings without a valid sidecar cache are parsed in
+    chunks, so the progress can be reported and the job can be cancelled between two chunks.
+    A data set that is still cached from an earlier activation is used as it is.
+    """
+
+    CHUNK_ROWS = 50_000
+
+    def __init__(self, project_info: TestDriveProjectInfo, column_cache: ColumnCache, use_cache: bool = True,
+                 on_progress: Optional[Callable[[ActivationStatus], None]] = None,
+                 cached_dataset: Optional[RecordingDataSet] = None, reader: Optional[CsvReader] = None,
+                 derived_channels: Optional[DerivedChannelRegistry] = None):
+        self.project_info = project_info
+        self.column_cache = column_cache
+        self.use_cache = use_cache
+        self.on_progress = on_progress
+        self.cached_dataset = cached_dataset
+        self.reader = reader
+        self.derived_channels = derived_channels
+
+        self.csv_path = Path(project_info.test_drive_data_info.csv_file_full_path)
+        self.status = ActivationStatus(project_id=project_info.id)
+        self._cancel_event = threading.Event()
+        self._start_time = time.time()
+
+    @property
+    def is_cancelled(self) -> bool:
+        return self._cancel_event.is_set()
+
+    @property
+    def is_finished(self) -> bool:
+        return self.status.state in (ActivationState.COMPLETED, ActivationState.CANCELLED, ActivationState.FAILED)
+
+    def cancel(self):
+        self._cancel_event.set()
+
+    def run(self) -> RecordingDataSet | None:
+        """
+        Load the recording.
+        :return: The loaded data set, or None if the job was cancelled or failed.
+        """
+        self._start_time = time.time()
+        try:
+            self.status.bytes_total = self.csv_path.stat().st_size
+            self._update(ActivationState.LOADING)
+
+            if self.cached_dataset is not None:
+                dataset = self.cached_dataset
+            elif self.use_cache and is_cache_valid(self.csv_path):
+                dataset = RecordingDataSet(self.csv_path, self.column_cache, self.use_cache, self.reader,
+                                           self.derived_channels)
+            else:
+                dataset = self._load_chunked()
+
+            if dataset is None or self.is_cancelled:
+                self._update(ActivationState.CANCELLED)
+                return None
+
+            self.status.bytes_read = self.status.bytes_total
+            self._update(ActivationState.COMPLETED)
+            return dataset
+        except Exception as e:
+            logger.exception(f"Failed to load {self.csv_path}")
+            self._update(ActivationState.FAILED, str(e))
+            return None
+
+    def _load_chunked(self) -> RecordingDataSet | None:
+        chunks = []
+        for chunk, bytes_read in read_recording_csv_chunks(self.csv_path, self.CHUNK_ROWS, self.reader):
+            if self.is_cancelled:
+                logger.info(f"Loading {self.csv_path} cancelled")
+                return None
+            chunks.append(chunk)
+            self.status.bytes_read = bytes_read
+            self.status.rows_read += len(chunk)
+            self._update(ActivationState.LOADING)
+
+        df = pd.concat(chunks, ignore_index=True) if chunks else pd.DataFrame()
+        if self.use_cache:
+            try:
+                write_cache(self.csv_path, df)
+            except Exception as e:
+                logger.warning(f"Failed to write data cache for {self.csv_path}: {e}")
+        if read_statistics(self.csv_path) is None:
+            # the data is in memory anyway, so the statistics come almost for free
+            try:
+                write_statistics(self.csv_path, compute_column_statistics(df))
+            except OSError as e:
+                logger.warning(f"Failed to write column statistics for {self.csv_path}: {e}")
+
+        dataset = RecordingDataSet(self.csv_path, self.column_cache, self.use_cache, self.reader,
+                                   self.derived_channels)
+        dataset.prime(df)
+        return dataset
+
+    def _update(self, state: ActivationState, message: str = ""):
+        status = self.status
+        status.state = state
+        status.message = message
+        status.elapsed_s = time.time() - self._start_time
+        if 0 < status.bytes_read < status.bytes_total:
+            status.eta_s = status.elapsed_s * (status.bytes_total - status.bytes_read) / status.bytes_read
+        else:
+            status.eta_s = 0.0
+
+        if self.on_progress:
+            try:
+                self.on_progress(status.model_copy())
+            except Exception as e:
+                logger.warning(f"Failed to publish activation progress: {e}")
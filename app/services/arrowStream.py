@@ -0,0 +1,44 @@
+from typing import Iterator, List
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+from app.services.vectorColumns import find_vector_columns
+
+# end-of-stream marker of the Arrow IPC stream format: continuation token and a zero length
+IPC_END_OF_STREAM = b"\xff\xff\xff\xff\x00\x00\x00\x00"
+IPC_STREAM_MEDIA_TYPE = "application/vnd.apache.arrow.stream"
+
+
+def to_arrow_table(df: pd.DataFrame, requested_columns: List[str]) -> pa.Table:
+    """
+    Convert data with split component columns to an Arrow table. Numeric columns are wrapped without copying,
+    requested composite columns become fixed size lists of their components.
+    """
+    vector_columns = find_vector_columns(list(df.columns))
+    names, arrays = [], []
+    for name in dict.fromkeys(requested_columns):
+        if name in vector_columns:
+            components = np.column_stack([df[component].to_numpy(dtype=np.float64)
+                                          for component in vector_columns[name]])
+            array = pa.FixedSizeListArray.from_arrays(pa.array(components.ravel()), components.shape[1])
+        elif name in df.columns:
+            values = df[name].to_numpy()
+            array = pa.array(values) if values.dtype.kind in "iufb" else pa.array(values, from_pandas=True)
+        else:
+            continue
+        names.append(name)
+        arrays.append(array)
+    return pa.Table.from_arrays(arrays, names=names)
+
+
+def iter_ipc_stream(table: pa.Table, batch_rows: int) -> Iterator[memoryview]:
+    """
+    Serialize a table to the Arrow IPC stream format, one message at a time: the schema, the record batches of
+    at most batch_rows rows and the end-of-stream marker.
+    """
+    yield memoryview(table.schema.serialize())
+    for batch in table.to_batches(max_chunksize=batch_rows):
+        yield memoryview(batch.serialize())
+    yield memoryview(IPC_END_OF_STREAM)
@@ -1,24 +1,32 @@
 import logging
+import os
+from typing import Optional
 
-import pandas as pd
 
 from app.models.testDriveDataInfo import TestDriveDataInfo
+from app.services.csvReaders import CsvReader, get_csv_reader
+from app.services.columnStatistics import compute_column_statistics, read_statistics, write_statistics
+from app.services.recordingCache import ensure_cache, load_recording, read_recording_csv
 
 logger = logging.getLogger('uvicorn.error')
 
 
-def analyze_data(data_info: TestDriveDataInfo) -> bool:
+def analyze_data(data_info: TestDriveDataInfo, use_cache: bool = True, reader: Optional[CsvReader] = None) -> bool:
     is_data_analyzed = data_info.driven_time_s > 0
     if is_data_analyzed:
         return False  # no update needed
 
     logger.info(f"Analyzing data for {data_info.csv_file_name}...")
 
-    # skip first row
-    df = pd.read_csv(data_info.csv_file_full_path, skiprows=[1])
-
     velocity_column = "car0_velocity"
 
+    if use_cache:
+        df = load_recording(data_info.csv_file_full_path, columns=["timestamp", velocity_column], reader=reader)
+    else:
+        # the reader skips the units row
+        reader = reader or get_csv_reader()
+        df = reader.read(data_info.csv_file_full_path, columns=["timestamp", velocity_column])
+
     df['time_interval'] = df['timestamp'].diff()  # Time difference between consecutive rows
     df['time_interval'] = df['time_interval'].fillna(0)
     # Calculate the distance for each interval
@@ -44,3 +52,38 @@ def analyze_data(data_info: TestDriveDataInfo) -> bool:
     data_info.data_count_rows = len(df)
 
     return True  # update needed
+
+
+def build_data_cache(data_info: TestDriveDataInfo, reader: Optional[CsvReader] = None) -> bool:
+    """
+    Build the columnar sidecar cache of a recording, so activating the test drive does not need to parse the CSV.
+    :return: Always False, the project info itself is not changed.
+    """
+    if not os.path.isfile(data_info.csv_file_full_path):
+        return False
+    try:
+        if ensure_cache(data_info.csv_file_full_path, reader):
+            logger.info(f"Data cache built for {data_info.csv_file_name}")
+    except Exception as e:
+        logger.warning(f"Failed to build data cache for {data_info.csv_file_name}: {e}")
+    return False  # no update needed
+
+
+def build_column_statistics(data_info: TestDriveDataInfo, use_cache: bool = True,
+                            reader: Optional[CsvReader] = None) -> bool:
+    """
+    Compute the statistics of all numeric columns of a recording once and store them next to the recording.
+    :return: Always False, the project info itself is not changed.
+    """
+    if not os.path.isfile(data_info.csv_file_full_path) or read_statistics(data_info.csv_file_full_path) is not None:
+        return False
+    try:
+        if use_cache:
+            df = load_recording(data_info.csv_file_full_path, reader=reader)
+        else:
+            # split into component columns like the cached data, so the statistics have the same column names
+            df = read_recording_csv(data_info.csv_file_full_path, reader=reader)
+        write_statistics(data_info.csv_file_full_path, compute_column_statistics(df))
+    except Exception as e:
+        logger.warning(f"Failed to build column statistics for {data_info.csv_file_name}: {e}")
+    return False  # no update needed
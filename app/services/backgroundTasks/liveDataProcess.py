@@ -2,11 +2,8 @@ import asyncio
 import logging
 from dataclasses import asdict
 import time
-import functools
-from threading import Lock, Timer
 
 from .trackedEvent import TrackedEvent
-from ..bufferedCsvWriter import BufferedCsvWriter
 from ..dataSources.simulatedPantheraDataSource import start_process as start_simulated_process
 
 # only inport if panthera module is present
@@ -22,48 +19,14 @@ from ...dependencies import get_testdata_manager, get_connection_manager_data, g
 logger = logging.getLogger('uvicorn.error')
 
 
-def throttle_latest(seconds: float):
-    # Always sends the latest call, without dropping important updates.
-    def decorator(func):
-        last_called = [0.0]
-        latest_args = [None]
-        latest_kwargs = [None]
-        lock = Lock()
-
-        def sender():
-            with lock:
-                if latest_args[0] is not None:
-                    func(*latest_args[0], **latest_kwargs[0])
-                    latest_args[0] = None
-                    latest_kwargs[0] = None
-                    last_called[0] = time.time()
-
-        @functools.wraps(func)
-        def wrapper(*args, **kwargs):
-            now = time.time()
-            with lock:
-                if now - last_called[0] >= seconds:
-                    # Enough time passed: send immediately
-                    last_called[0] = now
-                    func(*args, **kwargs)
-                else:
-                    # Too fast: overwrite the latest
-                    latest_args[0] = args
-                    latest_kwargs[0] = kwargs
-
-            # Schedule sending latest after throttle period
-            delay = seconds - (now - last_called[0])
-            if delay > 0:
-                Timer(delay, sender).start()
-
-        return wrapper
-
-    return decorator
-
-
 def process_live_data(stop_event: TrackedEvent, loop: asyncio.AbstractEventLoop):
     live_data_source = None
     buffered_writer = None
+    parquet_writer = None
+    data_manager = get_connection_manager_data()
+    simulation_time_manager = get_connection_manager_simulation_time()
+    data_manager.broadcaster.start(loop)
+    simulation_time_manager.broadcaster.start(loop)
 
     try:
         while not stop_event.is_set():
@@ -75,34 +38,35 @@ def process_live_data(stop_event: TrackedEvent, loop: asyncio.AbstractEventLoop)
             if has_live_test_drive:
                 if live_data_source is None:
                     csv_file = test_drive_data.test_drive_data_info.csv_file_full_path
-                    buffered_writer = BufferedCsvWriter(csv_file)
+                    buffered_writer = service.start_live_writer(csv_file)
+                    parquet_writer = service.start_live_parquet_writer(test_drive_data)
+                    live_buffer = service.start_live_buffer(csv_file)
 
-                    @throttle_latest(0.5)
                     def new_live_data_arrived(data: dict):
-                        logger.info(f"Live Data Arrived @ {data.timestamp}s")
-
-                        asyncio.run_coroutine_threadsafe(
-                            get_connection_manager_data().broadcast_json(data),
-                            loop
-                        )
-                        asyncio.run_coroutine_threadsafe(
-                            get_connection_manager_simulation_time().broadcast_json({
-                                "timestamp": data["timestamp"]
-                            }),
-                            loop
-                        )
+                        # every sample is served from memory and recorded, the broadcasters coalesce them to their rate
+                        live_buffer.append(data)
+                        buffered_writer.enqueue(data)
+                        if parquet_writer:
+                            parquet_writer.enqueue(data)
+                        data_manager.publish(data)
+                        simulation_time_manager.publish({"timestamp": data["timestamp"]})
 
                     if PANTHERA_AVAILABLE:
                         live_data_source = start_panthera_process(new_live_data_arrived)
                     else:
                         live_data_source = start_simulated_process(new_live_data_arrived)
+                    service.live_source = live_data_source
 
             elif live_data_source is not None:
+                # the source is stopped first, so the writer drains every sample it delivered
+                live_data_source.stop()
                 if buffered_writer:
                     buffered_writer.shutdown()
-                live_data_source.stop()
+                if parquet_writer:
+                    parquet_writer.shutdown()
                 live_data_source = None
                 buffered_writer = None
+                parquet_writer = None
 
             sleep_with_event(stop_event, 2)
 
@@ -114,6 +78,8 @@ def process_live_data(stop_event: TrackedEvent, loop: asyncio.AbstractEventLoop)
             live_data_source.stop()
         if buffered_writer:
             buffered_writer.shutdown()
+        if parquet_writer:
+            parquet_writer.shutdown()
 
 
 def sleep_with_event(stop_event, duration):
@@ -3,10 +3,12 @@ import time
 import logging
 from threading import Event
 from app.services.backgroundTasks.videoAnalyzer import analyze_video
-from app.services.backgroundTasks.dataAnalyzer import analyze_data
+from app.services.backgroundTasks.dataAnalyzer import analyze_data, build_column_statistics, build_data_cache
 from app.services.backgroundTasks.tagAnalyzer import analyze_tags
 
-from ...dependencies import get_testdata_manager
+from app.services.csvReaders import get_csv_reader
+
+from ...dependencies import get_testdata_manager, get_settings
 
 logger = logging.getLogger(__name__)
 
@@ -14,6 +16,8 @@ logger = logging.getLogger(__name__)
 def process_projects(stop_event: Event, loop: asyncio.AbstractEventLoop):
     while not stop_event.is_set():
         service = get_testdata_manager()
+        use_cache = get_settings().DATA_CACHE_ENABLED
+        reader = get_csv_reader(get_settings().CSV_READER)
 
         test_drive_data = service.get_testdrives()
 
@@ -24,7 +28,10 @@ def process_projects(stop_event: Event, loop: asyncio.AbstractEventLoop):
 
             start = time.time()
             updated_video = analyze_video(test_drive.test_drive_video_info)
-            updated_data = analyze_data(test_drive.test_drive_data_info)
+            if use_cache:
+                build_data_cache(test_drive.test_drive_data_info, reader)
+            updated_data = analyze_data(test_drive.test_drive_data_info, use_cache, reader)
+            build_column_statistics(test_drive.test_drive_data_info, use_cache, reader)
             updated_tags = analyze_tags(test_drive.test_drive_tag_info)
             end = time.time()
 
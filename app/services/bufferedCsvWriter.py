@@ -1,49 +1,60 @@
 import csv
-import time
-from dataclasses import asdict
-from queue import Queue, Empty
-from threading import Thread, Event
-
-from app.services.backgroundTasks.trackedEvent import TrackedEvent
-
-
-class BufferedCsvWriter:
-    def __init__(self, csv_file_path: str, flush_interval: float = 10.0, batch_size: int = 100):
-        self.csv_file_path = csv_file_path
-        self.flush_interval = flush_interval
-        self.batch_size = batch_size
-        self.shutdown_event = TrackedEvent()
-        self.queue = Queue()
-        self.thread = Thread(target=self._writer_loop, daemon=True)
-        self.thread.start()
-
-    def _writer_loop(self):
-        buffer = []
-        last_flush = time.time()
-
-        while not self.shutdown_event.is_set():
-            try:
-                data = self.queue.get(timeout=1)  # Wait max 1 second for new data
-                buffer.append(data)
-            except Empty:
-                pass
-
-            should_flush = (
-                    len(buffer) >= self.batch_size or
-                    (buffer and time.time() - last_flush >= self.flush_interval)
-            )
-
-            if should_flush:
-                with open(self.csv_file_path, 'a', newline='') as f:
-                    writer = csv.DictWriter(f, fieldnames=buffer[0].keys())
-                    for row in buffer:
-                        writer.writerow(row)
-                buffer.clear()
-                last_flush = time.time()
-
-    def enqueue(self, data: dict):
-        self.queue.put(data)
-
-    def shutdown(self):
-        self.shutdown_event.set()
-        self.thread.join(timeout=5)
+import os
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from app.models.liveDataRow import LIVE_CSV_FIELDNAMES
+from app.services.bufferedWriter import BufferedWriter
+
+
+def _format_cell(value: Any) -> Any:
+    if value is None:
+        return ""
+    if isinstance(value, (list, tuple)):
+        # vectors are written like in recorded files, e.g. "0.1,0.2,0.3"
+        return ",".join(map(str, value))
+    return value
+
+
+class BufferedCsvWriter(BufferedWriter):
+    """
+    Writes live samples to a CSV recording in a background thread, see BufferedWriter.
+    The file stays open for the whole session and every row is written with the columns of the header of the
+    recording, so a missing field leaves an empty cell instead of shifting the columns.
+    """
+
+    def __init__(self, csv_file_path: str | Path, fieldnames: Optional[List[str]] = None,
+                 flush_interval: float = 1.0, batch_size: int = 1000, max_queue_size: int = 10_000,
+                 block_timeout: float = 0.0):
+        """
+        :param csv_file_path: The recording, a header is written if the file is empty.
+        :param fieldnames: The columns of a new recording. The header of an existing recording takes precedence.
+        :param flush_interval: Maximum time in seconds a sample waits in a batch before the batch is written.
+        :param batch_size: Maximum number of samples written at once.
+        :param max_queue_size: Maximum number of samples waiting to be written.
+        :param block_timeout: Time in seconds enqueue waits for free space before it drops a sample.
+        """
+        super().__init__(f"CSV writer of {csv_file_path}", flush_interval, batch_size, max_queue_size, block_timeout)
+        self.csv_file_path = Path(csv_file_path)
+        self.fieldnames = self._read_header() or list(fieldnames or LIVE_CSV_FIELDNAMES)
+
+        # the file is opened here, so a recording that cannot be written fails right away
+        self._file = open(self.csv_file_path, 'a', newline='')
+        self._writer = csv.writer(self._file)
+        if self._file.tell() == 0:
+            self._writer.writerow(self.fieldnames)
+            self._file.flush()
+        self.start()
+
+    def _read_header(self) -> Optional[List[str]]:
+        if not self.csv_file_path.exists() or os.path.getsize(self.csv_file_path) == 0:
+            return None
+        with open(self.csv_file_path, 'r', newline='') as f:
+            return next(csv.reader(f), None)
+
+    def _write_batch(self, batch: List[Dict[str, Any]]):
+        self._writer.writerows([_format_cell(row.get(name)) for name in self.fieldnames] for row in batch)
+        self._file.flush()
+
+    def _close(self):
+        self._file.close()
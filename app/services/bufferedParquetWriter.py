@@ -1,55 +1,228 @@
+import logging
+import os
 import time
-from dataclasses import asdict
-from queue import Queue, Empty
-from threading import Thread, Event
 from pathlib import Path
-import pandas as pd
-
-
-class BufferedParquetWriter:
-    def __init__(self, parquet_file_path: str, stop_event: Event, flush_interval: float = 10.0, batch_size: int = 100):
-        self.parquet_file_path = Path(parquet_file_path)
-        self.flush_interval = flush_interval
-        self.batch_size = batch_size
-        self.queue = Queue()
-        self.stop_event = stop_event
-        self.thread = Thread(target=self._writer_loop, daemon=True)
-        self._has_written_schema = self.parquet_file_path.exists()
-        self.thread.start()
-
-    def _writer_loop(self):
-        buffer = []
-        last_flush = time.time()
-
-        while not self.stop_event.is_set():
-            try:
-                data = self.queue.get(timeout=1)
-                buffer.append(data)
-            except Empty:
-                pass
-
-            should_flush = (
-                    len(buffer) >= self.batch_size or
-                    (buffer and time.time() - last_flush >= self.flush_interval)
-            )
-
-            if should_flush:
-                df = pd.DataFrame(buffer)
-
-                if self.parquet_file_path.exists():
-                    # Append to file -> does now work....
-                    df.to_parquet(self.parquet_file_path, engine='pyarrow', index=False, compression='snappy',
-                                  append=True)
-                else:
-                    # Write new file
-                    df.to_parquet(self.parquet_file_path, engine='pyarrow', index=False, compression='snappy')
-
-                buffer.clear()
-                last_flush = time.time()
-
-    def enqueue(self, data: dict):
-        self.queue.put(data)
-
-    def shutdown(self):
-        self.stop_event.set()
-        self.thread.join(timeout=5)
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from app.models.liveDataRow import FIELD_NAME_MAP, get_int
+from app.services.bufferedWriter import BufferedWriter
+from app.services.recordingCache import CACHE_FORMAT_VERSION, FORMAT_METADATA_KEY
+from app.services.vectorColumns import GETTER_LAYOUTS, component_names
+
+logger = logging.getLogger('uvicorn.error')
+
+PARQUET_SUFFIX = ".parquet"
+# The open file of a recording is an Arrow IPC stream: every batch is a self-contained message, so a file cut off by
+# a crash can be read up to its last complete batch. Closed and recovered files are converted to Parquet.
+PARTIAL_SUFFIX = ".arrows"
+# rows per row group of the converted Parquet files
+ROW_GROUP_ROWS = 65_536
+
+
+def live_parquet_schema(field_map: Sequence[Tuple[str, Optional[Callable]]] = FIELD_NAME_MAP) -> pa.Schema:
+    """
+    Create the schema of live Parquet recordings. The columns have the layout of the sidecar caches of recorded
+    test drives: vector fields are split into float64 component columns, integer fields are int64.
+    """
+    fields = []
+    for name, getter in field_map:
+        if getter is None:
+            continue
+        layout = GETTER_LAYOUTS.get(getter)
+        if layout is not None:
+            fields.extend(pa.field(component, pa.float64()) for component in component_names(name, layout))
+        else:
+            fields.append(pa.field(name, pa.int64() if getter is get_int else pa.float64()))
+    fields.append(pa.field("timestamp", pa.float64()))
+    return pa.schema(fields, metadata={FORMAT_METADATA_KEY: CACHE_FORMAT_VERSION})
+
+
+def convert_partial_file(partial_path: str | Path) -> Optional[Path]:
+    """
+    Convert the Arrow IPC stream of an open recording file to Parquet and remove it. A stream that was cut off is
+    read up to its last complete batch.
+    :return: The Parquet file, or None if the stream holds no rows or cannot be read at all.
+    """
+    partial_path = Path(partial_path)
+    final_path = partial_path.with_suffix(PARQUET_SUFFIX)
+    temp_path = final_path.with_name(final_path.name + ".tmp")
+    rows = 0
+    try:
+        with pa.OSFile(str(partial_path), "rb") as source:
+            reader = pa.ipc.open_stream(source)
+            with pq.ParquetWriter(temp_path, reader.schema, compression='zstd') as writer:
+                # the small batches of the stream are combined into row groups of ROW_GROUP_ROWS rows
+                batches, pending_rows = [], 0
+                for batch in _read_complete_batches(reader, partial_path):
+                    batches.append(batch)
+                    rows += batch.num_rows
+                    pending_rows += batch.num_rows
+                    if pending_rows >= ROW_GROUP_ROWS:
+                        writer.write_table(pa.Table.from_batches(batches), row_group_size=ROW_GROUP_ROWS)
+                        batches, pending_rows = [], 0
+                if batches:
+                    writer.write_table(pa.Table.from_batches(batches), row_group_size=ROW_GROUP_ROWS)
+    except (OSError, pa.ArrowInvalid) as e:
+        # not even the schema was written, the file is left for inspection
+        logger.warning(f"Live recording {partial_path} cannot be read: {e}")
+        temp_path.unlink(missing_ok=True)
+        return None
+    if rows == 0:
+        temp_path.unlink(missing_ok=True)
+        partial_path.unlink(missing_ok=True)
+        return None
+    os.replace(temp_path, final_path)
+    partial_path.unlink()
+    return final_path
+
+
+def _read_complete_batches(reader: pa.ipc.RecordBatchStreamReader, path: Path):
+    while True:
+        try:
+            yield reader.read_next_batch()
+        except StopIteration:
+            return
+        except (OSError, pa.ArrowInvalid) as e:
+            logger.warning(f"Live recording {path} was cut off, it is recovered up to its last complete batch: {e}")
+            return
+
+
+def recover_partial_files(base_path: str | Path) -> List[Path]:
+    """
+    Finish the files of a recording that were left open by a process that did not shut down cleanly. They are
+    converted to Parquet up to their last complete batch, so a crash loses at most the samples of one flush interval.
+    :param base_path: The path of the recording without index and suffix.
+    :return: The recovered files.
+    """
+    base_path = Path(base_path)
+    recovered = []
+    for partial_path in sorted(base_path.parent.glob(f"{base_path.name}_*{PARTIAL_SUFFIX}")):
+        final_path = convert_partial_file(partial_path)
+        if final_path is not None:
+            logger.info(f"Live recording {final_path} recovered")
+            recovered.append(final_path)
+    return recovered
+
+
+def read_parquet_recording(paths: Sequence[str | Path], columns: Optional[List[str]] = None) -> pa.Table:
+    """
+    Read the files of a live Parquet recording as one table.
+    :param columns: Columns to read. If None, all columns are read.
+    """
+    return pa.concat_tables(pq.read_table(path, columns=columns) for path in paths)
+
+
+class BufferedParquetWriter(BufferedWriter):
+    """
+    Records live samples to rolling Parquet files in a background thread, see BufferedWriter.
+    The open file is an Arrow IPC stream to which each batch is appended and flushed, see PARTIAL_SUFFIX. The
+    recording moves on to a new file when the current one reaches max_file_bytes or is open for max_file_seconds.
+    Closing a file converts it to Parquet and reports it to on_file_closed.
+    Files are named after the base path and numbered: live_0001.parquet, live_0002.parquet, ...
+    """
+
+    def __init__(self, base_path: str | Path,
+                 field_map: Sequence[Tuple[str, Optional[Callable]]] = FIELD_NAME_MAP,
+                 max_file_bytes: int = 256 * 1024 * 1024, max_file_seconds: float = 600.0,
+                 on_file_closed: Optional[Callable[[Path], None]] = None, flush_interval: float = 1.0,
+                 batch_size: int = 1000, max_queue_size: int = 10_000, block_timeout: float = 0.0):
+        """
+        :param base_path: The path of the recording without index and suffix.
+        :param field_map: The fields to record and the getters they are read with, which define their types.
+        :param max_file_bytes: Size of the open, uncompressed file after which a new file is started.
+        :param max_file_seconds: Time after which a new file is started.
+        :param on_file_closed: Called from the writer thread with the path of each completed file.
+        """
+        super().__init__(f"Parquet writer of {base_path}", flush_interval, batch_size, max_queue_size,
+                         block_timeout)
+        self.base_path = Path(base_path)
+        self.max_file_bytes = max_file_bytes
+        self.max_file_seconds = max_file_seconds
+        self.on_file_closed = on_file_closed
+        self.schema = live_parquet_schema(field_map)
+        self.files: List[Path] = recover_partial_files(self.base_path)
+        for path in self.files:
+            if on_file_closed is not None:
+                on_file_closed(path)
+
+        # each field is read from the samples once per batch: name, number of components (None for scalars), type
+        self._fields: List[Tuple[str, Optional[int], pa.DataType]] = []
+        for name, getter in list(field_map) + [("timestamp", None)]:
+            if getter is None and name != "timestamp":
+                continue
+            layout = GETTER_LAYOUTS.get(getter)
+            if layout is not None:
+                self._fields.append((name, layout.size, pa.float64()))
+            else:
+                self._fields.append((name, None, pa.int64() if getter is get_int else pa.float64()))
+
+        self._sink: pa.OSFile | None = None
+        self._writer: pa.ipc.RecordBatchStreamWriter | None = None
+        self._partial_path: Path | None = None
+        self._opened_at = 0.0
+        self.start()
+
+    def _write_batch(self, batch: List[Dict[str, Any]]):
+        if self._writer is not None and self._should_rotate():
+            self._close_file()
+        if self._writer is None:
+            self._open_file()
+        self._writer.write_batch(self._to_record_batch(batch))
+        # the batch is handed to the operating system, it survives a crash of the application
+        self._sink.flush()
+
+    def _close(self):
+        self._close_file()
+
+    def _should_rotate(self) -> bool:
+        return (time.monotonic() - self._opened_at >= self.max_file_seconds or
+                os.path.getsize(self._partial_path) >= self.max_file_bytes)
+
+    def _open_file(self):
+        index = 1
+        while True:
+            final_path = self.base_path.with_name(f"{self.base_path.name}_{index:04d}{PARQUET_SUFFIX}")
+            partial_path = final_path.with_suffix(PARTIAL_SUFFIX)
+            if not final_path.exists() and not partial_path.exists():
+                break
+            index += 1
+        self.base_path.parent.mkdir(parents=True, exist_ok=True)
+        self._sink = pa.OSFile(str(partial_path), "wb")
+        self._writer = pa.ipc.new_stream(self._sink, self.schema)
+        self._partial_path = partial_path
+        self._opened_at = time.monotonic()
+        logger.info(f"Live recording {final_path} started")
+
+    def _close_file(self):
+        if self._writer is None:
+            return
+        self._writer.close()
+        self._sink.close()
+        final_path = convert_partial_file(self._partial_path)
+        self._writer = None
+        self._sink = None
+        self._partial_path = None
+        if final_path is None:
+            return
+        self.files.append(final_path)
+        logger.info(f"Live recording {final_path} completed")
+        if self.on_file_closed is not None:
+            self.on_file_closed(final_path)
+
+    def _to_record_batch(self, batch: List[Dict[str, Any]]) -> pa.RecordBatch:
+        arrays = []
+        for name, size, data_type in self._fields:
+            values = [sample.get(name) for sample in batch]
+            if size is None:
+                arrays.append(pa.array(values, type=data_type))
+                continue
+            components = np.full((len(batch), size), np.nan, dtype=np.float64)
+            for row, value in enumerate(values):
+                if value is not None and len(value) == size:
+                    components[row] = value
+            arrays.extend(pa.array(components[:, i]) for i in range(size))
+        return pa.RecordBatch.from_arrays(arrays, schema=self.schema)
@@ -0,0 +1,154 @@
+import atexit
+import logging
+import time
+from queue import Queue, Empty, Full
+from threading import Lock, Thread
+from typing import Any, Dict, List
+
+from app.models.writerStatistics import WriterStatistics
+from app.services.backgroundTasks.trackedEvent import TrackedEvent
+
+logger = logging.getLogger('uvicorn.error')
+
+# drops are logged once per this many dropped samples
+DROP_LOG_INTERVAL = 1000
+
+
+class BufferedWriter:
+    """
+    Base of the writers that record live samples in a background thread.
+    Samples are collected into batches of at most batch_size samples, a sample waits at most flush_interval seconds
+    before its batch is written. The queue is bounded: if the writer falls behind, enqueue waits at most
+    block_timeout seconds and then drops the sample. On shutdown, also at interpreter exit, the queued samples are
+    written before the writer is closed.
+    Subclasses write the batches in _write_batch and release their files in _close.
+    """
+
+    def __init__(self, name: str, flush_interval: float = 1.0, batch_size: int = 1000,
+                 max_queue_size: int = 10_000, block_timeout: float = 0.0):
+        self.name = name
+        self.flush_interval = flush_interval
+        self.batch_size = batch_size
+        self.block_timeout = block_timeout
+        self.shutdown_event = TrackedEvent()
+        self.queue: Queue[Dict[str, Any]] = Queue(maxsize=max_queue_size)
+
+        self._statistics_lock = Lock()
+        self.rows_written = 0
+        self.rows_dropped = 0
+        self.max_queue_depth = 0
+        self.flushes = 0
+        self.last_flush_ms = 0.0
+        self.max_flush_ms = 0.0
+        self._total_flush_ms = 0.0
+
+        self.thread = Thread(target=self._writer_loop, daemon=True)
+
+    def start(self):
+        self.thread.start()
+        # the thread is a daemon, without this the last samples would be lost when the application exits
+        atexit.register(self.shutdown)
+
+    def _write_batch(self, batch: List[Dict[str, Any]]):
+        raise NotImplementedError
+
+    def _close(self):
+        pass
+
+    def _writer_loop(self):
+        try:
+            while not (self.shutdown_event.is_set() and self.queue.empty()):
+                batch = self._next_batch()
+                if batch:
+                    self._write(batch)
+        finally:
+            self._close()
+
+    def _next_batch(self) -> List[Dict[str, Any]]:
+        """
+        Collect samples until the batch is full or the first sample waited flush_interval seconds.
+        """
+        batch = []
+        deadline = None
+        while len(batch) < self.batch_size:
+            if self.shutdown_event.is_set():
+                # drain the queue without waiting
+                try:
+                    batch.append(self.queue.get_nowait())
+                    continue
+                except Empty:
+                    break
+            timeout = 0.1 if deadline is None else min(0.1, deadline - time.monotonic())
+            if timeout <= 0:
+                break
+            try:
+                batch.append(self.queue.get(timeout=timeout))
+            except Empty:
+                continue
+            if deadline is None:
+                deadline = time.monotonic() + self.flush_interval
+        return batch
+
+    def _write(self, batch: List[Dict[str, Any]]):
+        started = time.perf_counter()
+        try:
+            self._write_batch(batch)
+        except Exception as e:
+            # a failing batch must not stop the recording of the following ones
+            logger.error(f"{self.name} failed to write {len(batch)} rows: {e}")
+            with self._statistics_lock:
+                self.rows_dropped += len(batch)
+            return
+        elapsed_ms = (time.perf_counter() - started) * 1000
+
+        with self._statistics_lock:
+            self.rows_written += len(batch)
+            self.flushes += 1
+            self.last_flush_ms = elapsed_ms
+            self.max_flush_ms = max(self.max_flush_ms, elapsed_ms)
+            self._total_flush_ms += elapsed_ms
+
+    def enqueue(self, data: dict) -> bool:
+        """
+        Queue a sample to be written.
+        :return: False if the sample was dropped because the queue is full or the writer is shut down.
+        """
+        if not self.shutdown_event.is_set():
+            try:
+                if self.block_timeout > 0:
+                    self.queue.put(data, timeout=self.block_timeout)
+                else:
+                    self.queue.put_nowait(data)
+                depth = self.queue.qsize()
+                if depth > self.max_queue_depth:
+                    self.max_queue_depth = depth
+                return True
+            except Full:
+                pass
+
+        with self._statistics_lock:
+            self.rows_dropped += 1
+            dropped = self.rows_dropped
+        if dropped % DROP_LOG_INTERVAL == 1:
+            logger.warning(f"{self.name} cannot keep up, {dropped} samples dropped")
+        return False
+
+    def get_statistics(self) -> WriterStatistics:
+        with self._statistics_lock:
+            return WriterStatistics(
+                rows_written=self.rows_written, rows_dropped=self.rows_dropped, queue_depth=self.queue.qsize(),
+                max_queue_depth=self.max_queue_depth, queue_capacity=self.queue.maxsize, flushes=self.flushes,
+                last_flush_ms=self.last_flush_ms, max_flush_ms=self.max_flush_ms,
+                mean_flush_ms=self._total_flush_ms / self.flushes if self.flushes else 0.0)
+
+    def shutdown(self, timeout: float = 5.0):
+        """
+        Write the queued samples and close the writer.
+        """
+        atexit.unregister(self.shutdown)
+        self.shutdown_event.set()
+        if not self.thread.is_alive():
+            return
+        self.thread.join(timeout=timeout)
+        if self.thread.is_alive():
+            logger.warning(f"{self.name} did not finish within {timeout}s, {self.queue.qsize()} samples are not written")
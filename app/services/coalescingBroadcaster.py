@@ -0,0 +1,105 @@
+import asyncio
+import logging
+from threading import Lock
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from app.models.broadcastStatistics import BroadcastStatistics
+
+logger = logging.getLogger('uvicorn.error')
+
+
+class CoalescingBroadcaster:
+    """
+    Broadcasts live samples at a fixed maximum rate from the asyncio event loop.
+    Samples can be submitted from any thread at any rate. Until the next broadcast, only the latest value of each
+    field is kept, so a broadcast carries the newest state of every field that arrived since the last one.
+    A broadcast is sent as soon as a sample arrives if the previous one was at least one interval ago; while samples
+    keep arriving, one task on the event loop sends them once per interval and ends when no sample is pending.
+    Broadcasts never overlap, a slow send delays the next one.
+    """
+
+    def __init__(self, name: str, send: Callable[[Dict[str, Any]], Awaitable[None]], rate_hz: float):
+        """
+        :param send: Coroutine that sends a broadcast, e.g. WebsocketConnectionManager.broadcast_frame.
+        :param rate_hz: Maximum number of broadcasts per second.
+        """
+        self.name = name
+        self.send = send
+        self.rate_hz = rate_hz
+        self.interval = 1.0 / rate_hz
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._lock = Lock()
+        self._pending: Dict[str, Any] = {}
+        self._running = False
+
+        self.samples_received = 0
+        self.samples_emitted = 0
+        self.last_send_ms = 0.0
+        self.max_send_ms = 0.0
+
+    def start(self, loop: asyncio.AbstractEventLoop):
+        """
+        Send the broadcasts on the given event loop. Samples submitted before are sent with the first broadcast.
+        """
+        with self._lock:
+            self._loop = loop
+            schedule = bool(self._pending) and not self._running
+            self._running = self._running or schedule
+        if schedule:
+            loop.call_soon_threadsafe(self._create_task)
+
+    def submit(self, data: Dict[str, Any]):
+        """
+        Hand a sample to the broadcaster, safe to call from any thread.
+        """
+        with self._lock:
+            self.samples_received += 1
+            self._pending.update(data)
+            if self._running or self._loop is None:
+                return
+            self._running = True
+            loop = self._loop
+        try:
+            loop.call_soon_threadsafe(self._create_task)
+        except RuntimeError:
+            # the event loop was closed during shutdown
+            with self._lock:
+                self._running = False
+
+    def _create_task(self):
+        self._loop.create_task(self._run())
+
+    async def _run(self):
+        try:
+            while True:
+                with self._lock:
+                    data, self._pending = self._pending, {}
+                    if not data:
+                        self._running = False
+                        return
+                started = self._loop.time()
+                await self._send(data)
+                # the next broadcast is sent one interval after this one started at the earliest
+                await asyncio.sleep(max(0.0, started + self.interval - self._loop.time()))
+        except BaseException:
+            with self._lock:
+                self._running = False
+            raise
+
+    async def _send(self, data: Dict[str, Any]):
+        started = self._loop.time()
+        try:
+            await self.send(data)
+        except Exception as e:
+            logger.warning(f"Broadcaster {self.name} failed to send: {e}")
+            return
+        elapsed_ms = (self._loop.time() - started) * 1000
+        self.samples_emitted += 1
+        self.last_send_ms = elapsed_ms
+        self.max_send_ms = max(self.max_send_ms, elapsed_ms)
+
+    def get_statistics(self) -> BroadcastStatistics:
+        with self._lock:
+            return BroadcastStatistics(
+                rate_hz=self.rate_hz, samples_received=self.samples_received, samples_emitted=self.samples_emitted,
+                pending_fields=len(self._pending), last_send_ms=self.last_send_ms, max_send_ms=self.max_send_ms)
@@ -0,0 +1,15 @@
+import pandas as pd
+
+from app.services.lruCache import LruCache
+
+
+class ColumnCache(LruCache[pd.Series]):
+    """
+    Least recently used cache of loaded data columns, limited by the memory the columns use.
+    """
+
+    def __init__(self, max_bytes: int):
+        super().__init__("column cache", max_bytes)
+
+    def _size_of(self, column: pd.Series) -> int:
+        return int(column.memory_usage(index=False, deep=column.dtype == object))
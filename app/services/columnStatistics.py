@@ -0,0 +1,112 @@
+import json
+import logging
+import os
+import warnings
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+from pydantic import ValidationError
+
+from app.models.columnStatistics import ColumnStatistics
+from app.services.recordingCache import CACHE_FORMAT_VERSION, get_file_fingerprint
+
+logger = logging.getLogger('uvicorn.error')
+
+# The statistics live next to the recording: recording.csv -> recording.csv.stats.json
+STATISTICS_SUFFIX = ".stats.json"
+PERCENTILES = [1, 5, 25, 50, 75, 95, 99]
+# Statistics are keyed by the column names of the sidecar cache, so they are only valid for the same cache format.
+# The second part is increased when the statistics themselves change.
+STATISTICS_FORMAT_VERSION = f"{CACHE_FORMAT_VERSION.decode()}.1"
+
+
+def get_statistics_path(csv_path: str | Path) -> Path:
+    csv_path = Path(csv_path)
+    return csv_path.with_name(csv_path.name + STATISTICS_SUFFIX)
+
+
+def _to_float(value: float) -> Optional[float]:
+    return None if np.isnan(value) else float(value)
+
+
+def compute_column_statistics(df: pd.DataFrame) -> List[ColumnStatistics]:
+    """
+    Compute the statistics of all numeric columns of a recording in one vectorized pass over the data.
+    """
+    numeric_columns = [col for col in df.columns if df[col].dtype.kind in "iufb"]
+    if not numeric_columns or df.empty:
+        return []
+    values = df[numeric_columns].to_numpy(dtype=np.float64)
+    missing = np.isnan(values)
+    counts = len(values) - missing.sum(axis=0)
+
+    duration = 0.0
+    if "timestamp" in df.columns:
+        timestamps = df["timestamp"].to_numpy(dtype=np.float64)
+        duration = float(np.nanmax(timestamps) - np.nanmin(timestamps))
+
+    with warnings.catch_warnings():
+        # columns without any value yield NaN statistics
+        warnings.simplefilter("ignore", category=RuntimeWarning)
+        minimums = np.nanmin(values, axis=0)
+        maximums = np.nanmax(values, axis=0)
+        means = np.nanmean(values, axis=0)
+        stds = np.nanstd(values, axis=0)
+        percentiles = np.nanpercentile(values, PERCENTILES, axis=0)
+
+    # a value changes if it differs from the previous row, rows without a value on both sides do not count
+    changes = (values[1:] != values[:-1]) & ~(missing[1:] & missing[:-1])
+    change_counts = changes.sum(axis=0)
+
+    statistics = []
+    for i, column in enumerate(numeric_columns):
+        statistics.append(ColumnStatistics(
+            name=column,
+            count=int(counts[i]),
+            null_count=int(len(values) - counts[i]),
+            min=_to_float(minimums[i]),
+            max=_to_float(maximums[i]),
+            mean=_to_float(means[i]),
+            std=_to_float(stds[i]),
+            percentiles={f"p{p}": float(percentiles[j, i]) for j, p in enumerate(PERCENTILES)
+                         if not np.isnan(percentiles[j, i])},
+            sample_rate_hz=float(counts[i] - 1) / duration if duration > 0 and counts[i] > 1 else None,
+            change_rate_hz=float(change_counts[i]) / duration if duration > 0 else None,
+        ))
+    return statistics
+
+
+def read_statistics(csv_path: str | Path) -> Optional[Dict[str, ColumnStatistics]]:
+    """
+    Read the statistics of a recording.
+    :return: The statistics keyed by column name, or None if there are no statistics for the current recording.
+    """
+    statistics_path = get_statistics_path(csv_path)
+    if not statistics_path.exists() or not Path(csv_path).exists():
+        return None
+    try:
+        with open(statistics_path, "r") as f:
+            data = json.load(f)
+        if (data.get("format") != STATISTICS_FORMAT_VERSION or
+                data.get("fingerprint") != get_file_fingerprint(csv_path)):
+            return None
+        return {column["name"]: ColumnStatistics.model_validate(column) for column in data.get("columns", [])}
+    except (json.JSONDecodeError, ValidationError, OSError) as e:
+        logger.warning(f"Failed to read column statistics {statistics_path}: {e}")
+        return None
+
+
+def write_statistics(csv_path: str | Path, statistics: List[ColumnStatistics]) -> Path:
+    statistics_path = get_statistics_path(csv_path)
+    temp_path = statistics_path.with_name(statistics_path.name + ".tmp")
+    with open(temp_path, "w") as f:
+        json.dump({
+            "format": STATISTICS_FORMAT_VERSION,
+            "fingerprint": get_file_fingerprint(csv_path),
+            "columns": [column.model_dump() for column in statistics]
+        }, f, indent=2)
+    os.replace(temp_path, statistics_path)
+    logger.info(f"Column statistics written: {statistics_path}")
+    return statistics_path
@@ -0,0 +1,135 @@
+import logging
+from pathlib import Path
+from typing import Iterator, List, Literal, Optional, Tuple
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.csv as pa_csv
+
+logger = logging.getLogger('uvicorn.error')
+
+CsvReaderName = Literal["pandas", "arrow"]
+
+
+class CsvReader:
+    """
+    Backend that parses recording CSV files. The second row of a recording contains the units and is skipped.
+    The values are returned as they are in the file, see recordingCache.read_recording_csv for the cleanup.
+    """
+
+    name: CsvReaderName
+
+    def read(self, csv_path: str | Path, columns: Optional[List[str]] = None,
+             nrows: Optional[int] = None) -> pd.DataFrame:
+        """
+        Parse a recording CSV file.
+        :param csv_path: Path of the recording CSV file.
+        :param columns: Columns of the CSV file to parse. If None, all columns are parsed.
+        :param nrows: Number of rows to parse. If None, all rows are parsed.
+        """
+        raise NotImplementedError
+
+    def read_chunks(self, csv_path: str | Path, chunk_rows: int) -> Iterator[Tuple[pd.DataFrame, int]]:
+        """
+        Parse a recording CSV file in chunks of about chunk_rows rows.
+        :return: An iterator over the parsed chunks and the number of bytes of the file read so far.
+        """
+        raise NotImplementedError
+
+
+class PandasCsvReader(CsvReader):
+    """
+    Single-threaded parser of pandas.
+    """
+
+    name = "pandas"
+
+    def read(self, csv_path: str | Path, columns: Optional[List[str]] = None,
+             nrows: Optional[int] = None) -> pd.DataFrame:
+        return pd.read_csv(csv_path, skiprows=[1], usecols=columns, nrows=nrows)
+
+    def read_chunks(self, csv_path: str | Path, chunk_rows: int) -> Iterator[Tuple[pd.DataFrame, int]]:
+        with open(csv_path, "rb") as f:
+            with pd.read_csv(f, skiprows=[1], chunksize=chunk_rows) as reader:
+                for chunk in reader:
+                    yield chunk, f.tell()
+
+
+class ArrowCsvReader(CsvReader):
+    """
+    Multi-threaded parser of pyarrow. Blocks of the file are parsed on all cores in parallel.
+    When reading in chunks, the column types are inferred from the first block of the file.
+    """
+
+    name = "arrow"
+
+    # bytes per block, large blocks give a better type inference when reading in chunks
+    BLOCK_SIZE = 16 * 1024 * 1024
+
+    def read(self, csv_path: str | Path, columns: Optional[List[str]] = None,
+             nrows: Optional[int] = None) -> pd.DataFrame:
+        if nrows is not None:
+            # only the first blocks are parsed
+            batches = []
+            with pa_csv.open_csv(csv_path, read_options=self._read_options(),
+                                 convert_options=self._convert_options(columns)) as reader:
+                schema = reader.schema
+                row_count = 0
+                for batch in reader:
+                    batches.append(batch)
+                    row_count += batch.num_rows
+                    if row_count >= nrows:
+                        break
+            return self._to_pandas(pa.Table.from_batches(batches, schema).slice(0, nrows))
+
+        table = pa_csv.read_csv(csv_path, read_options=self._read_options(),
+                                convert_options=self._convert_options(columns))
+        return self._to_pandas(table)
+
+    def read_chunks(self, csv_path: str | Path, chunk_rows: int) -> Iterator[Tuple[pd.DataFrame, int]]:
+        with open(csv_path, "rb") as f:
+            with pa_csv.open_csv(f, read_options=self._read_options(),
+                                 convert_options=self._convert_options()) as reader:
+                batches = []
+                row_count = 0
+                for batch in reader:
+                    batches.append(batch)
+                    row_count += batch.num_rows
+                    if row_count >= chunk_rows:
+                        yield self._to_pandas(pa.Table.from_batches(batches)), f.tell()
+                        batches, row_count = [], 0
+                if batches:
+                    yield self._to_pandas(pa.Table.from_batches(batches)), f.tell()
+
+    def _read_options(self) -> pa_csv.ReadOptions:
+        # the row after the column names holds the units
+        return pa_csv.ReadOptions(skip_rows_after_names=1, use_threads=True, block_size=self.BLOCK_SIZE)
+
+    @staticmethod
+    def _convert_options(columns: Optional[List[str]] = None) -> pa_csv.ConvertOptions:
+        return pa_csv.ConvertOptions(include_columns=columns) if columns is not None else pa_csv.ConvertOptions()
+
+    @staticmethod
+    def _to_pandas(table: pa.Table) -> pd.DataFrame:
+        # columns without any value are parsed as null type, pandas parses them as float
+        for i, field in enumerate(table.schema):
+            if pa.types.is_null(field.type):
+                table = table.set_column(i, field.name, table.column(i).cast(pa.float64()))
+        return table.to_pandas()
+
+
+CSV_READERS = {
+    PandasCsvReader.name: PandasCsvReader,
+    ArrowCsvReader.name: ArrowCsvReader,
+}
+
+
+def get_csv_reader(name: CsvReaderName | None = None) -> CsvReader:
+    """
+    Create the reader backend with the given name, the pandas reader by default.
+    """
+    reader_class = CSV_READERS.get(name or PandasCsvReader.name)
+    if reader_class is None:
+        logger.warning(f"Unknown CSV reader {name}, using {PandasCsvReader.name}")
+        reader_class = PandasCsvReader
+    return reader_class()
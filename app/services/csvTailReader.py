@@ -0,0 +1,183 @@
+import csv
+import io
+import logging
+import os
+from pathlib import Path
+from threading import Lock
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from app.services.timestampIndex import TimestampIndex
+from app.services.vectorColumns import expand_vector_columns
+
+logger = logging.getLogger('uvicorn.error')
+
+
+class ColumnarBuffer:
+    """
+    Growable in-memory table with one contiguous array per column. Appending rows copies only the new rows,
+    the capacity of the arrays is doubled when they are full.
+    """
+
+    INITIAL_CAPACITY = 1024
+
+    def __init__(self):
+        self.length = 0
+        self._capacity = 0
+        self._columns: Dict[str, np.ndarray] = {}
+
+    @property
+    def columns(self) -> List[str]:
+        return list(self._columns)
+
+    def append(self, df: pd.DataFrame):
+        if df.empty:
+            return
+        new_length = self.length + len(df)
+        if new_length > self._capacity:
+            self._grow(max(new_length, 2 * self._capacity, self.INITIAL_CAPACITY))
+
+        for column in df.columns:
+            values = df[column].to_numpy()
+            target = self._columns.get(column)
+            if target is None:
+                # a column that was not there before, earlier rows have no value
+                target = self._empty(values.dtype, self._capacity)
+            elif (values.dtype == object) != (target.dtype == object):
+                # text in a numeric column or the other way round
+                target = target.astype(object)
+            target[self.length:new_length] = values
+            self._columns[column] = target
+
+        for column, target in self._columns.items():
+            if column not in df.columns:
+                target[self.length:new_length] = None if target.dtype == object else np.nan
+
+        self.length = new_length
+
+    def get(self, column: str) -> np.ndarray:
+        """
+        Get a view of the filled part of a column.
+        """
+        return self._columns[column][:self.length]
+
+    def to_frame(self, columns: List[str], rows: slice | np.ndarray | None = None) -> pd.DataFrame:
+        rows = slice(None) if rows is None else rows
+        return pd.DataFrame({column: self.get(column)[rows] for column in columns if column in self._columns})
+
+    def clear(self):
+        self.length = 0
+        self._capacity = 0
+        self._columns = {}
+
+    def _grow(self, capacity: int):
+        for column, values in self._columns.items():
+            grown = self._empty(values.dtype, capacity)
+            grown[:self.length] = values[:self.length]
+            self._columns[column] = grown
+        self._capacity = capacity
+
+    @staticmethod
+    def _empty(dtype: np.dtype, capacity: int) -> np.ndarray:
+        if dtype == object:
+            return np.full(capacity, None, dtype=object)
+        # numeric columns are stored as float64, so rows without a value can be NaN
+        return np.full(capacity, np.nan, dtype=np.float64)
+
+
+class CsvTailReader:
+    """
+    Incremental reader for a CSV file that is still being written, like the recording of a live test drive.
+    It remembers how far the file has been read and parses only the complete lines appended since then.
+    """
+
+    def __init__(self, csv_path: str | Path):
+        self.csv_path = Path(csv_path)
+        self.offset = 0
+        self.header: Optional[List[str]] = None
+        self.buffer = ColumnarBuffer()
+        self.rows_read = 0
+        self._timestamps_sorted = True
+        self._lock = Lock()
+
+    def update(self) -> int:
+        """
+        Parse the lines appended to the file since the last update.
+        :return: The number of new rows.
+        """
+        with self._lock:
+            if not self.csv_path.exists():
+                return 0
+            size = os.path.getsize(self.csv_path)
+            if size < self.offset:
+                logger.info(f"{self.csv_path} was truncated, reading it again")
+                self._reset()
+            if size == self.offset:
+                return 0
+
+            with open(self.csv_path, "rb") as f:
+                f.seek(self.offset)
+                data = f.read(size - self.offset)
+
+            # only complete lines are parsed, the rest is read again with the next update
+            end = data.rfind(b"\n") + 1
+            if end == 0:
+                return 0
+            data = data[:end]
+
+            if self.header is None:
+                header_end = data.find(b"\n") + 1
+                self.header = next(csv.reader([data[:header_end].decode()]))
+                self.offset += header_end
+                data = data[header_end:]
+            self.offset += len(data)
+
+            if not data.strip():
+                return 0
+
+            df = pd.read_csv(io.BytesIO(data), header=None, names=self.header)
+            self._append(expand_vector_columns(df))
+            return len(df)
+
+    def get_columns(self, columns: List[str], start: Optional[float] = None,
+                    end: Optional[float] = None) -> pd.DataFrame:
+        """
+        Get columns of the rows read so far, optionally limited to a time range.
+        """
+        with self._lock:
+            rows = None
+            if (start is not None or end is not None) and "timestamp" in self.buffer.columns:
+                rows = self._rows(start, end)
+            return self.buffer.to_frame(columns, rows)
+
+    def sample(self) -> pd.DataFrame:
+        """
+        Get the first row read so far, e.g. to describe the columns.
+        """
+        with self._lock:
+            return self.buffer.to_frame(self.buffer.columns, slice(0, 1))
+
+    def _rows(self, start: Optional[float], end: Optional[float]) -> slice | np.ndarray:
+        timestamps = self.buffer.get("timestamp")
+        if not self._timestamps_sorted:
+            return TimestampIndex(timestamps).rows(start, end)
+        lower = 0 if start is None else int(np.searchsorted(timestamps, start, side="left"))
+        upper = len(timestamps) if end is None else int(np.searchsorted(timestamps, end, side="right"))
+        return slice(lower, max(lower, upper))
+
+    def _append(self, df: pd.DataFrame):
+        if "timestamp" in df.columns and self._timestamps_sorted and not df.empty:
+            timestamps = df["timestamp"].to_numpy(dtype=np.float64)
+            previous = self.buffer.get("timestamp")[-1:] if "timestamp" in self.buffer.columns else []
+            self._timestamps_sorted = bool(np.all(np.diff(np.concatenate([previous, timestamps])) >= 0))
+        self.buffer.append(df)
+        self.rows_read += len(df)
+
+    def _reset(self):
+        self.offset = 0
+        self.header = None
+        self.buffer.clear()
+        self.rows_read = 0
+        self._timestamps_sorted = True
@@ -0,0 +1,104 @@
+import logging
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from app.models.liveDataRow import FIELD_NAME_MAP, get_double, get_float, get_int, get_quaternion, get_vector3, \
+    get_vector3d_double
+
+logger = logging.getLogger('uvicorn.error')
+
+# The getters of FIELD_NAME_MAP as the method of the panthera field they call, so the plan can call the bound
+# method directly instead of going through the getter for every value.
+_SCALAR_ACCESSORS: Dict[Callable, Tuple[str, Callable]] = {
+    get_float: ("GetFloat", float),
+    get_double: ("GetDouble", float),
+    get_int: ("GetInt", int),
+}
+_VECTOR_ACCESSORS: Dict[Callable, str] = {
+    get_quaternion: "GetQuaternion",
+    get_vector3: "GetVector3",
+    get_vector3d_double: "GetVector3Double",
+}
+# arguments of the vector getters of panthera
+_VECTOR_ARGUMENTS = (0.0, 0.0)
+
+
+class ExtractionPlan:
+    """
+    Flat list of the reads that turn the resolved panthera fields into a live sample, compiled once when the
+    simulation starts. Scalar and vector fields are grouped, each is read with the bound method of its field.
+    Fields with a getter that is not known here are read with the getter itself.
+    A field that fails to read is logged once and removed from the plan.
+    """
+
+    def __init__(self, scalars: List[Tuple[str, Callable[[], Any], Callable]],
+                 vectors: List[Tuple[str, Callable[..., Any]]],
+                 others: List[Tuple[str, Callable, Any]]):
+        """
+        :param scalars: Name, bound accessor and cast of each scalar field.
+        :param vectors: Name and bound accessor of each vector field.
+        :param others: Name, getter and panthera field of each field read with its getter.
+        """
+        self.scalars = scalars
+        self.vectors = vectors
+        self.others = others
+
+    @classmethod
+    def compile(cls, fields: Dict[str, Any],
+                field_map: Sequence[Tuple[str, Optional[Callable]]] = FIELD_NAME_MAP) -> "ExtractionPlan":
+        """
+        Compile the plan for the resolved fields, in the order of the field map.
+        :param fields: The resolved panthera fields by name, fields that were not found are left out.
+        """
+        scalars, vectors, others = [], [], []
+        for name, getter in field_map:
+            field = fields.get(name)
+            if field is None or getter is None:
+                continue
+            if getter in _SCALAR_ACCESSORS:
+                method, cast = _SCALAR_ACCESSORS[getter]
+                scalars.append((name, getattr(field, method), cast))
+            elif getter in _VECTOR_ACCESSORS:
+                vectors.append((name, getattr(field, _VECTOR_ACCESSORS[getter])))
+            else:
+                others.append((name, getter, field))
+        return cls(scalars, vectors, others)
+
+    def __len__(self) -> int:
+        return len(self.scalars) + len(self.vectors) + len(self.others)
+
+    def extract(self) -> Dict[str, Any]:
+        """
+        Read a sample. Runs once per simulation step.
+        """
+        data = {}
+        try:
+            for name, accessor, cast in self.scalars:
+                data[name] = cast(accessor())
+            for name, accessor in self.vectors:
+                data[name] = [float(value) for value in accessor(*_VECTOR_ARGUMENTS)]
+            for name, getter, field in self.others:
+                data[name] = getter(field)
+        except Exception:
+            # only taken when a field fails, which is then removed
+            return self._extract_checked()
+        return data
+
+    def _extract_checked(self) -> Dict[str, Any]:
+        data = {}
+        self.scalars = [entry for entry in self.scalars
+                        if _read_checked(data, entry[0], lambda: entry[2](entry[1]()))]
+        self.vectors = [entry for entry in self.vectors
+                        if _read_checked(data, entry[0],
+                                         lambda: [float(value) for value in entry[1](*_VECTOR_ARGUMENTS)])]
+        self.others = [entry for entry in self.others
+                       if _read_checked(data, entry[0], lambda: entry[1](entry[2]))]
+        return data
+
+
+def _read_checked(data: Dict[str, Any], name: str, read: Callable[[], Any]) -> bool:
+    try:
+        data[name] = read()
+        return True
+    except Exception as e:
+        logger.warning(f"Reading field {name} failed, it is left out of the live data: {e}")
+        return False
@@ -1,10 +1,16 @@
 import logging
 import os
 import sys
+import threading
+import time
 
 import panthera as pt
 
 from ...models.liveDataRow import FIELD_NAME_MAP
+from ...models.stepStatistics import StepStatistics
+from ..backgroundTasks.trackedEvent import TrackedEvent
+from .extractionPlan import ExtractionPlan
+from .stepTimer import StepTimer
 
 
 # Suppress stdout and stderr output
@@ -51,8 +57,8 @@ class Process(pt.Process):
         self.logger = logging.getLogger("uvicorn.error")
 
         # Step at 10Hz
-        self.step = 0.1
-        self.SetWaitTimeout(self.step)
+        self.step_interval = 0.1
+        self.SetWaitTimeout(self.step_interval)
         self.t = None
         self.counter = 0
         self.prevState = "stopped"
@@ -60,6 +66,10 @@ class Process(pt.Process):
         self.update_measurement_callback = update_measurement_callback
 
         self.resolved_fields = {}
+        self.extraction_plan = ExtractionPlan([], [], [])
+        self.step_timer = StepTimer(self.step_interval)
+        self._stop_event = TrackedEvent()
+        self._thread = None
 
         self.operator = pt.Operator(sdk, "tagging-dashboard")
         self.operator.Connect(self.GetMqttBrokerHostname(), "operator", "operator")
@@ -71,9 +81,25 @@ class Process(pt.Process):
 
     def run(self):
         """ Main function """
-        while self.GetState() != pt.ProcessState_Offline:
+        while self.GetState() != pt.ProcessState_Offline and not self._stop_event.is_set():
             self.step()
 
+    def start(self):
+        """ Run the process in a background thread """
+        if self._thread is None:
+            self._thread = threading.Thread(target=self.run, daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        """ Stop the background thread after the current step """
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+
+    def get_statistics(self) -> StepStatistics:
+        """ Time spent in Python per step """
+        return self.step_timer.get_statistics()
+
     def step(self):
         """ Perform one simulation step """
         super().Step()
@@ -93,16 +119,14 @@ class Process(pt.Process):
         if self.GetState() != pt.ProcessState_Run:
             return
 
-        data = {}
-
-        for field_name, field in self.resolved_fields.items():
-            transform = dict(FIELD_NAME_MAP).get(field_name)
-            self.safe_assign(data, field_name, field, transform)
-
+        started = time.perf_counter()
+        data = self.extraction_plan.extract()
         data["timestamp"] = self.GetCurrentTime()
+        read = time.perf_counter()
 
         if self.update_measurement_callback:
             self.update_measurement_callback(data)
+        self.step_timer.record(read - started, time.perf_counter() - read)
 
     def find_fields(self):
         """ Find the fields in the named struct interface to the process """
@@ -111,29 +135,19 @@ class Process(pt.Process):
 
         self.resolved_fields = {}
 
-        for field_name, _ in FIELD_NAME_MAP:
+        # fields without a transform are never read
+        field_names = [f for f, transform in FIELD_NAME_MAP if transform is not None]
+        for field_name in field_names:
             field = self.findFieldChecked(field_name, ns)
             if field:
                 self.resolved_fields[field_name] = field
 
-        missing = [f for f, _ in FIELD_NAME_MAP if f not in self.resolved_fields]
+        missing = [f for f in field_names if f not in self.resolved_fields]
         if missing:
             self.logger.warning(f"Missing Panthera fields: {missing}")
 
-    def safe_assign(self, target_dict, key, field, transform):
-        """ Safely assign a field to a dictionary, handling errors and logging """
-        if field is None:
-            self.logger.warning(f"Cannot assign {key} - field is None.")
-            return
-
-        if transform is None:
-            self.logger.warning(f"Cannot assign {field} to {key} - no transform provided.")
-            return
-
-        try:
-            target_dict[key] = transform(field)
-        except Exception as e:
-            self.logger.warning(f"Transform error on field {key}: {e}")
+        self.extraction_plan = ExtractionPlan.compile(self.resolved_fields)
+        self.logger.info(f"Reading {len(self.extraction_plan)} Panthera fields per step")
 
     @staticmethod
     def findFieldChecked(field_name, ns):
@@ -148,4 +162,5 @@ class Process(pt.Process):
 def start_process(update_measurement_callback=None):
     sdk = pt.Initialize("python_application")
     process = Process(sdk, update_measurement_callback)
-    process.run()
+    process.start()
+    return process
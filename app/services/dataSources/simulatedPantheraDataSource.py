@@ -2,7 +2,9 @@ import threading
 import time
 
 from app.models.liveDataRow import create_random_instance
+from app.models.stepStatistics import StepStatistics
 from app.services.backgroundTasks.trackedEvent import TrackedEvent
+from app.services.dataSources.stepTimer import StepTimer
 
 
 class MockProcess:
@@ -12,6 +14,7 @@ class MockProcess:
         self._stop_event = TrackedEvent()
         self._thread = None
         self._timestamp = 0
+        self.step_timer = StepTimer(interval_seconds)
 
     def start(self):
         if self._thread is None:
@@ -23,14 +26,20 @@ class MockProcess:
         if self._thread is not None:
             self._thread.join(timeout=5)
 
+    def get_statistics(self) -> StepStatistics:
+        return self.step_timer.get_statistics()
+
     def _run_loop(self):
         while not self._stop_event.is_set():
+            started = time.perf_counter()
             instance = create_random_instance()
             instance["timestamp"] = self._timestamp  # simulated timestamp
             self._timestamp += self.interval_seconds  # advance "virtual clock"
+            read = time.perf_counter()
 
             if self.update_measurement_callback:
                 self.update_measurement_callback(instance)
+            self.step_timer.record(read - started, time.perf_counter() - read)
 
             time.sleep(self.interval_seconds)
 
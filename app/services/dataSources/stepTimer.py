@@ -0,0 +1,51 @@
+from threading import Lock
+
+from app.models.stepStatistics import StepStatistics
+
+
+class StepTimer:
+    """
+    Collects the time the live data sources spend in Python per step: reading the sample and handing it to the
+    callback, which buffers, records and broadcasts it.
+    """
+
+    def __init__(self, interval: float):
+        """
+        :param interval: The time between two steps in seconds.
+        """
+        self.interval = interval
+        self._lock = Lock()
+        self.steps = 0
+        self.overruns = 0
+        self.last_read_ms = 0.0
+        self.max_read_ms = 0.0
+        self.last_callback_ms = 0.0
+        self.max_callback_ms = 0.0
+        self._total_read_ms = 0.0
+        self._total_callback_ms = 0.0
+
+    def record(self, read_seconds: float, callback_seconds: float):
+        read_ms = read_seconds * 1000
+        callback_ms = callback_seconds * 1000
+        with self._lock:
+            self.steps += 1
+            if read_seconds + callback_seconds > self.interval:
+                self.overruns += 1
+            self.last_read_ms = read_ms
+            self.max_read_ms = max(self.max_read_ms, read_ms)
+            self._total_read_ms += read_ms
+            self.last_callback_ms = callback_ms
+            self.max_callback_ms = max(self.max_callback_ms, callback_ms)
+            self._total_callback_ms += callback_ms
+
+    def get_statistics(self) -> StepStatistics:
+        with self._lock:
+            if not self.steps:
+                return StepStatistics(interval_ms=self.interval * 1000)
+            mean_read_ms = self._total_read_ms / self.steps
+            mean_callback_ms = self._total_callback_ms / self.steps
+            return StepStatistics(
+                steps=self.steps, interval_ms=self.interval * 1000, last_read_ms=self.last_read_ms,
+                mean_read_ms=mean_read_ms, max_read_ms=self.max_read_ms, last_callback_ms=self.last_callback_ms,
+                mean_callback_ms=mean_callback_ms, max_callback_ms=self.max_callback_ms,
+                busy_percent=(mean_read_ms + mean_callback_ms) / (self.interval * 10), overruns=self.overruns)
@@ -0,0 +1,29 @@
+from typing import Hashable, Tuple
+
+from app.services.lruCache import LruCache
+from app.services.recordingDataSet import RecordingDataSet
+
+DatasetKey = Tuple[Hashable, str]
+
+
+class DatasetCache(LruCache[RecordingDataSet]):
+    """
+    Least recently used cache of loaded test drive data sets, keyed by project id and file fingerprint.
+    The memory of a data set is the memory of its cached columns, timestamp index and downsampling pyramids.
+    It grows while columns are loaded, so the limit is checked again whenever a data set is added.
+    Evicting a data set also drops its columns from the column cache.
+    """
+
+    def __init__(self, max_bytes: int, max_entries: int):
+        super().__init__("data set cache", max_bytes, max_entries)
+
+    def _size_of(self, dataset: RecordingDataSet) -> int:
+        return dataset.memory_usage
+
+    def _on_removed(self, key: DatasetKey, dataset: RecordingDataSet):
+        dataset.release()
+
+    @property
+    def current_bytes(self) -> int:
+        # measured again, the size at the time a data set was added is outdated once it loads columns
+        return sum(dataset.memory_usage for dataset in list(self._entries.values()))
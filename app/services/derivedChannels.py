@@ -0,0 +1,333 @@
+import ast
+import hashlib
+import logging
+import operator
+from dataclasses import dataclass, field
+from threading import Lock
+from typing import Callable, Dict, Iterable, List, Optional
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger('uvicorn.error')
+
+# functions and constants that may be used in the expression of a derived channel
+EXPRESSION_FUNCTIONS: Dict[str, Callable] = {
+    "abs": np.abs,
+    "sqrt": np.sqrt,
+    "exp": np.exp,
+    "log": np.log,
+    "log10": np.log10,
+    "sin": np.sin,
+    "cos": np.cos,
+    "tan": np.tan,
+    "arcsin": np.arcsin,
+    "arccos": np.arccos,
+    "arctan": np.arctan,
+    "arctan2": np.arctan2,
+    "hypot": np.hypot,
+    "degrees": np.degrees,
+    "radians": np.radians,
+    "minimum": np.minimum,
+    "maximum": np.maximum,
+    "clip": np.clip,
+    "where": np.where,
+    "gradient": np.gradient,
+}
+EXPRESSION_CONSTANTS: Dict[str, float] = {
+    "pi": np.pi,
+    "e": np.e,
+}
+_BINARY_OPERATORS = {
+    ast.Add: operator.add,
+    ast.Sub: operator.sub,
+    ast.Mult: operator.mul,
+    ast.Div: operator.truediv,
+    ast.FloorDiv: operator.floordiv,
+    ast.Mod: operator.mod,
+    ast.Pow: operator.pow,
+}
+_UNARY_OPERATORS = {
+    ast.UAdd: operator.pos,
+    ast.USub: operator.neg,
+}
+_COMPARE_OPERATORS = {
+    ast.Lt: operator.lt,
+    ast.LtE: operator.le,
+    ast.Gt: operator.gt,
+    ast.GtE: operator.ge,
+    ast.Eq: operator.eq,
+    ast.NotEq: operator.ne,
+}
+
+
+class SafeExpression:
+    """
+    Arithmetic expression over columns, e.g. "sqrt(vel_x**2 + vel_y**2)". Only numbers, column names,
+    arithmetic and comparison operators and the functions in EXPRESSION_FUNCTIONS are allowed, so an expression
+    can neither access attributes nor call anything else.
+    """
+
+    def __init__(self, expression: str):
+        self.expression = expression
+        try:
+            self._tree = ast.parse(expression, mode="eval").body
+        except SyntaxError as e:
+            raise ValueError(f"Invalid expression {expression!r}: {e.msg}") from None
+        self.inputs: List[str] = []
+        self._check(self._tree)
+
+    def evaluate(self, columns: Dict[str, np.ndarray]) -> np.ndarray:
+        """
+        Evaluate the expression on whole columns at once.
+        :param columns: The values of the input columns.
+        """
+        with np.errstate(all="ignore"):
+            return self._evaluate(self._tree, columns)
+
+    def _check(self, node: ast.AST):
+        if isinstance(node, ast.Constant):
+            if not isinstance(node.value, (int, float)) or isinstance(node.value, bool):
+                raise ValueError(f"Only numbers are allowed as constants, not {node.value!r}")
+        elif isinstance(node, ast.Name):
+            if node.id not in EXPRESSION_CONSTANTS and node.id not in self.inputs:
+                self.inputs.append(node.id)
+        elif isinstance(node, ast.BinOp) and type(node.op) in _BINARY_OPERATORS:
+            self._check(node.left)
+            self._check(node.right)
+        elif isinstance(node, ast.UnaryOp) and type(node.op) in _UNARY_OPERATORS:
+            self._check(node.operand)
+        elif isinstance(node, ast.Compare) and len(node.ops) == 1 and type(node.ops[0]) in _COMPARE_OPERATORS:
+            self._check(node.left)
+            self._check(node.comparators[0])
+        elif isinstance(node, ast.Call):
+            if not isinstance(node.func, ast.Name) or node.func.id not in EXPRESSION_FUNCTIONS:
+                raise ValueError(f"Unknown function in expression {self.expression!r}")
+            if node.keywords:
+                raise ValueError("Keyword arguments are not allowed in expressions")
+            for argument in node.args:
+                self._check(argument)
+        else:
+            raise ValueError(f"{type(node).__name__} is not allowed in expressions")
+
+    def _evaluate(self, node: ast.AST, columns: Dict[str, np.ndarray]):
+        if isinstance(node, ast.Constant):
+            # floats overflow instead of growing without limit like integers, e.g. in 9**9**9
+            return float(node.value)
+        if isinstance(node, ast.Name):
+            return EXPRESSION_CONSTANTS[node.id] if node.id in EXPRESSION_CONSTANTS else columns[node.id]
+        if isinstance(node, ast.BinOp):
+            return _BINARY_OPERATORS[type(node.op)](self._evaluate(node.left, columns),
+                                                    self._evaluate(node.right, columns))
+        if isinstance(node, ast.UnaryOp):
+            return _UNARY_OPERATORS[type(node.op)](self._evaluate(node.operand, columns))
+        if isinstance(node, ast.Compare):
+            return _COMPARE_OPERATORS[type(node.ops[0])](self._evaluate(node.left, columns),
+                                                         self._evaluate(node.comparators[0], columns))
+        # only calls are left after _check
+        return EXPRESSION_FUNCTIONS[node.func.id](*(self._evaluate(argument, columns) for argument in node.args))
+
+
+@dataclass(frozen=True)
+class DerivedChannel:
+    """
+    A channel computed from other columns of a test drive.
+    The function receives the input columns in order as float64 arrays and returns one value per row.
+    """
+    name: str
+    inputs: List[str]
+    function: Callable[..., np.ndarray] = field(compare=False)
+    description: str = ""
+    expression: Optional[str] = None
+
+    @property
+    def version(self) -> str:
+        """
+        Identifies the definition of the channel, computed values of an older definition are not reused.
+        """
+        definition = self.expression or f"{self.function.__module__}.{self.function.__qualname__}"
+        return hashlib.sha1(f"{self.name}|{','.join(self.inputs)}|{definition}".encode()).hexdigest()[:12]
+
+    def compute(self, columns: Dict[str, np.ndarray]) -> np.ndarray:
+        length = len(columns[self.inputs[0]]) if self.inputs else 0
+        try:
+            values = self.function(*(columns[name] for name in self.inputs))
+            # constant expressions yield a scalar, values of another shape, e.g. of where(condition), are rejected
+            return np.broadcast_to(np.asarray(values, dtype=np.float64), (length,)).copy()
+        except (ValueError, TypeError, ArithmeticError) as e:
+            # e.g. a gradient over less than two rows
+            logger.warning(f"Failed to compute derived channel {self.name}: {e}")
+            return np.full(length, np.nan)
+
+
+def quaternion_yaw(w: np.ndarray, x: np.ndarray, y: np.ndarray, z: np.ndarray) -> np.ndarray:
+    """
+    Rotation about the vertical z axis of a quaternion in degrees.
+    """
+    return np.degrees(np.arctan2(2.0 * (w * z + x * y), 1.0 - 2.0 * (y * y + z * z)))
+
+
+class DerivedChannelRegistry:
+    """
+    The derived channels known to the application. Channels whose inputs are missing in a test drive are not
+    offered for it.
+    """
+
+    def __init__(self, reserved_names: Iterable[str] = ()):
+        """
+        :param reserved_names: Names of recorded columns, channels with these names are rejected because they would
+            hide the recorded values.
+        """
+        self._channels: Dict[str, DerivedChannel] = {}
+        self.reserved_names = set(reserved_names)
+        self._lock = Lock()
+
+    @property
+    def version(self) -> str:
+        """
+        Identifies the set of registered channels, it changes whenever a channel is added, replaced or removed.
+        """
+        with self._lock:
+            versions = ",".join(channel.version for channel in self._channels.values())
+        return hashlib.sha1(versions.encode()).hexdigest()[:12]
+
+    def register_function(self, name: str, inputs: List[str], function: Callable[..., np.ndarray],
+                          description: str = "") -> DerivedChannel:
+        """
+        Register a channel computed by a vectorized function of its input columns.
+        """
+        return self._register(DerivedChannel(name, list(inputs), function, description))
+
+    def register_expression(self, name: str, expression: str, description: str = "") -> DerivedChannel:
+        """
+        Register a channel computed by an expression, see SafeExpression.
+        :raises ValueError: If the name or the expression is invalid.
+        """
+        parsed = SafeExpression(expression)
+        if not parsed.inputs:
+            raise ValueError(f"Expression {expression!r} does not use any column")
+        inputs = parsed.inputs
+
+        def evaluate(*values: np.ndarray) -> np.ndarray:
+            return parsed.evaluate(dict(zip(inputs, values)))
+
+        return self._register(DerivedChannel(name, inputs, evaluate, description, expression))
+
+    def unregister(self, name: str) -> bool:
+        with self._lock:
+            return self._channels.pop(name, None) is not None
+
+    def get(self, name: str) -> Optional[DerivedChannel]:
+        return self._channels.get(name)
+
+    def get_channels(self) -> List[DerivedChannel]:
+        with self._lock:
+            return list(self._channels.values())
+
+    def available_channels(self, columns: Iterable[str]) -> List[DerivedChannel]:
+        """
+        Get the channels that can be computed from the given columns, also from other derived channels.
+        """
+        available = set(columns)
+        channels = []
+        pending = [channel for channel in self.get_channels() if channel.name not in available]
+        while pending:
+            ready = [channel for channel in pending if all(name in available for name in channel.inputs)]
+            if not ready:
+                break
+            for channel in ready:
+                channels.append(channel)
+                available.add(channel.name)
+                pending.remove(channel)
+        return channels
+
+    def add_channels(self, df: pd.DataFrame, names: Iterable[str]) -> pd.DataFrame:
+        """
+        Add derived channels to data that contains their inputs, without memoizing them.
+        Used for live data, which grows with every update.
+        """
+        channels = {channel.name: channel for channel in self.available_channels(df.columns)}
+        for name in names:
+            for channel in self._dependencies(name, channels):
+                if channel.name not in df.columns:
+                    inputs = {column: df[column].to_numpy(dtype=np.float64) for column in channel.inputs}
+                    df[channel.name] = channel.compute(inputs)
+        return df
+
+    def resolve_inputs(self, names: Iterable[str]) -> List[str]:
+        """
+        Replace derived channels by the columns they are computed from, recursively.
+        """
+        resolved = []
+        for name in names:
+            channel = self.get(name)
+            if channel is None:
+                resolved.append(name)
+            else:
+                resolved.extend(self.resolve_inputs(channel.inputs))
+        return list(dict.fromkeys(resolved))
+
+    def _reaches(self, names: Iterable[str], target: str, channels: Dict[str, DerivedChannel],
+                 visited: set) -> bool:
+        """
+        Check if one of the channels reaches the target through their inputs.
+        """
+        for name in names:
+            if name == target:
+                return True
+            channel = channels.get(name)
+            if channel is None or name in visited:
+                continue
+            visited.add(name)
+            if self._reaches(channel.inputs, target, channels, visited):
+                return True
+        return False
+
+    def _dependencies(self, name: str, channels: Dict[str, DerivedChannel]) -> List[DerivedChannel]:
+        channel = channels.get(name)
+        if channel is None:
+            return []
+        dependencies = []
+        for input_name in channel.inputs:
+            dependencies.extend(self._dependencies(input_name, channels))
+        return dependencies + [channel]
+
+    def validate_name(self, name: str, columns: Iterable[str] = ()):
+        """
+        Check that a channel name can be requested like a column and does not hide a recorded column.
+        :param columns: Additional column names the channel may not use, e.g. of the active test drive.
+        :raises ValueError: If the name is not valid.
+        """
+        # the data endpoints take the requested columns as comma separated list
+        if not name.isidentifier():
+            raise ValueError(f"Derived channel name {name!r} is not a valid identifier")
+        if name in self.reserved_names or name in set(columns):
+            raise ValueError(f"Derived channel name {name!r} is the name of a recorded column")
+
+    def _register(self, channel: DerivedChannel) -> DerivedChannel:
+        self.validate_name(channel.name)
+        if channel.name in channel.inputs:
+            raise ValueError(f"Derived channel {channel.name} cannot use itself as input")
+        with self._lock:
+            channels = {**self._channels, channel.name: channel}
+            if self._reaches(channel.inputs, channel.name, channels, set()):
+                raise ValueError(f"Derived channel {channel.name} would depend on itself through its inputs")
+            self._channels[channel.name] = channel
+        logger.info(f"Derived channel {channel.name} registered")
+        return channel
+
+
+def register_default_channels(registry: DerivedChannelRegistry):
+    """
+    Register the derived channels the analysts use most.
+    """
+    registry.register_expression("car0_velocity_kmh", "car0_velocity * 3.6", "Velocity in km/h")
+    registry.register_expression(
+        "car0_vehicle_speed", "sqrt(car0_vehicle_vel_x**2 + car0_vehicle_vel_y**2 + car0_vehicle_vel_z**2)",
+        "Norm of the vehicle velocity in m/s")
+    registry.register_function(
+        "car0_vehicle_yaw", ["car0_vehicle_quat_w", "car0_vehicle_quat_x", "car0_vehicle_quat_y",
+                             "car0_vehicle_quat_z"],
+        quaternion_yaw, "Yaw angle of the vehicle in degrees")
+    registry.register_expression("lin_acc_jerk_x", "gradient(lin_acc_x, timestamp)",
+                                 "Longitudinal jerk in m/s³")
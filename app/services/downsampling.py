@@ -0,0 +1,143 @@
+import math
+from typing import List, Literal, Tuple
+
+import numpy as np
+
+DownsamplingMethod = Literal["minmax", "lttb"]
+
+# rows per bucket of the finest pyramid level and the factor between two levels
+PYRAMID_BASE_BUCKET_SIZE = 8
+PYRAMID_LEVEL_FACTOR = 4
+# LTTB selects its points from a min/max level with up to this many times the requested points
+LTTB_OVERSAMPLING = 4
+
+
+def min_max_envelope(values: np.ndarray, bucket_size: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Find the positions of the minimum and maximum value in consecutive buckets of values. NaN values are ignored.
+    :return: Positions of the minimum and the maximum of each bucket.
+    """
+    bucket_count = math.ceil(len(values) / bucket_size)
+    padded = np.full(bucket_count * bucket_size, np.nan)
+    padded[:len(values)] = values
+    padded = padded.reshape(bucket_count, bucket_size)
+
+    offsets = np.arange(bucket_count) * bucket_size
+    min_positions = offsets + np.argmin(np.where(np.isnan(padded), np.inf, padded), axis=1)
+    max_positions = offsets + np.argmax(np.where(np.isnan(padded), -np.inf, padded), axis=1)
+    return np.minimum(min_positions, len(values) - 1), np.minimum(max_positions, len(values) - 1)
+
+
+def interleave_envelope(min_positions: np.ndarray, max_positions: np.ndarray) -> np.ndarray:
+    """
+    Merge the minimum and maximum positions of the buckets into one array of positions in ascending order.
+    """
+    positions = np.sort(np.stack([min_positions, max_positions], axis=1), axis=1).ravel()
+    # buckets with a single value have the same minimum and maximum
+    return positions[np.concatenate(([True], positions[1:] != positions[:-1]))]
+
+
+def lttb(timestamps: np.ndarray, values: np.ndarray, threshold: int) -> np.ndarray:
+    """
+    Largest-Triangle-Three-Buckets downsampling.
+    :return: Positions of the selected points, always including the first and the last point.
+    """
+    length = len(values)
+    if threshold >= length or threshold < 3:
+        return np.arange(length)
+
+    selected = np.empty(threshold, dtype=np.int64)
+    selected[0] = 0
+    selected[-1] = length - 1
+
+    # the first and the last point form their own buckets
+    edges = np.linspace(1, length - 1, threshold - 1).astype(np.int64)
+    previous = 0
+    for i in range(threshold - 2):
+        bucket_start, bucket_end = edges[i], max(edges[i + 1], edges[i] + 1)
+        next_start, next_end = edges[i + 1], edges[i + 2] if i + 2 < len(edges) else length
+        next_end = max(next_end, next_start + 1)
+
+        average_t = timestamps[next_start:next_end].mean()
+        average_v = values[next_start:next_end].mean()
+
+        t = timestamps[bucket_start:bucket_end]
+        v = values[bucket_start:bucket_end]
+        areas = np.abs((timestamps[previous] - average_t) * (v - values[previous]) -
+                       (timestamps[previous] - t) * (average_v - values[previous]))
+        previous = bucket_start + int(np.argmax(areas))
+        selected[i + 1] = previous
+    return selected
+
+
+class DownsamplingPyramid:
+    """
+    Precomputed min/max envelopes of one column at decreasing resolutions.
+    Level k holds the positions of the minimum and maximum of buckets of
+    PYRAMID_BASE_BUCKET_SIZE * PYRAMID_LEVEL_FACTOR ** k rows, each level is built from the one below it.
+    The column values themselves are not kept, they stay in the column cache of the data set.
+    """
+
+    def __init__(self, values: np.ndarray):
+        self.row_count = len(values)
+        self.bucket_sizes: List[int] = []
+        self.levels: List[Tuple[np.ndarray, np.ndarray]] = []
+
+        if self.row_count == 0:
+            return
+
+        bucket_size = PYRAMID_BASE_BUCKET_SIZE
+        min_positions, max_positions = min_max_envelope(values, bucket_size)
+        min_values, max_values = values[min_positions], values[max_positions]
+        while True:
+            self.bucket_sizes.append(bucket_size)
+            self.levels.append((min_positions, max_positions))
+            if len(min_positions) <= 1:
+                break
+
+            # reduce the buckets of this level to the buckets of the next one
+            bucket_size *= PYRAMID_LEVEL_FACTOR
+            min_choice, _ = min_max_envelope(min_values, PYRAMID_LEVEL_FACTOR)
+            _, max_choice = min_max_envelope(max_values, PYRAMID_LEVEL_FACTOR)
+            min_positions, max_positions = min_positions[min_choice], max_positions[max_choice]
+            min_values, max_values = min_values[min_choice], max_values[max_choice]
+
+    @property
+    def memory_usage(self) -> int:
+        return sum(min_positions.nbytes + max_positions.nbytes for min_positions, max_positions in self.levels)
+
+    def positions(self, first_row: int, last_row: int, max_points: int) -> np.ndarray | None:
+        """
+        Get the positions of the envelope points between first_row (inclusive) and last_row (exclusive), taken from
+        the finest level with at most max_points points.
+        :return: The positions in ascending order, or None if the raw rows already fit into max_points.
+        """
+        if last_row - first_row <= max_points:
+            return None
+
+        for bucket_size, (min_positions, max_positions) in zip(self.bucket_sizes, self.levels):
+            first_bucket = first_row // bucket_size
+            last_bucket = math.ceil(last_row / bucket_size)
+            if 2 * (last_bucket - first_bucket) > max_points and bucket_size != self.bucket_sizes[-1]:
+                continue
+            positions = interleave_envelope(min_positions[first_bucket:last_bucket],
+                                            max_positions[first_bucket:last_bucket])
+            # the outer buckets may reach beyond the requested rows
+            return positions[(positions >= first_row) & (positions < last_row)]
+        return None
+
+
+def downsample(timestamps: np.ndarray, values: np.ndarray, max_points: int,
+               method: DownsamplingMethod = "minmax") -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Downsample a series without a precomputed pyramid, e.g. for live data that is still growing.
+    """
+    valid = ~np.isnan(values)
+    timestamps, values = timestamps[valid], values[valid]
+    if len(values) <= max_points:
+        return timestamps, values
+    if method == "lttb":
+        positions = lttb(timestamps, values, max_points)
+    else:
+        positions = interleave_envelope(*min_max_envelope(values, math.ceil(2 * len(values) / max_points)))
+    return timestamps[positions], values[positions]
@@ -0,0 +1,58 @@
+from typing import Any, Dict, Iterable, Iterator, List, Literal
+
+import numpy as np
+import orjson
+import pandas as pd
+
+from app.services.vectorColumns import find_vector_columns
+
+JSON_OPTIONS = orjson.OPT_SERIALIZE_NUMPY
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+
+JsonLayout = Literal["records", "columnar"]
+
+
+def to_columnar(df: pd.DataFrame, requested_columns: List[str]) -> Dict[str, Any]:
+    """
+    Convert data with split component columns to one array per column, ready for encode_json.
+    Numeric columns stay NumPy arrays, composite vector columns become arrays of shape (rows, components).
+    """
+    vector_columns = find_vector_columns(list(df.columns))
+    columns = {}
+    for name in dict.fromkeys(requested_columns):
+        if name in vector_columns:
+            columns[name] = np.column_stack([df[component].to_numpy(dtype=np.float64)
+                                             for component in vector_columns[name]])
+        elif name in df.columns:
+            values = df[name].to_numpy()
+            if values.dtype.kind in "iufb":
+                # the encoder only takes contiguous arrays, e.g. rows of an unsorted recording are not
+                columns[name] = np.ascontiguousarray(values)
+            else:
+                columns[name] = df[name].astype(object).where(df[name].notna(), None).tolist()
+    return columns
+
+
+def encode_json(content: Any) -> bytes:
+    """
+    Encode content to JSON. NumPy arrays are encoded natively without converting them to Python lists first,
+    NaN and infinite values become null.
+    """
+    return orjson.dumps(content, option=JSON_OPTIONS)
+
+
+def iter_ndjson(chunks: Iterable[pd.DataFrame], requested_columns: List[str],
+                layout: JsonLayout = "records") -> Iterator[bytes]:
+    """
+    Encode data chunk by chunk as newline delimited JSON. The records layout has one line per row, the columnar
+    layout one line per chunk with an array per column, see to_columnar.
+    :param chunks: The data in chunks, with split component columns for the columnar layout.
+    """
+    for chunk in chunks:
+        if chunk.empty:
+            continue
+        if layout == "columnar":
+            yield encode_json(to_columnar(chunk, requested_columns)) + b"\n"
+        else:
+            records = chunk.astype(object).where(chunk.notna(), None).to_dict(orient="records")
+            yield b"".join(encode_json(record) + b"\n" for record in records)
@@ -0,0 +1,141 @@
+import struct
+import zlib
+from typing import Any, Callable, Dict, List, Literal, Optional, Sequence, Tuple
+
+from app.models.liveDataRow import FIELD_NAME_MAP, get_double, get_float, get_int, get_quaternion, get_vector3, \
+    get_vector3d_double
+
+LiveFrameEncoding = Literal["json", "binary"]
+
+# values read with a float getter are float32 in the simulator, so they are sent as float32 without losing precision
+_FIELD_LAYOUTS: Dict[Callable, Tuple[str, int]] = {
+    get_float: ("f", 1),
+    get_double: ("d", 1),
+    get_int: ("d", 1),
+    get_quaternion: ("f", 4),
+    get_vector3: ("f", 3),
+    get_vector3d_double: ("d", 3),
+}
+_TYPE_NAMES = {"f": "float32", "d": "float64"}
+# binary frames start with the id of their schema
+_HEADER = "<I"
+
+
+class LiveFrameSchema:
+    """
+    Layout of the binary live data frames: the schema id as unsigned 32 bit integer followed by the values of all
+    fields at fixed offsets, little endian. Vector fields take one value per component, missing values are NaN.
+    The schema is sent once when a client connects, after that each frame carries only the values.
+    Delta frames start with the delta schema id, followed by a bit mask with one bit per field in schema order
+    (bit i % 8 of byte i // 8) and the values of the fields whose bit is set.
+    """
+
+    def __init__(self, fields: Sequence[Tuple[str, str, int]]):
+        """
+        :param fields: Name, struct type code ("f" or "d") and number of values of each field.
+        """
+        self.fields = list(fields)
+        self._struct = struct.Struct(_HEADER + "".join(code * size for _, code, size in self.fields))
+        self.id = zlib.crc32(repr(self.fields).encode())
+        self.delta_id = zlib.crc32(b"delta" + repr(self.fields).encode())
+        self._mask_size = (len(self.fields) + 7) // 8
+        self._missing = {size: [float("nan")] * size for _, _, size in self.fields}
+
+    @classmethod
+    def from_field_map(cls, field_map: Sequence[Tuple[str, Optional[Callable]]] = FIELD_NAME_MAP) -> "LiveFrameSchema":
+        """
+        Create the schema of the fields read from the simulator, fields without a transform are never read.
+        """
+        fields = [(name, *_FIELD_LAYOUTS.get(transform, ("d", 1))) for name, transform in field_map
+                  if transform is not None]
+        return cls(fields + [("timestamp", "d", 1)])
+
+    def select(self, names: Sequence[str]) -> "LiveFrameSchema":
+        """
+        Create the schema of a subset of the fields, in the order of this schema. The timestamp is always kept.
+        """
+        selected = set(names) | {"timestamp"}
+        return LiveFrameSchema([field for field in self.fields if field[0] in selected])
+
+    @property
+    def field_names(self) -> List[str]:
+        return [name for name, _, _ in self.fields]
+
+    @property
+    def frame_size(self) -> int:
+        return self._struct.size
+
+    def describe(self) -> Dict[str, Any]:
+        """
+        Describe the layout for clients, the message is sent as JSON before the first frame.
+        """
+        offset = struct.calcsize(_HEADER)
+        fields = []
+        for name, code, size in self.fields:
+            fields.append({"name": name, "type": _TYPE_NAMES[code], "size": size, "offset": offset})
+            offset += struct.calcsize(code) * size
+        return {"type": "schema", "schema_id": self.id, "delta_schema_id": self.delta_id,
+                "delta_mask_size": self._mask_size, "byte_order": "little", "frame_size": self.frame_size,
+                "fields": fields}
+
+    def encode(self, data: Dict[str, Any]) -> bytes:
+        """
+        Encode a live data sample, fields that are not in the schema are left out.
+        """
+        values = []
+        for name, _, size in self.fields:
+            self._append_value(values, data.get(name), size)
+        return self._struct.pack(self.id, *values)
+
+    def encode_delta(self, data: Dict[str, Any]) -> bytes:
+        """
+        Encode the fields of a sample that are in data as delta frame, the other fields are left out.
+        """
+        mask = 0
+        layout = [_HEADER, f"{self._mask_size}s"]
+        values = []
+        for index, (name, code, size) in enumerate(self.fields):
+            if name not in data:
+                continue
+            mask |= 1 << index
+            layout.append(code * size)
+            self._append_value(values, data[name], size)
+        return struct.pack("".join(layout), self.delta_id, mask.to_bytes(self._mask_size, "little"), *values)
+
+    def _append_value(self, values: list, value: Any, size: int):
+        if value is None:
+            values.extend(self._missing[size])
+        elif size == 1:
+            values.append(value)
+        else:
+            values.extend(value)
+
+    def decode(self, frame: bytes) -> Dict[str, Any]:
+        """
+        Decode a frame, the counterpart of encode and encode_delta for clients written in Python.
+        Delta frames are decoded to the fields they contain.
+        """
+        if struct.unpack_from(_HEADER, frame)[0] == self.delta_id:
+            return self._decode_delta(frame)
+        schema_id, *values = self._struct.unpack(frame)
+        if schema_id != self.id:
+            raise ValueError(f"Frame of schema {schema_id} cannot be decoded with schema {self.id}")
+        data = {}
+        position = 0
+        for name, _, size in self.fields:
+            data[name] = values[position] if size == 1 else values[position:position + size]
+            position += size
+        return data
+
+    def _decode_delta(self, frame: bytes) -> Dict[str, Any]:
+        offset = struct.calcsize(_HEADER)
+        mask = int.from_bytes(frame[offset:offset + self._mask_size], "little")
+        offset += self._mask_size
+        data = {}
+        for index, (name, code, size) in enumerate(self.fields):
+            if not mask & (1 << index):
+                continue
+            values = struct.unpack_from("<" + code * size, frame, offset)
+            offset += struct.calcsize("<" + code * size)
+            data[name] = values[0] if size == 1 else list(values)
+        return data
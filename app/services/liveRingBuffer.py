@@ -0,0 +1,158 @@
+import logging
+from pathlib import Path
+from threading import Lock
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from app.models.liveDataRow import FIELD_NAME_MAP, get_int
+from app.services.vectorColumns import GETTER_LAYOUTS, component_names
+
+logger = logging.getLogger('uvicorn.error')
+
+# integer arrays cannot hold NaN, missing integer values are marked with the smallest value instead
+INT_MISSING = np.iinfo(np.int64).min
+
+
+class LiveRingBuffer:
+    """
+    Fixed-capacity in-memory table of the most recent live samples. Each channel is one preallocated array, vector
+    channels are two-dimensional with one column per component. When the buffer is full, the oldest samples are
+    overwritten, so it holds the last capacity samples without allocating anything after it was created.
+    Columns are served with the same names as recorded data, vector channels as their component columns.
+    """
+
+    def __init__(self, capacity: int, source: Optional[str | Path] = None,
+                 field_map: Sequence[Tuple[str, Optional[Callable]]] = FIELD_NAME_MAP):
+        """
+        :param capacity: The number of samples kept.
+        :param source: The recording the samples are written to, older samples are read from there.
+        :param field_map: The channels and the getters they are read with, which define their types.
+        """
+        self.capacity = capacity
+        self.source = None if source is None else Path(source)
+        self.total = 0
+        self._complete = True
+        self._lock = Lock()
+
+        self._arrays: Dict[str, np.ndarray] = {}
+        # component columns map to their channel and the component index
+        self._columns: Dict[str, Tuple[np.ndarray, Optional[int]]] = {}
+        for name, getter in list(field_map) + [("timestamp", None)]:
+            if getter is None and name != "timestamp":
+                # the field is never read
+                continue
+            layout = GETTER_LAYOUTS.get(getter)
+            if layout is not None:
+                array = np.full((capacity, layout.size), np.nan, dtype=layout.dtype)
+                for i, component in enumerate(component_names(name, layout)):
+                    self._columns[component] = (array, i)
+            elif getter is get_int:
+                array = np.full(capacity, INT_MISSING, dtype=np.int64)
+                self._columns[name] = (array, None)
+            else:
+                array = np.full(capacity, np.nan, dtype=np.float64)
+                self._columns[name] = (array, None)
+            self._arrays[name] = array
+        self._missing = {name: INT_MISSING if array.dtype.kind == "i" else np.nan
+                         for name, array in self._arrays.items()}
+
+    def __len__(self) -> int:
+        return min(self.total, self.capacity)
+
+    @property
+    def columns(self) -> List[str]:
+        return list(self._columns)
+
+    @property
+    def memory_usage(self) -> int:
+        return sum(array.nbytes for array in self._arrays.values())
+
+    def append(self, sample: Dict[str, Any]):
+        """
+        Store a live sample, overwriting the oldest one if the buffer is full. Unknown fields are ignored.
+        """
+        with self._lock:
+            timestamp = sample.get("timestamp")
+            if timestamp is not None and len(self) and timestamp < self._latest_timestamp():
+                # the simulation was restarted, the buffer only holds one ordered run of samples
+                logger.info(f"Live timestamps went back to {timestamp}s, clearing the live buffer")
+                self.total = 0
+                self._complete = False
+
+            position = self.total % self.capacity
+            for name, array in self._arrays.items():
+                value = sample.get(name)
+                try:
+                    array[position] = self._missing[name] if value is None else value
+                except (ValueError, TypeError):
+                    array[position] = self._missing[name]
+            if self.total >= self.capacity:
+                self._complete = False
+            self.total += 1
+
+    def covers(self, start: Optional[float]) -> bool:
+        """
+        Check if the buffer holds all samples from start on, otherwise older samples have to be read from the
+        recording.
+        :param start: Start of the time range in seconds. If None, all samples of the session are needed.
+        """
+        with self._lock:
+            if self._complete:
+                return True
+            return start is not None and len(self) > 0 and start >= self._oldest_timestamp()
+
+    @property
+    def oldest_timestamp(self) -> Optional[float]:
+        with self._lock:
+            return self._oldest_timestamp() if len(self) else None
+
+    def get_columns(self, columns: List[str], start: Optional[float] = None,
+                    end: Optional[float] = None) -> pd.DataFrame:
+        """
+        Get columns of the buffered samples in time order, optionally limited to a time range.
+        Unknown columns are ignored.
+        """
+        with self._lock:
+            positions = self._positions()
+            if start is not None or end is not None:
+                timestamps = self._arrays["timestamp"][positions]
+                lower = 0 if start is None else int(np.searchsorted(timestamps, start, side="left"))
+                upper = len(timestamps) if end is None else int(np.searchsorted(timestamps, end, side="right"))
+                upper = max(lower, upper)
+                positions = slice(lower, upper) if isinstance(positions, slice) else positions[lower:upper]
+            return self._frame(columns, positions)
+
+    def sample(self) -> pd.DataFrame:
+        """
+        Get the newest sample, e.g. to describe the columns.
+        """
+        with self._lock:
+            positions = np.array([(self.total - 1) % self.capacity] if self.total else [], dtype=np.int64)
+            return self._frame(self.columns, positions)
+
+    def _frame(self, columns: List[str], positions: slice | np.ndarray) -> pd.DataFrame:
+        frame = {}
+        for column in dict.fromkeys(columns):
+            if column not in self._columns:
+                continue
+            array, component = self._columns[column]
+            values = array[positions] if component is None else array[positions, component]
+            if values.dtype.kind == "i" and (values == INT_MISSING).any():
+                values = np.where(values == INT_MISSING, np.nan, values)
+            frame[column] = values
+        # the values are copied, the buffer is overwritten by later samples
+        return pd.DataFrame(frame, copy=True)
+
+    def _positions(self) -> slice | np.ndarray:
+        if self.total <= self.capacity:
+            return slice(0, self.total)
+        first = self.total % self.capacity
+        return np.concatenate([np.arange(first, self.capacity), np.arange(first)])
+
+    def _oldest_timestamp(self) -> float:
+        return float(self._arrays["timestamp"][0 if self.total <= self.capacity else self.total % self.capacity])
+
+    def _latest_timestamp(self) -> float:
+        return float(self._arrays["timestamp"][(self.total - 1) % self.capacity])
@@ -0,0 +1,108 @@
+import logging
+from collections import OrderedDict
+from threading import Lock
+from typing import Dict, Generic, Hashable, Optional, TypeVar
+
+from app.models.cacheStatistics import CacheStatistics
+
+logger = logging.getLogger('uvicorn.error')
+
+V = TypeVar("V")
+
+
+class LruCache(Generic[V]):
+    """
+    Least recently used cache, limited by the size of its entries and optionally by their number.
+    Subclasses define the size of an entry with _size_of and can release evicted entries with _on_removed.
+    """
+
+    def __init__(self, name: str, max_bytes: int, max_entries: Optional[int] = None):
+        self.name = name
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+        self._entries: OrderedDict[Hashable, V] = OrderedDict()
+        self._sizes: Dict[Hashable, int] = {}
+        self._bytes = 0
+        self._lock = Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def _size_of(self, value: V) -> int:
+        """
+        The memory an entry uses, measured when it is added.
+        """
+        raise NotImplementedError
+
+    def _on_removed(self, key: Hashable, value: V):
+        """
+        Called for entries that are evicted or cleared.
+        """
+
+    @property
+    def current_bytes(self) -> int:
+        return self._bytes
+
+    def get(self, key: Hashable) -> Optional[V]:
+        with self._lock:
+            value = self._entries.get(key)
+            if value is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key: Hashable, value: V):
+        size = self._size_of(value)
+        with self._lock:
+            self._pop(key)
+            self._entries[key] = value
+            self._sizes[key] = size
+            self._bytes += size
+
+            # evict the least recently used entries, but always keep the one just added
+            while len(self._entries) > 1 and (self.current_bytes > self.max_bytes or
+                                              (self.max_entries is not None and
+                                               len(self._entries) > self.max_entries)):
+                evicted_key = next(iter(self._entries))
+                evicted = self._pop(evicted_key)
+                self.evictions += 1
+                self._on_removed(evicted_key, evicted)
+                logger.debug(f"{evicted_key} evicted from {self.name}")
+
+    def discard(self, key: Hashable):
+        with self._lock:
+            self._pop(key)
+
+    def size_of(self, key: Hashable) -> int:
+        """
+        Get the memory used by a cached entry when it was added, 0 if the entry is not cached.
+        """
+        return self._sizes.get(key, 0)
+
+    def _pop(self, key: Hashable) -> Optional[V]:
+        value = self._entries.pop(key, None)
+        self._bytes -= self._sizes.pop(key, 0)
+        return value
+
+    def get_statistics(self) -> CacheStatistics:
+        with self._lock:
+            return CacheStatistics(entries=len(self._entries), current_bytes=self.current_bytes,
+                                   max_bytes=self.max_bytes, hits=self.hits, misses=self.misses,
+                                   evictions=self.evictions)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._entries
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def clear(self):
+        with self._lock:
+            for key, value in self._entries.items():
+                self._on_removed(key, value)
+            self._entries.clear()
+            self._sizes.clear()
+            self._bytes = 0
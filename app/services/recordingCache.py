@@ -0,0 +1,162 @@
+import logging
+import os
+from pathlib import Path
+from typing import Iterator, List, Optional, Tuple
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from app.services.csvReaders import CsvReader, get_csv_reader
+from app.services.vectorColumns import expand_vector_columns
+
+logger = logging.getLogger('uvicorn.error')
+
+# The sidecar file lives next to the recording: recording.csv -> recording.csv.cache.parquet
+CACHE_SUFFIX = ".cache.parquet"
+FINGERPRINT_METADATA_KEY = b"tagging_dashboard.fingerprint"
+FORMAT_METADATA_KEY = b"tagging_dashboard.format"
+# Increase whenever the layout of the cached data changes, so existing caches are rebuilt
+CACHE_FORMAT_VERSION = b"2"
+
+
+def get_cache_path(csv_path: str | Path) -> Path:
+    """
+    Get the path of the columnar sidecar cache for a recording.
+    :param csv_path: Path of the recording CSV file.
+    :return: Path of the parquet sidecar file.
+    """
+    csv_path = Path(csv_path)
+    return csv_path.with_name(csv_path.name + CACHE_SUFFIX)
+
+
+def get_file_fingerprint(csv_path: str | Path) -> str:
+    """
+    Create a fingerprint of a recording from its path, size and modification time.
+    If any of them changes, a cached copy of the recording is considered stale.
+    """
+    csv_path = Path(csv_path).resolve()
+    stat = csv_path.stat()
+    return f"{csv_path}|{stat.st_size}|{stat.st_mtime_ns}"
+
+
+def is_cache_valid(csv_path: str | Path) -> bool:
+    """
+    Check if a sidecar cache exists for the recording and matches its current fingerprint.
+    """
+    cache_path = get_cache_path(csv_path)
+    if not cache_path.exists() or not Path(csv_path).exists():
+        return False
+    try:
+        metadata = pq.read_schema(cache_path).metadata or {}
+    except (OSError, pa.ArrowInvalid) as e:
+        logger.warning(f"Unreadable data cache {cache_path}: {e}")
+        return False
+    return (metadata.get(FORMAT_METADATA_KEY) == CACHE_FORMAT_VERSION and
+            metadata.get(FINGERPRINT_METADATA_KEY, b"").decode() == get_file_fingerprint(csv_path))
+
+
+def read_recording_csv(csv_path: str | Path, columns: Optional[List[str]] = None,
+                       nrows: Optional[int] = None, reader: Optional[CsvReader] = None) -> pd.DataFrame:
+    """
+    Parse a recording CSV file. The second row of a recording contains the units and is skipped,
+    composite vector values are split into numeric component columns and brackets are removed from the
+    remaining text values.
+    :param csv_path: Path of the recording CSV file.
+    :param columns: Columns of the CSV file to parse. If None, all columns are parsed.
+    :param nrows: Number of rows to parse. If None, all rows are parsed.
+    :param reader: The CSV parser backend. If None, the pandas parser is used.
+    """
+    reader = reader or get_csv_reader()
+    return _clean_recording(reader.read(csv_path, columns=columns, nrows=nrows))
+
+
+def _clean_recording(df: pd.DataFrame) -> pd.DataFrame:
+    df = expand_vector_columns(df)
+    str_cols = df.select_dtypes(include='object').columns
+    df[str_cols] = df[str_cols].apply(lambda col: col.str.replace(r'[\[\]]', '', regex=True))
+    return df
+
+
+def read_recording_csv_chunks(csv_path: str | Path, chunk_rows: int,
+                              reader: Optional[CsvReader] = None) -> Iterator[Tuple[pd.DataFrame, int]]:
+    """
+    Parse a recording CSV file in chunks, see read_recording_csv.
+    :return: An iterator over the parsed chunks and the number of bytes of the file read so far.
+    """
+    reader = reader or get_csv_reader()
+    for chunk, bytes_read in reader.read_chunks(csv_path, chunk_rows):
+        yield _clean_recording(chunk), bytes_read
+
+
+def read_cache(csv_path: str | Path, columns: Optional[List[str]] = None) -> pd.DataFrame | None:
+    """
+    Read the sidecar cache of a recording.
+    :param csv_path: Path of the recording CSV file.
+    :param columns: Columns to read. If None, all columns are read.
+    :return: The cached data or None if there is no valid cache.
+    """
+    if not is_cache_valid(csv_path):
+        return None
+    cache_path = get_cache_path(csv_path)
+    try:
+        return pq.read_table(cache_path, columns=columns).to_pandas()
+    except (OSError, pa.ArrowInvalid) as e:
+        logger.warning(f"Failed to read data cache {cache_path}: {e}")
+        return None
+
+
+def write_cache(csv_path: str | Path, df: pd.DataFrame) -> Path:
+    """
+    Write the sidecar cache of a recording. The file is written to a temporary path first
+    and then moved in place, so readers never see a partially written cache.
+    :return: Path of the written cache file.
+    """
+    cache_path = get_cache_path(csv_path)
+    temp_path = cache_path.with_name(cache_path.name + ".tmp")
+
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    metadata = {**(table.schema.metadata or {}),
+                FINGERPRINT_METADATA_KEY: get_file_fingerprint(csv_path).encode(),
+                FORMAT_METADATA_KEY: CACHE_FORMAT_VERSION}
+    table = table.replace_schema_metadata(metadata)
+
+    pq.write_table(table, temp_path, compression='zstd')
+    os.replace(temp_path, cache_path)
+    logger.info(f"Data cache written: {cache_path}")
+    return cache_path
+
+
+def load_recording(csv_path: str | Path, columns: Optional[List[str]] = None,
+                   reader: Optional[CsvReader] = None) -> pd.DataFrame:
+    """
+    Load a recording, preferably from its sidecar cache. If there is no valid cache, the CSV file
+    is parsed and the cache is written for the next time.
+    :param csv_path: Path of the recording CSV file.
+    :param columns: Columns to load. If None, all columns are loaded.
+    :param reader: The CSV parser backend. If None, the pandas parser is used.
+    """
+    df = read_cache(csv_path, columns)
+    if df is not None:
+        return df
+
+    df = read_recording_csv(csv_path, reader=reader)
+    try:
+        write_cache(csv_path, df)
+    except (OSError, pa.ArrowException) as e:
+        logger.warning(f"Failed to write data cache for {csv_path}: {e}")
+
+    if columns is not None:
+        df = df[[col for col in columns if col in df.columns]]
+    return df
+
+
+def ensure_cache(csv_path: str | Path, reader: Optional[CsvReader] = None) -> bool:
+    """
+    Make sure a valid sidecar cache exists for the recording.
+    :return: True if the cache had to be (re)built, False otherwise.
+    """
+    if is_cache_valid(csv_path):
+        return False
+    write_cache(csv_path, read_recording_csv(csv_path, reader=reader))
+    return True
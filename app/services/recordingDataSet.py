@@ -0,0 +1,308 @@
+import logging
+from pathlib import Path
+from threading import Lock
+from typing import Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+import pyarrow.parquet as pq
+
+from app.models.columnStatistics import ColumnStatistics
+from app.services.columnCache import ColumnCache
+from app.services.csvReaders import CsvReader, get_csv_reader
+from app.services.derivedChannels import DerivedChannel, DerivedChannelRegistry
+from app.services.columnStatistics import compute_column_statistics, read_statistics, write_statistics
+from app.services.downsampling import LTTB_OVERSAMPLING, DownsamplingMethod, DownsamplingPyramid, lttb
+from app.services.recordingCache import get_cache_path, get_file_fingerprint, is_cache_valid, read_cache, \
+    read_recording_csv
+from app.services.timestampIndex import SamplingMethod, TimestampIndex
+from app.services.vectorColumns import describe_columns, find_vector_columns, select_columns
+
+logger = logging.getLogger('uvicorn.error')
+
+
+class RecordingDataSet:
+    """
+    A recorded test drive whose columns are loaded on first request.
+    Opening the data set only reads the header, loaded columns are kept in a shared column cache.
+    Columns are read from the columnar sidecar cache if there is a valid one, otherwise from the CSV file.
+    Derived channels whose inputs are in the recording are offered like recorded columns, they are computed on
+    first request and kept in the column cache as well.
+    """
+
+    # rows parsed from the CSV file to detect column types and vector columns
+    HEADER_SAMPLE_ROWS = 100
+
+    def __init__(self, csv_path: str | Path, column_cache: ColumnCache, use_cache: bool = True,
+                 reader: Optional[CsvReader] = None, derived_channels: Optional[DerivedChannelRegistry] = None):
+        self.csv_path = Path(csv_path)
+        self.column_cache = column_cache
+        self.use_cache = use_cache
+        self.reader = reader or get_csv_reader()
+        self.derived_channels = derived_channels
+        self.fingerprint = get_file_fingerprint(self.csv_path)
+
+        self._sidecar_valid = use_cache and is_cache_valid(self.csv_path)
+        self._header, self._sources = self._read_header()
+        self._vector_columns = find_vector_columns(list(self._header.columns))
+        self._timestamp_index: TimestampIndex | None = None
+        self._pyramids: Dict[Tuple[str, ...], DownsamplingPyramid] = {}
+        self._pyramids_lock = Lock()
+        self._statistics: Dict[str, ColumnStatistics] | None = None
+        self._statistics_lock = Lock()
+
+    @property
+    def columns(self) -> List[str]:
+        return list(self._header.columns) + list(self.get_derived_channels())
+
+    def get_derived_channels(self) -> Dict[str, DerivedChannel]:
+        """
+        Get the registered derived channels that can be computed from the columns of the recording.
+        """
+        if self.derived_channels is None:
+            return {}
+        return {channel.name: channel for channel in self.derived_channels.available_channels(self._header.columns)}
+
+    @property
+    def memory_usage(self) -> int:
+        """
+        The memory used by the cached columns, the timestamp index and the downsampling pyramids of the data set.
+        """
+        derived = self.get_derived_channels()
+        usage = sum(self.column_cache.size_of(self._cache_key(column, derived)) for column in self.columns)
+        if self._timestamp_index is not None:
+            usage += self._timestamp_index.memory_usage
+        return usage + sum(pyramid.memory_usage for pyramid in list(self._pyramids.values()))
+
+    def release(self):
+        """
+        Drop the cached columns and the indexes of the data set, they are loaded again on the next request.
+        """
+        derived = self.get_derived_channels()
+        for column in self.columns:
+            self.column_cache.discard(self._cache_key(column, derived))
+        with self._pyramids_lock:
+            self._pyramids.clear()
+        self._timestamp_index = None
+
+    def describe_columns(self) -> List[Tuple[str, str]]:
+        return describe_columns(self._header) + [(name, "float64") for name in self.get_derived_channels()]
+
+    @property
+    def timestamp_index(self) -> TimestampIndex:
+        """
+        The index over the timestamp column, built once per data set.
+        """
+        if self._timestamp_index is None:
+            timestamps = self.get_columns(["timestamp"])
+            self._timestamp_index = TimestampIndex(
+                timestamps["timestamp"].to_numpy() if "timestamp" in timestamps else [])
+        return self._timestamp_index
+
+    def get_statistics(self) -> Dict[str, ColumnStatistics]:
+        """
+        Get the statistics of the numeric columns. They are read from the statistics file next to the recording,
+        if there is none yet they are computed once and written to it.
+        :return: The statistics keyed by column name.
+        """
+        with self._statistics_lock:
+            if self._statistics is None:
+                self._statistics = read_statistics(self.csv_path)
+            if self._statistics is None:
+                numeric_columns = [col for col in self._header.columns if self._header[col].dtype.kind in "iufb"]
+                statistics = compute_column_statistics(self.get_columns(numeric_columns))
+                try:
+                    write_statistics(self.csv_path, statistics)
+                except OSError as e:
+                    logger.warning(f"Failed to write column statistics for {self.csv_path}: {e}")
+                self._statistics = {column.name: column for column in statistics}
+            return self._statistics
+
+    def get_columns(self, columns: List[str], rows: slice | np.ndarray | None = None) -> pd.DataFrame:
+        """
+        Get columns of the data set, loading the ones that are not cached yet. Unknown columns are ignored.
+        :param columns: The columns to get.
+        :param rows: Row positions to get, see TimestampIndex.rows. If None, all rows are returned.
+        """
+        derived = self.get_derived_channels()
+        columns = [col for col in dict.fromkeys(columns) if col in self._header.columns or col in derived]
+
+        loaded = {}
+        missing = []
+        for column in columns:
+            values = self.column_cache.get(self._cache_key(column, derived))
+            if values is None:
+                missing.append(column)
+            else:
+                loaded[column] = values
+
+        recorded_missing = [column for column in missing if column not in derived]
+        if recorded_missing:
+            for column, values in self._load_columns(recorded_missing).items():
+                self.column_cache.put(self._cache_key(column, derived), values)
+                if column in recorded_missing:
+                    loaded[column] = values
+
+        for column in missing:
+            if column in derived:
+                loaded[column] = self._compute_derived_channel(derived[column], derived)
+
+        if rows is not None:
+            loaded = {column: values.iloc[rows] for column, values in loaded.items()}
+        return pd.DataFrame({column: loaded[column] for column in columns})
+
+    def _compute_derived_channel(self, channel: DerivedChannel, derived: Dict[str, DerivedChannel]) -> pd.Series:
+        """
+        Compute a derived channel over the whole recording at once and memoize it in the column cache.
+        """
+        inputs = self.get_columns(channel.inputs)
+        values = pd.Series(channel.compute({name: inputs[name].to_numpy(dtype=np.float64) for name in channel.inputs}),
+                           name=channel.name)
+        self.column_cache.put(self._cache_key(channel.name, derived), values)
+        logger.debug(f"Derived channel {channel.name} computed for {self.csv_path}")
+        return values
+
+    def _cache_key(self, column: str, derived: Dict[str, DerivedChannel]) -> Tuple[str, ...]:
+        # values of a derived channel belong to its definition, a changed definition is computed again
+        channel = derived.get(column)
+        return (self.fingerprint, column) if channel is None else (self.fingerprint, column, channel.version)
+
+    def prime(self, df: pd.DataFrame):
+        """
+        Put already loaded columns of the recording into the column cache.
+        """
+        for column in df.columns:
+            if column in self._header.columns:
+                self.column_cache.put((self.fingerprint, column), df[column])
+
+    def select(self, requested_columns: List[str], start: Optional[float] = None,
+               end: Optional[float] = None, combine_vectors: bool = True) -> pd.DataFrame:
+        """
+        Select columns like TestDriveDataService.get_csv_data, composite vector columns are combined from
+        their components.
+        :param requested_columns: The columns to select.
+        :param start: Start of the time range in seconds. If None, the selection starts at the first row.
+        :param end: End of the time range in seconds. If None, the selection ends at the last row.
+        :param combine_vectors: If False, composite vector columns are returned as their component columns.
+        """
+        rows = None
+        if start is not None or end is not None:
+            rows = self.timestamp_index.rows(start, end)
+
+        df = self.get_columns(self.resolve_columns(requested_columns), rows)
+        return select_columns(df, requested_columns) if combine_vectors else df
+
+    def iter_select(self, requested_columns: List[str], start: Optional[float] = None, end: Optional[float] = None,
+                    chunk_rows: int = 65_536, combine_vectors: bool = True) -> Iterator[pd.DataFrame]:
+        """
+        Select columns like select, in chunks of at most chunk_rows rows. Only the rows of the current chunk are
+        copied out of the column cache, so the memory needed does not grow with the size of the selection.
+        """
+        index = self.timestamp_index
+        rows = index.rows(start, end) if start is not None or end is not None else slice(0, len(index))
+        columns = self.resolve_columns(requested_columns)
+        if isinstance(rows, slice):
+            chunks = (slice(first, min(first + chunk_rows, rows.stop))
+                      for first in range(rows.start, rows.stop, chunk_rows))
+        else:
+            chunks = (rows[first:first + chunk_rows] for first in range(0, len(rows), chunk_rows))
+
+        for chunk in chunks:
+            df = self.get_columns(columns, chunk)
+            yield select_columns(df, requested_columns) if combine_vectors else df
+
+    def sample(self, requested_columns: List[str], timestamps: List[float],
+               method: SamplingMethod = "nearest") -> pd.DataFrame:
+        """
+        Get the selected columns at the given timestamps, see TimestampIndex.sample.
+        """
+        df = self.get_columns(self.resolve_columns(requested_columns))
+        return select_columns(self.timestamp_index.sample(df, np.asarray(timestamps), method), requested_columns)
+
+    def resolve_columns(self, requested_columns: List[str]) -> List[str]:
+        """
+        Replace composite vector columns by their component columns.
+        """
+        columns = []
+        for column in requested_columns:
+            columns.extend(self._vector_columns.get(column, [column]))
+        return columns
+
+    def downsample(self, column: str, max_points: int, start: Optional[float] = None, end: Optional[float] = None,
+                   method: DownsamplingMethod = "minmax") -> Tuple[np.ndarray, np.ndarray] | None:
+        """
+        Downsample a numeric column for display. The points are taken from the min/max pyramid of the column,
+        which is built on first use and kept for the lifetime of the data set.
+        :return: Timestamps and values of the downsampled points, or None if the column is not numeric.
+        """
+        values = self._time_ordered_values(column)
+        if values is None:
+            return None
+        index = self.timestamp_index
+        first_row, last_row = index.bounds(start, end)
+
+        budget = max_points * LTTB_OVERSAMPLING if method == "lttb" else max_points
+        positions = self._get_pyramid(column, values).positions(first_row, last_row, budget)
+        if positions is None:
+            positions = np.arange(first_row, last_row)
+
+        timestamps, values = index.sorted_timestamps[positions], values[positions]
+        valid = ~np.isnan(values)
+        timestamps, values = timestamps[valid], values[valid]
+        if method == "lttb" and len(values) > max_points:
+            selected = lttb(timestamps, values, max_points)
+            timestamps, values = timestamps[selected], values[selected]
+        return timestamps, values
+
+    def _time_ordered_values(self, column: str) -> np.ndarray | None:
+        derived = column in self.get_derived_channels()
+        if not derived and (column not in self._header.columns or self._header[column].dtype.kind not in "iufb"):
+            return None
+        values = self.get_columns([column])[column].to_numpy(dtype=np.float64)
+        order = self.timestamp_index.order
+        return values if order is None else values[order]
+
+    def _get_pyramid(self, column: str, values: np.ndarray) -> DownsamplingPyramid:
+        with self._pyramids_lock:
+            # the pyramid of a derived channel belongs to its definition
+            key = self._cache_key(column, self.get_derived_channels())
+            pyramid = self._pyramids.get(key)
+            if pyramid is None:
+                pyramid = DownsamplingPyramid(values)
+                self._pyramids[key] = pyramid
+                logger.debug(f"Downsampling pyramid for {column} built: {pyramid.memory_usage} bytes")
+            return pyramid
+
+    def _read_header(self) -> Tuple[pd.DataFrame, Dict[str, str]]:
+        """
+        Read the column names and types of the recording.
+        :return: An empty data frame with the columns of the data set and a mapping of each column to the column
+        of the CSV file it is parsed from.
+        """
+        if self._sidecar_valid:
+            header = pq.read_schema(get_cache_path(self.csv_path)).empty_table().to_pandas()
+            return header, {column: column for column in header.columns}
+
+        header = read_recording_csv(self.csv_path, nrows=self.HEADER_SAMPLE_ROWS, reader=self.reader).iloc[:0]
+        sources = {column: column for column in header.columns}
+        for name, components in find_vector_columns(list(header.columns)).items():
+            for component in components:
+                sources[component] = name
+        return header, sources
+
+    def _load_columns(self, columns: List[str]) -> Dict[str, pd.Series]:
+        if self.use_cache and not self._sidecar_valid:
+            # the sidecar cache may have been built in the background in the meantime
+            self._sidecar_valid = is_cache_valid(self.csv_path)
+
+        if self._sidecar_valid:
+            df = read_cache(self.csv_path, columns)
+            if df is not None:
+                return {column: df[column] for column in df.columns}
+            self._sidecar_valid = False
+
+        # vector columns are parsed as a whole, so all of their components are returned
+        csv_columns = list(dict.fromkeys(self._sources[column] for column in columns))
+        logger.info(f"Loading {len(csv_columns)} columns from {self.csv_path}")
+        df = read_recording_csv(self.csv_path, columns=csv_columns, reader=self.reader)
+        return {column: df[column] for column in df.columns}
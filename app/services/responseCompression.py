@@ -0,0 +1,123 @@
+import logging
+from typing import Hashable, Iterable, Iterator, List, Optional, Tuple
+
+import pyarrow as pa
+
+from app.services.lruCache import LruCache
+
+logger = logging.getLogger('uvicorn.error')
+
+IDENTITY = "identity"
+# content codings in order of preference and the pyarrow codec that produces them
+CONTENT_CODECS = {
+    "zstd": "zstd",
+    "br": "brotli",
+    "gzip": "gzip",
+}
+# smaller bodies are sent uncompressed, the compression would gain next to nothing
+MIN_COMPRESSED_SIZE = 1024
+
+
+def parse_accept_encoding(accept_encoding: Optional[str]) -> List[str]:
+    """
+    Get the content codings accepted by a client, see RFC 9110 section 12.5.3.
+    :return: The accepted codings, codings with a quality of 0 are left out.
+    """
+    accepted = []
+    for item in (accept_encoding or "").split(","):
+        coding, _, parameters = item.strip().partition(";")
+        quality = 1.0
+        for parameter in parameters.split(";"):
+            name, _, value = parameter.strip().partition("=")
+            if name == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        if coding and quality > 0:
+            accepted.append(coding.lower())
+    return accepted
+
+
+def choose_encoding(accept_encoding: Optional[str]) -> str:
+    """
+    Choose the content coding of a response.
+    :return: The preferred coding accepted by the client and available in pyarrow, identity if there is none.
+    """
+    accepted = parse_accept_encoding(accept_encoding)
+    for coding, codec in CONTENT_CODECS.items():
+        if (coding in accepted or "*" in accepted) and pa.Codec.is_available(codec):
+            return coding
+    return IDENTITY
+
+
+def compress(body: bytes, encoding: str) -> Tuple[bytes, str]:
+    """
+    Compress a response body.
+    :return: The body and its actual content coding, small bodies stay uncompressed.
+    """
+    if encoding == IDENTITY or len(body) < MIN_COMPRESSED_SIZE:
+        return body, IDENTITY
+    return pa.Codec(CONTENT_CODECS[encoding]).compress(body, asbytes=True), encoding
+
+
+class _ChunkSink:
+    """
+    File object that collects the compressed output of a stream until it is taken.
+    """
+
+    def __init__(self):
+        self.chunks: List[bytes] = []
+        self.closed = False
+
+    def write(self, data) -> int:
+        self.chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+    def take(self) -> bytes:
+        data, self.chunks = b"".join(self.chunks), []
+        return data
+
+
+def iter_compressed(chunks: Iterable[bytes | memoryview], encoding: str) -> Iterator[bytes]:
+    """
+    Compress a streamed response body chunk by chunk. The compressor is flushed after every chunk, so each chunk
+    is sent as soon as it is created and the body is never held in memory as a whole.
+    """
+    if encoding == IDENTITY:
+        yield from chunks
+        return
+    sink = _ChunkSink()
+    stream = pa.CompressedOutputStream(pa.PythonFile(sink, mode="w"), CONTENT_CODECS[encoding])
+    for chunk in chunks:
+        stream.write(chunk)
+        stream.flush()
+        yield sink.take()
+    stream.close()
+    yield sink.take()
+
+
+class ResponseCache(LruCache[Tuple[bytes, str]]):
+    """
+    Least recently used cache of encoded and compressed response bodies, limited by their size.
+    The keys contain the version of the data set, so bodies of a changed recording are never served.
+    The cached values are the body and its content coding.
+    """
+
+    def __init__(self, max_bytes: int):
+        super().__init__("response cache", max_bytes)
+
+    def _size_of(self, entry: Tuple[bytes, str]) -> int:
+        return len(entry[0])
+
+    def put(self, key: Hashable, body: bytes, encoding: str):
+        # a body larger than the cache would evict everything else
+        if len(body) > self.max_bytes:
+            return
+        super().put(key, (body, encoding))
@@ -2,21 +2,47 @@ import csv
 import importlib
 import json
 import logging
+import math
 import os
 import re
 import tempfile
 from datetime import datetime
 from pathlib import Path
-from typing import Dict, List
+from threading import Lock
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
 
 from pydantic import ValidationError
+import numpy as np
 import pandas as pd
-
-from app.models.liveDataRow import FIELD_NAME_MAP
+import pyarrow as pa
+
+from app.models.activationStatus import ActivationStatus
+from app.models.cacheStatistics import CacheStatistics
+from app.models.columnStatistics import ColumnStatistics
+from app.models.liveDataRow import LIVE_CSV_FIELDNAMES
+from app.models.liveSessionInfo import LiveSessionInfo
+from app.models.stepStatistics import StepStatistics
 from app.models.testDriveDataInfo import TestDriveDataInfo
 from app.models.testDriveMetaData import TestDriveMetaData
 from app.models.testDriveProjectInfo import TestDriveProjectInfo
 from app.models.testDriveTagInfo import TestDriveTagInfo
+from app.models.writerStatistics import WriterStatistics
+from app.services.activationJob import ActivationJob
+from app.services.bufferedCsvWriter import BufferedCsvWriter
+from app.services.bufferedParquetWriter import BufferedParquetWriter, read_parquet_recording, recover_partial_files, \
+    PARTIAL_SUFFIX
+from app.services.columnCache import ColumnCache
+from app.services.columnStatistics import STATISTICS_FORMAT_VERSION
+from app.services.csvReaders import get_csv_reader
+from app.services.csvTailReader import CsvTailReader
+from app.services.datasetCache import DatasetCache, DatasetKey
+from app.services.derivedChannels import DerivedChannel, DerivedChannelRegistry, register_default_channels
+from app.services.downsampling import DownsamplingMethod, downsample
+from app.services.liveRingBuffer import LiveRingBuffer
+from app.services.recordingCache import get_file_fingerprint
+from app.services.recordingDataSet import RecordingDataSet
+from app.services.timestampIndex import SamplingMethod, TimestampIndex
+from app.services.vectorColumns import describe_columns, field_column_names, find_vector_columns, select_columns
 from app.settings import Settings
 
 
@@ -27,17 +53,43 @@ class TestDriveDataService:
         self.test_drive_data_store: Dict[int, TestDriveProjectInfo] = {}
         self.current_id = 1
         self.active_testdrive_id = None
-        self.active_testdrive_df = None
+        self.active_dataset: RecordingDataSet | None = None
+        self.csv_reader = get_csv_reader(settings.CSV_READER)
+        self.column_cache = ColumnCache(settings.COLUMN_CACHE_MAX_BYTES)
+        self.dataset_cache = DatasetCache(settings.DATASET_CACHE_MAX_BYTES, settings.DATASET_CACHE_MAX_ENTRIES)
+        self.derived_channels = DerivedChannelRegistry(field_column_names())
+        register_default_channels(self.derived_channels)
+        self.activation_job: ActivationJob | None = None
+        # the data set cache lookup of the last activation, taken by the load that follows it
+        self._activation_lookup: Tuple[DatasetKey, RecordingDataSet | None] | None = None
+        self._live_reader: CsvTailReader | None = None
+        self.live_buffer: LiveRingBuffer | None = None
+        self.live_writer: BufferedCsvWriter | None = None
+        self.live_parquet_writer: BufferedParquetWriter | None = None
+        # the source of the current or last live session, set by the live data process
+        self.live_source = None
+        self._activation_lock = Lock()
 
         self.current_project_info = TestDriveProjectInfo()
 
         self.logger = logging.getLogger('uvicorn.error')
         self._load_data()
+        self._recover_live_sessions()
 
-    def load_csv_data(self, project_info: TestDriveProjectInfo):
-
+    def load_csv_data(self, project_info: TestDriveProjectInfo,
+                      on_progress: Optional[Callable[[ActivationStatus], None]] = None):
+        """
+        Load the data of a test drive. A running load of another test drive is cancelled, the loaded data
+        replaces the data of the previous test drive only once it is complete.
+        Recently used test drives are taken from the data set cache without loading them again.
+        :param project_info: The test drive to load.
+        :param on_progress: Optional callback that receives the loading progress.
+        """
         if project_info.is_live:
-            self.current_project_info = project_info
+            with self._activation_lock:
+                self._cancel_activation_job()
+                self.current_project_info = project_info
+                self.active_dataset = None
             self.logger.warning("Cannot load CSV data for live test drive")
             return
         file_path = Path(project_info.test_drive_data_info.csv_file_full_path)
@@ -45,34 +97,174 @@ class TestDriveDataService:
             self.logger.warning(f"CSV file does not exist: {file_path}")
             return
 
-        self.current_project_info = project_info
-        df = pd.read_csv(project_info.test_drive_data_info.csv_file_full_path, skiprows=[1])
-        str_cols = df.select_dtypes(include='object').columns
-        df[str_cols] = df[str_cols].apply(lambda col: col.str.replace(r'[\[\]]', '', regex=True))
-        self.active_testdrive_df = df
+        key = self._get_dataset_key(project_info)
+        with self._activation_lock:
+            lookup, self._activation_lookup = self._activation_lookup, None
+        # the data set was looked up already if the test drive was just activated
+        cached_dataset = lookup[1] if lookup is not None and lookup[0] == key else self.dataset_cache.get(key)
+        job = ActivationJob(project_info, self.column_cache, self.settings.DATA_CACHE_ENABLED, on_progress,
+                            cached_dataset=cached_dataset, reader=self.csv_reader,
+                            derived_channels=self.derived_channels)
+        with self._activation_lock:
+            self._cancel_activation_job()
+            self.activation_job = job
+
+        dataset = job.run()
+
+        with self._activation_lock:
+            if dataset is None or job is not self.activation_job or job.is_cancelled:
+                return
+            self.dataset_cache.put(key, dataset)
+            self.current_project_info = project_info
+            self.active_dataset = dataset
+
+    def get_dataset_version(self) -> str | None:
+        """
+        Get the version of the active data set. Responses computed from the data set stay valid as long as
+        the version does not change.
+        :return: The version, or None if there is no data set or the test drive is live and still changing.
+        """
+        if self.current_project_info.is_live:
+            return None
+        dataset = self._get_active_dataset()
+        # the column names and statistics depend on the format version, derived channels on their definitions
+        if dataset is None:
+            return None
+        return f"{dataset.fingerprint}|{STATISTICS_FORMAT_VERSION}|{self.derived_channels.version}"
+
+    def get_cache_statistics(self) -> Dict[str, CacheStatistics]:
+        """
+        Get the statistics of the data set cache and of the column cache.
+        """
+        return {
+            "datasets": self.dataset_cache.get_statistics(),
+            "columns": self.column_cache.get_statistics(),
+        }
+
+    def _activate_cached_dataset(self, project_info: TestDriveProjectInfo) -> bool:
+        """
+        Make a recently used test drive the active one if its data set is still cached.
+        :return: True if the cached data set is active now, False if it has to be loaded.
+        """
+        file_path = Path(project_info.test_drive_data_info.csv_file_full_path)
+        if project_info.is_live or not file_path.exists():
+            return False
+        key = self._get_dataset_key(project_info)
+        dataset = self.dataset_cache.get(key)
+        with self._activation_lock:
+            self._activation_lookup = (key, dataset)
+            if dataset is None:
+                return False
+            self._cancel_activation_job()
+            self.current_project_info = project_info
+            self.active_dataset = dataset
+        self.logger.info(f"Test drive {project_info.id} activated from the data set cache")
+        return True
+
+    @staticmethod
+    def _get_dataset_key(project_info: TestDriveProjectInfo) -> Tuple[int, str]:
+        return project_info.id, get_file_fingerprint(project_info.test_drive_data_info.csv_file_full_path)
+
+    def get_activation_status(self) -> ActivationStatus | None:
+        """
+        Get the progress of the last started test drive load.
+        """
+        job = self.activation_job
+        return job.status.model_copy() if job else None
+
+    def cancel_activation(self) -> bool:
+        """
+        Cancel a running test drive load.
+        :return: True if a running load was cancelled, False otherwise.
+        """
+        with self._activation_lock:
+            return self._cancel_activation_job()
+
+    def _cancel_activation_job(self) -> bool:
+        if self.activation_job is None or self.activation_job.is_finished:
+            return False
+        self.activation_job.cancel()
+        return True
+
+    def _get_active_dataset(self) -> RecordingDataSet | None:
+        """
+        Get the data set of the active test drive, None while it is still loading.
+        """
+        if self.current_project_info.id != self.active_testdrive_id:
+            return None
+        return self.active_dataset
 
     def get_csv_data_columns(self):
 
         if self.current_project_info.is_live:
-            csv_file = self.current_project_info.test_drive_data_info.csv_file_full_path
-            if not os.path.exists(csv_file):
-                self.logger.warning(f"CSV file does not exist: {csv_file}")
-                return []
-
-            # read first row to get column names
-            df = pd.read_csv(csv_file, nrows=2)
+            buffer = self._get_live_buffer()
+            if buffer is not None:
+                # the newest sample in memory tells the column types
+                df = buffer.sample()
+            else:
+                csv_file = self.current_project_info.test_drive_data_info.csv_file_full_path
+                if not os.path.exists(csv_file):
+                    self.logger.warning(f"CSV file does not exist: {csv_file}")
+                    return []
+                # the first row read so far tells the column types
+                df = self._update_live_reader(csv_file).sample()
             # check if we have columns
             if df.empty:
                 self.logger.warning("CSV file is empty")
                 return []
-            columns = df.dtypes.items()
-            return columns
+            derived = self.derived_channels.available_channels(df.columns)
+            return describe_columns(df) + [(channel.name, "float64") for channel in derived]
+
+        dataset = self._get_active_dataset()
+        if dataset is None:
+            return []
+        return dataset.describe_columns()
+
+    def register_derived_channel(self, name: str, expression: str, description: str = "") -> DerivedChannel:
+        """
+        Register a channel computed by an expression. Its name may not be the name of a column of the active test
+        drive, in addition to the recorded fields rejected by the registry.
+        :raises ValueError: If the name or the expression is invalid.
+        """
+        derived = {channel.name for channel in self.derived_channels.get_channels()}
+        columns = [column for column, _ in self.get_csv_data_columns() if column not in derived]
+        self.derived_channels.validate_name(name, columns)
+        return self.derived_channels.register_expression(name, expression, description)
+
+    def get_derived_channels(self) -> List[DerivedChannel]:
+        """
+        Get the derived channels that can be computed for the active test drive.
+        """
+        if self.current_project_info.is_live:
+            return self.derived_channels.available_channels(self._get_live_column_names())
 
-        if self.active_testdrive_df is None:
+        dataset = self._get_active_dataset()
+        if dataset is None:
             return []
-        return self.active_testdrive_df.dtypes.items()
+        return list(dataset.get_derived_channels().values())
 
-    def get_csv_data(self, requested_columns: List[str]) -> pd.DataFrame:
+    def get_column_statistics(self) -> Dict[str, ColumnStatistics]:
+        """
+        Get the statistics of the numeric columns of the active test drive.
+        Live test drives are still growing, so there are no statistics for them.
+        :return: The statistics keyed by column name.
+        """
+        if self.current_project_info.is_live:
+            return {}
+        dataset = self._get_active_dataset()
+        if dataset is None:
+            return {}
+        return dataset.get_statistics()
+
+    def get_csv_data(self, requested_columns: List[str], start: Optional[float] = None,
+                     end: Optional[float] = None, combine_vectors: bool = True) -> pd.DataFrame:
+        """
+        Get the selected columns of the active test drive.
+        :param requested_columns: The columns to select, timestamp is always included.
+        :param start: Optional start of the time range in simulation seconds.
+        :param end: Optional end of the time range in simulation seconds.
+        :param combine_vectors: If False, composite vector columns are returned as their component columns.
+        """
         # Column selection
         if not requested_columns:
             self.logger.warning("No columns specified for data selection, returning empty DataFrame")
@@ -82,35 +274,320 @@ class TestDriveDataService:
             requested_columns.append('timestamp')  # always include timestamp
 
         if self.current_project_info.is_live:
-            csv_file = self.current_project_info.test_drive_data_info.csv_file_full_path
-            if not os.path.exists(csv_file):
-                self.logger.warning(f"CSV file does not exist: {csv_file}")
-                return pd.DataFrame()
-
-            # Read only the header
-            available_columns = pd.read_csv(csv_file, nrows=0).columns
-            # Keep only valid columns
-            valid_columns = [col for col in requested_columns if col in available_columns]
-
-            if not valid_columns:
+            df = self._get_live_columns(requested_columns, start, end)
+            if df.empty:
                 return pd.DataFrame()  # Or raise warning/log if needed
 
-            df = pd.read_csv(csv_file, usecols=valid_columns)
-            return df
+            return select_columns(df, requested_columns) if combine_vectors else df
+
+        dataset = self._get_active_dataset()
+        if dataset is None:
+            self.logger.warning("No test drive data loaded, returning empty DataFrame")
+            return pd.DataFrame()
 
-            # Get set of columns in the DataFrame
-        valid_columns_set = set(self.active_testdrive_df.columns)
-        # Filter out invalid columns
-        valid_columns = [col for col in requested_columns if col in valid_columns_set]
+        # Filter out invalid columns, composite vector columns are combined from their components
+        df = dataset.select(requested_columns, start, end, combine_vectors)
 
         # If no valid columns remain, return an empty dataframe or handle otherwise
-        if not valid_columns:
+        if df.columns.empty:
             self.logger.warning("No valid columns specified for data selection, returning empty DataFrame")
             return pd.DataFrame()
 
-        df = self.active_testdrive_df[valid_columns]
         return df
 
+    def iter_csv_data(self, requested_columns: List[str], start: Optional[float] = None, end: Optional[float] = None,
+                      chunk_rows: int = 65_536, combine_vectors: bool = True) -> Iterator[pd.DataFrame]:
+        """
+        Get the selected columns of the active test drive like get_csv_data, in chunks of at most chunk_rows rows.
+        Recorded test drives are read chunk by chunk while iterating, so a large selection is never copied at once.
+        """
+        if not requested_columns:
+            return
+
+        if 'timestamp' not in requested_columns:
+            requested_columns.append('timestamp')  # always include timestamp
+
+        if self.current_project_info.is_live:
+            # the live rows are in memory already
+            df = self.get_csv_data(requested_columns, start, end, combine_vectors)
+            for first in range(0, len(df), chunk_rows):
+                yield df.iloc[first:first + chunk_rows]
+            return
+
+        dataset = self._get_active_dataset()
+        if dataset is None:
+            self.logger.warning("No test drive data loaded, returning no data")
+            return
+        yield from dataset.iter_select(requested_columns, start, end, chunk_rows, combine_vectors)
+
+    def get_data_at(self, requested_columns: List[str], timestamps: List[float],
+                    method: SamplingMethod = "nearest") -> pd.DataFrame:
+        """
+        Get the selected columns of the active test drive at the given simulation times.
+        :param requested_columns: The columns to select, timestamp is always included.
+        :param timestamps: The simulation times in seconds.
+        :param method: nearest returns the closest row, linear interpolates numeric columns.
+        :return: One row per timestamp.
+        """
+        if not requested_columns or not timestamps:
+            return pd.DataFrame()
+
+        if 'timestamp' not in requested_columns:
+            requested_columns.append('timestamp')  # always include timestamp
+
+        if self.current_project_info.is_live:
+            df = self._get_live_columns(requested_columns)
+            if df.empty:
+                return pd.DataFrame()
+            index = TimestampIndex(df["timestamp"].to_numpy())
+            return select_columns(index.sample(df, np.asarray(timestamps), method), requested_columns)
+
+        dataset = self._get_active_dataset()
+        if dataset is None:
+            self.logger.warning("No test drive data loaded, returning empty DataFrame")
+            return pd.DataFrame()
+        return dataset.sample(requested_columns, timestamps, method)
+
+    def get_downsampled_data(self, requested_columns: List[str], max_points: int, start: Optional[float] = None,
+                             end: Optional[float] = None,
+                             method: DownsamplingMethod = "minmax") -> Dict[str, Tuple[np.ndarray, np.ndarray]]:
+        """
+        Get the selected numeric columns of the active test drive, downsampled to at most about max_points points
+        per column. Composite vector columns are returned as their components.
+        :return: Timestamps and values of each column.
+        """
+        if self.current_project_info.is_live:
+            vector_columns = find_vector_columns(self._get_live_column_names())
+            columns = [component for col in requested_columns for component in vector_columns.get(col, [col])]
+            df = self.get_csv_data(columns, start, end)
+            if df.empty:
+                return {}
+            df = df.drop(columns=[col for col in df.columns if df[col].dtype == object])
+            timestamps = df["timestamp"].to_numpy(dtype=np.float64)
+            return {col: downsample(timestamps, df[col].to_numpy(dtype=np.float64), max_points, method)
+                    for col in df.columns if col != "timestamp"}
+
+        dataset = self._get_active_dataset()
+        if dataset is None:
+            return {}
+
+        result = {}
+        for column in dataset.resolve_columns(requested_columns):
+            if column == "timestamp" or column in result:
+                continue
+            downsampled = dataset.downsample(column, max_points, start, end, method)
+            if downsampled is not None:
+                result[column] = downsampled
+        return result
+
+    def start_live_buffer(self, csv_file: str) -> LiveRingBuffer:
+        """
+        Create the in-memory buffer of a new live session, the live data source fills it with every sample.
+        """
+        capacity = max(1, math.ceil(self.settings.LIVE_BUFFER_MINUTES * 60 * self.settings.LIVE_SAMPLE_RATE_HZ))
+        self.live_buffer = LiveRingBuffer(capacity, csv_file)
+        self.logger.info(f"Live buffer for {capacity} samples created: {self.live_buffer.memory_usage} bytes")
+        return self.live_buffer
+
+    def start_live_writer(self, csv_file: str) -> BufferedCsvWriter:
+        """
+        Create the writer that records the samples of a new live session to its CSV file.
+        """
+        self.live_writer = BufferedCsvWriter(csv_file, flush_interval=self.settings.LIVE_WRITER_FLUSH_INTERVAL,
+                                             max_queue_size=self.settings.LIVE_WRITER_MAX_QUEUE_SIZE)
+        return self.live_writer
+
+    def start_live_parquet_writer(self, project_info: TestDriveProjectInfo) -> BufferedParquetWriter | None:
+        """
+        Create the writer that records the samples of a new live session to rolling Parquet files in a directory of
+        its own under LIVE_RECORDING_DIR. Completed files are registered with the live project and in the session
+        file of the directory, so the recording can be found again after a restart, see get_live_sessions.
+        :return: The writer, or None if Parquet recording is disabled.
+        """
+        self.live_parquet_writer = None
+        if not self.settings.LIVE_PARQUET_ENABLED:
+            return None
+        data_info = project_info.test_drive_data_info
+        data_info.parquet_files = []
+
+        start_time = datetime.now()
+        name = start_time.strftime("live_%Y%m%d_%H%M%S")
+        session_dir = self.settings.LIVE_RECORDING_DIR / name
+        index = 1
+        while session_dir.exists():
+            index += 1
+            session_dir = self.settings.LIVE_RECORDING_DIR / f"{name}_{index}"
+        session_dir.mkdir(parents=True)
+        session = LiveSessionInfo(name=session_dir.name, start_time=start_time,
+                                  csv_file_full_path=data_info.csv_file_full_path)
+        self._save_live_session(session_dir, session)
+
+        def register_file(path: Path):
+            data_info.parquet_files.append(str(path.resolve()))
+            session.parquet_files.append(path.name)
+            self._save_live_session(session_dir, session)
+
+        self.live_parquet_writer = BufferedParquetWriter(
+            session_dir / "live",
+            max_file_bytes=self.settings.LIVE_PARQUET_MAX_FILE_BYTES,
+            max_file_seconds=self.settings.LIVE_PARQUET_MAX_FILE_SECONDS,
+            on_file_closed=register_file,
+            flush_interval=self.settings.LIVE_WRITER_FLUSH_INTERVAL,
+            max_queue_size=self.settings.LIVE_WRITER_MAX_QUEUE_SIZE)
+        return self.live_parquet_writer
+
+    def get_live_sessions(self) -> List[LiveSessionInfo]:
+        """
+        Get the recorded live sessions, oldest first.
+        """
+        sessions = []
+        root = self.settings.LIVE_RECORDING_DIR
+        if not root.is_dir():
+            return sessions
+        for session_dir in sorted(root.iterdir()):
+            session = self._load_live_session(session_dir)
+            if session is not None:
+                sessions.append(session)
+        return sessions
+
+    def read_live_session(self, name: str, columns: Optional[List[str]] = None) -> pa.Table | None:
+        """
+        Read the Parquet recording of a live session.
+        :param columns: Columns to read. If None, all columns are read.
+        :return: The recording, or None if there is no session with that name.
+        """
+        if Path(name).name != name:
+            return None
+        session_dir = self.settings.LIVE_RECORDING_DIR / name
+        session = self._load_live_session(session_dir)
+        if session is None:
+            return None
+        paths = [session_dir / file_name for file_name in session.parquet_files]
+        if not paths:
+            return pa.table({column: pa.array([], pa.float64()) for column in columns or []})
+        return read_parquet_recording(paths, columns)
+
+    def _load_live_session(self, session_dir: Path) -> LiveSessionInfo | None:
+        session_file = session_dir / "session.json"
+        if not session_file.is_file():
+            return None
+        try:
+            return LiveSessionInfo.model_validate_json(session_file.read_text())
+        except ValidationError as e:
+            self.logger.error(f"Failed to parse live session {session_file}: {e}")
+            return None
+
+    def _save_live_session(self, session_dir: Path, session: LiveSessionInfo):
+        # written to a temporary file first, a crash while saving leaves the previous version
+        temp_file = session_dir / "session.json.tmp"
+        temp_file.write_text(session.model_dump_json(indent=2))
+        os.replace(temp_file, session_dir / "session.json")
+
+    def _recover_live_sessions(self):
+        """
+        Finish the Parquet files of live sessions that were recording when the application stopped without shutting
+        down cleanly.
+        """
+        root = self.settings.LIVE_RECORDING_DIR
+        if not root.is_dir():
+            return
+        for session_dir in sorted(root.iterdir()):
+            if not any(session_dir.glob(f"*{PARTIAL_SUFFIX}")):
+                continue
+            recovered = recover_partial_files(session_dir / "live")
+            session = self._load_live_session(session_dir) or LiveSessionInfo(name=session_dir.name)
+            session.parquet_files = sorted(path.name for path in session_dir.glob("live_*.parquet"))
+            self._save_live_session(session_dir, session)
+            self.logger.info(f"Live session {session_dir.name}: {len(recovered)} files recovered")
+
+    def get_live_recording_statistics(self) -> Dict[str, WriterStatistics]:
+        """
+        Get the statistics of the writers of the current or last live session.
+        """
+        statistics = {}
+        if self.live_writer is not None:
+            statistics["csv"] = self.live_writer.get_statistics()
+        if self.live_parquet_writer is not None:
+            statistics["parquet"] = self.live_parquet_writer.get_statistics()
+        return statistics
+
+    def get_live_source_statistics(self) -> StepStatistics | None:
+        """
+        Get the time the source of the current or last live session spends per step.
+        :return: None if no live session was started.
+        """
+        if self.live_source is None:
+            return None
+        return self.live_source.get_statistics()
+
+    def _get_live_buffer(self) -> LiveRingBuffer | None:
+        """
+        Get the buffer of the active live session, None if it has no samples yet.
+        """
+        buffer = self.live_buffer
+        csv_file = self.current_project_info.test_drive_data_info.csv_file_full_path
+        if buffer is None or not len(buffer) or not csv_file or buffer.source != Path(csv_file):
+            return None
+        return buffer
+
+    def _get_live_column_names(self) -> List[str]:
+        buffer = self._get_live_buffer()
+        if buffer is not None:
+            return buffer.columns
+        csv_file = self.current_project_info.test_drive_data_info.csv_file_full_path
+        if not csv_file or not os.path.exists(csv_file):
+            return []
+        return self._update_live_reader(csv_file).buffer.columns
+
+    def _get_live_columns(self, requested_columns: List[str], start: Optional[float] = None,
+                          end: Optional[float] = None) -> pd.DataFrame:
+        """
+        Get columns of the live recording. Composite vector columns are returned as their components,
+        derived channels are computed from the rows read so far.
+        Recent rows are taken from the live buffer without parsing anything, only rows older than the buffer are
+        read from the recording.
+        """
+        columns = self.derived_channels.resolve_inputs(requested_columns)
+        buffer = self._get_live_buffer()
+        if buffer is None:
+            df = self._read_live_recording(columns, start, end)
+        else:
+            df = buffer.get_columns(self._resolve_vector_columns(columns, buffer.columns), start, end)
+            if not buffer.covers(start):
+                oldest = buffer.oldest_timestamp
+                older = self._read_live_recording(columns, start, oldest if end is None else min(end, oldest))
+                if "timestamp" in older.columns:
+                    older = older[older["timestamp"] < oldest]
+                if not older.empty:
+                    df = pd.concat([older, df], ignore_index=True)
+        if df.empty:
+            return df
+        return self.derived_channels.add_channels(df, requested_columns)
+
+    def _read_live_recording(self, columns: List[str], start: Optional[float] = None,
+                             end: Optional[float] = None) -> pd.DataFrame:
+        csv_file = self.current_project_info.test_drive_data_info.csv_file_full_path
+        if not csv_file or not os.path.exists(csv_file):
+            self.logger.warning(f"CSV file does not exist: {csv_file}")
+            return pd.DataFrame()
+        # only the rows appended since the last request are parsed
+        reader = self._update_live_reader(csv_file)
+        return reader.get_columns(self._resolve_vector_columns(columns, reader.buffer.columns), start, end)
+
+    @staticmethod
+    def _resolve_vector_columns(columns: List[str], available_columns: List[str]) -> List[str]:
+        vector_columns = find_vector_columns(available_columns)
+        return [component for col in columns for component in vector_columns.get(col, [col])]
+
+    def _update_live_reader(self, csv_file: str) -> CsvTailReader:
+        """
+        Get the reader of the live recording and read the rows appended since the last call.
+        """
+        if self._live_reader is None or self._live_reader.csv_path != Path(csv_file):
+            self._live_reader = CsvTailReader(csv_file)
+        self._live_reader.update()
+        return self._live_reader
+
     def _load_data(self):
         """
         Load the data from the storage file.
@@ -224,11 +701,17 @@ class TestDriveDataService:
         if testdrive_id not in self.test_drive_data_store:
             return None
         self.active_testdrive_id = testdrive_id
+        with self._activation_lock:
+            self._cancel_activation_job()
+            # a lookup of an earlier activation must not be taken by the load of this one
+            self._activation_lookup = None
 
         # check if the test drive is live
         testdrive = self.test_drive_data_store[testdrive_id]
         if testdrive.is_live:
             self.logger.info(f"Live drive {testdrive.id} activated")
+        else:
+            self._activate_cached_dataset(testdrive)
 
         return self.get_active_testdrive()
 
@@ -241,6 +724,7 @@ class TestDriveDataService:
             return None
         testdrive = self.get_active_testdrive()
         self.active_testdrive_id = None
+        self.cancel_activation()
         return testdrive
 
     def has_live_data(self) -> bool:
@@ -293,7 +777,8 @@ class TestDriveDataService:
         test_drive.test_drive_tag_info.tag_file_full_path = str(tag_file.resolve())
 
         with tempfile.NamedTemporaryFile(mode='w', suffix='.csv', delete=False, newline='') as f:
-            writer = csv.DictWriter(f, fieldnames=[field for field in FIELD_NAME_MAP])
+            # the header fixes the columns the live samples are written with
+            writer = csv.DictWriter(f, fieldnames=LIVE_CSV_FIELDNAMES)
             writer.writeheader()
             temp_path = Path(f.name)
             test_drive.test_drive_data_info.csv_file_name = f.name
@@ -0,0 +1,101 @@
+from typing import Literal, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+SamplingMethod = Literal["nearest", "linear"]
+
+
+class TimestampIndex:
+    """
+    Sorted index over the timestamp column of a data set. Time ranges are resolved to row positions by binary search,
+    so slicing costs time proportional to the size of the slice and not to the length of the data set.
+    """
+
+    def __init__(self, timestamps: np.ndarray):
+        values = np.asarray(timestamps, dtype=np.float64)
+        if len(values) < 2 or np.all(values[1:] >= values[:-1]):
+            # recordings are written in time order, so usually no sort is needed
+            self.order = None
+            self.sorted_timestamps = values
+        else:
+            self.order = np.argsort(values, kind="stable")
+            self.sorted_timestamps = values[self.order]
+
+    def __len__(self) -> int:
+        return len(self.sorted_timestamps)
+
+    @property
+    def memory_usage(self) -> int:
+        # without an order, sorted_timestamps is the timestamp column itself
+        return 0 if self.order is None else self.order.nbytes + self.sorted_timestamps.nbytes
+
+    def bounds(self, start: Optional[float] = None, end: Optional[float] = None) -> Tuple[int, int]:
+        """
+        Get the positions in sorted_timestamps of the time range start <= timestamp <= end.
+        :return: The first position (inclusive) and the last position (exclusive) of the range.
+        """
+        lower = 0 if start is None else int(np.searchsorted(self.sorted_timestamps, start, side="left"))
+        upper = len(self) if end is None else int(np.searchsorted(self.sorted_timestamps, end, side="right"))
+        return lower, max(lower, upper)
+
+    def rows(self, start: Optional[float] = None, end: Optional[float] = None) -> slice | np.ndarray:
+        """
+        Get the rows with start <= timestamp <= end.
+        :param start: Start of the time range in seconds. If None, the range starts at the first row.
+        :param end: End of the time range in seconds. If None, the range ends at the last row.
+        :return: A slice of row positions, or an array of row positions in time order if the data is not sorted.
+        """
+        lower, upper = self.bounds(start, end)
+        if self.order is None:
+            return slice(lower, upper)
+        return self.order[lower:upper]
+
+    def nearest(self, timestamps: np.ndarray) -> np.ndarray:
+        """
+        Get the positions in sorted_timestamps of the timestamps closest to the given ones.
+        """
+        timestamps = np.asarray(timestamps, dtype=np.float64)
+        upper = np.clip(np.searchsorted(self.sorted_timestamps, timestamps, side="left"), 0, len(self) - 1)
+        lower = np.maximum(upper - 1, 0)
+        closer_to_upper = (np.abs(self.sorted_timestamps[upper] - timestamps) <
+                           np.abs(timestamps - self.sorted_timestamps[lower]))
+        return np.where(closer_to_upper, upper, lower)
+
+    def sample(self, df: pd.DataFrame, timestamps: np.ndarray, method: SamplingMethod = "nearest") -> pd.DataFrame:
+        """
+        Get the rows of a data frame at the given timestamps.
+        :param df: The data, in the row order of the timestamps the index was built from.
+        :param timestamps: The timestamps to sample at.
+        :param method: nearest takes the closest row, linear interpolates numeric columns between the two rows
+        around each timestamp. Timestamps outside the data are clamped to the first or last row.
+        :return: One row per timestamp.
+        """
+        timestamps = np.asarray(timestamps, dtype=np.float64)
+        if len(self) == 0:
+            return df.iloc[:0]
+        if method == "nearest" or len(self) == 1:
+            return df.iloc[self._to_rows(self.nearest(timestamps))].reset_index(drop=True)
+
+        upper = np.clip(np.searchsorted(self.sorted_timestamps, timestamps, side="right"), 1, len(self) - 1)
+        lower = upper - 1
+        interval = self.sorted_timestamps[upper] - self.sorted_timestamps[lower]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            weights = np.clip(np.where(interval > 0, (timestamps - self.sorted_timestamps[lower]) / interval, 0.0),
+                              0.0, 1.0)
+        lower_rows, upper_rows = self._to_rows(lower), self._to_rows(upper)
+        nearest_rows = np.where(weights < 0.5, lower_rows, upper_rows)
+
+        result = {}
+        for column in df.columns:
+            values = df[column].to_numpy()
+            if values.dtype.kind in "iuf":
+                values = values.astype(np.float64, copy=False)
+                result[column] = values[lower_rows] * (1.0 - weights) + values[upper_rows] * weights
+            else:
+                # text and vector values cannot be interpolated
+                result[column] = values[nearest_rows]
+        return pd.DataFrame(result, columns=df.columns)
+
+    def _to_rows(self, positions: np.ndarray) -> np.ndarray:
+        return positions if self.order is None else self.order[positions]
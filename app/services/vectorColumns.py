@@ -0,0 +1,200 @@
+import logging
+from dataclasses import dataclass
+from typing import Dict, List, Tuple
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+
+from app.models.liveDataRow import FIELD_NAME_MAP, get_quaternion, get_vector3, get_vector3d_double
+
+logger = logging.getLogger('uvicorn.error')
+
+VECTOR3_COMPONENTS = ("x", "y", "z")
+# quaternions are recorded scalar first, the identity is 1,0,0,0
+QUATERNION_COMPONENTS = ("w", "x", "y", "z")
+
+
+@dataclass(frozen=True)
+class VectorLayout:
+    components: Tuple[str, ...]
+    dtype: type
+
+    @property
+    def size(self) -> int:
+        return len(self.components)
+
+
+# Layout of the composite cells, keyed by the getter used to read the field from panthera.
+# Single precision values are still stored as float64: the recorded text is already rounded, and widening float32
+# on output would serialize values like 0.1 as 0.10000000149011612.
+GETTER_LAYOUTS = {
+    get_vector3: VectorLayout(VECTOR3_COMPONENTS, np.float64),
+    get_vector3d_double: VectorLayout(VECTOR3_COMPONENTS, np.float64),
+    get_quaternion: VectorLayout(QUATERNION_COMPONENTS, np.float64),
+}
+
+VECTOR_FIELD_LAYOUTS: Dict[str, VectorLayout] = {
+    name: GETTER_LAYOUTS[getter] for name, getter in FIELD_NAME_MAP if getter in GETTER_LAYOUTS
+}
+
+
+def component_names(name: str, layout: VectorLayout) -> List[str]:
+    """
+    Get the names of the split component columns of a composite column, e.g. lin_acc -> lin_acc_x, lin_acc_y, lin_acc_z
+    """
+    return [f"{name}_{component}" for component in layout.components]
+
+
+def _guess_layout(values: pd.Series) -> VectorLayout | None:
+    """
+    Guess the layout of a composite column that is not part of FIELD_NAME_MAP from its first value.
+    """
+    non_null = values.dropna()
+    if non_null.empty:
+        return None
+    parts = str(non_null.iloc[0]).strip("[] ").split(",")
+    if len(parts) not in (3, 4):
+        return None
+    try:
+        [float(part) for part in parts]
+    except ValueError:
+        return None
+    return VectorLayout(VECTOR3_COMPONENTS if len(parts) == 3 else QUATERNION_COMPONENTS, np.float64)
+
+
+# a component arrow can parse as a number, checked before the cast because the cast fails on the first bad value
+_NUMBER_PATTERN = r"^[+-]?(\d+\.?\d*|\.\d+)([eE][+-]?\d+)?$|^[+-]?(nan|inf|infinity)$"
+
+
+def parse_vector_column(values: pd.Series, layout: VectorLayout) -> np.ndarray:
+    """
+    Parse composite cells like "0,-0,0.000250629" or "[0.1, 0.2, 0.3]" into a contiguous (rows x components) array.
+    The whole column is parsed by arrow compute kernels, cells that are empty or malformed become NaN.
+    """
+    result = np.full((len(values), layout.size), np.nan, dtype=layout.dtype)
+
+    cells = pa.array(values.to_numpy(dtype=object), type=pa.string(), from_pandas=True)
+    cells = pc.replace_substring_regex(cells, pattern=r"[\[\]\s]", replacement="")
+    parts = pc.split_pattern(cells, pattern=",")
+
+    valid = pc.fill_null(pc.equal(pc.list_value_length(parts), layout.size), False)
+    valid_mask = valid.to_numpy(zero_copy_only=False)
+    if not valid_mask.any():
+        return result
+
+    components = pc.list_flatten(pc.filter(parts, valid))
+    numeric = pc.match_substring_regex(components, pattern=_NUMBER_PATTERN, ignore_case=True)
+    numbers = pc.cast(pc.if_else(numeric, components, pa.scalar(None, pa.string())), pa.float64(), safe=False)
+    result[valid_mask] = numbers.to_numpy(zero_copy_only=False).reshape(-1, layout.size)
+    # a cell with an empty or malformed component is malformed as a whole
+    well_formed = numeric.to_numpy(zero_copy_only=False).reshape(-1, layout.size).all(axis=1)
+    result[np.flatnonzero(valid_mask)[~well_formed]] = np.nan
+    return result
+
+
+def expand_vector_columns(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Replace composite vector and quaternion columns by numeric component columns.
+    Columns listed in FIELD_NAME_MAP use the layout of their getter, other text columns are expanded
+    if their values look like vectors.
+    """
+    expanded = {}
+    for name in df.columns:
+        values = df[name]
+        layout = VECTOR_FIELD_LAYOUTS.get(name)
+        if values.dtype != object:
+            expanded[name] = values
+            continue
+        if layout is None:
+            layout = _guess_layout(values)
+        if layout is None:
+            expanded[name] = values
+            continue
+        parsed = parse_vector_column(values, layout)
+        for i, component_name in enumerate(component_names(name, layout)):
+            expanded[component_name] = parsed[:, i]
+    return pd.DataFrame(expanded, index=df.index)
+
+
+def field_column_names() -> List[str]:
+    """
+    Get the columns of recordings made from FIELD_NAME_MAP: the fields, the components of composite fields and the
+    timestamp.
+    """
+    names = []
+    for name, _ in FIELD_NAME_MAP:
+        names.append(name)
+        if name in VECTOR_FIELD_LAYOUTS:
+            names.extend(component_names(name, VECTOR_FIELD_LAYOUTS[name]))
+    return names + ["timestamp"]
+
+
+def find_vector_columns(columns: List[str]) -> Dict[str, List[str]]:
+    """
+    Find the composite columns in a list of split component columns.
+    :return: Mapping of composite column name to its component column names.
+    """
+    available = set(columns)
+    vectors = {}
+    for column in columns:
+        if not column.endswith("_x"):
+            continue
+        name = column[:-2]
+        for components in (QUATERNION_COMPONENTS, VECTOR3_COMPONENTS):
+            names = [f"{name}_{component}" for component in components]
+            if all(n in available for n in names):
+                vectors[name] = names
+                break
+    return vectors
+
+
+def combine_vector_columns(df: pd.DataFrame, vector_columns: Dict[str, List[str]]) -> pd.DataFrame:
+    """
+    Combine split component columns into one column of number lists, which is the shape the frontend expects.
+    :param df: Data containing the component columns.
+    :param vector_columns: Composite columns to create, mapped to their component columns.
+    """
+    if not vector_columns:
+        return df
+    df = df.copy()
+    for name, components in vector_columns.items():
+        values = df[components].to_numpy(dtype=np.float64)
+        df[name] = pd.Series(values.tolist(), index=df.index, dtype=object)
+    return df
+
+
+def select_columns(df: pd.DataFrame, requested_columns: List[str]) -> pd.DataFrame:
+    """
+    Select columns from data with split component columns. Requested composite columns are combined from their
+    components, unknown columns are ignored.
+    """
+    vector_columns = find_vector_columns(list(df.columns))
+    selected_vectors = {name: vector_columns[name] for name in requested_columns if name in vector_columns}
+
+    source_columns = []
+    for name in requested_columns:
+        for column in selected_vectors.get(name, [name]):
+            if column in df.columns and column not in source_columns:
+                source_columns.append(column)
+
+    result = combine_vector_columns(df[source_columns], selected_vectors)
+    return result[[name for name in dict.fromkeys(requested_columns) if name in result.columns]]
+
+
+def describe_columns(df: pd.DataFrame) -> List[Tuple[str, str]]:
+    """
+    Describe the columns of data with split component columns. Composite columns are listed with their vector type
+    in front of their components.
+    """
+    vector_columns = find_vector_columns(list(df.columns))
+    first_components = {components[0]: name for name, components in vector_columns.items()}
+
+    description = []
+    for column, dtype in df.dtypes.items():
+        if column in first_components:
+            name = first_components[column]
+            description.append((name, f"vector{len(vector_columns[name])}"))
+        description.append((column, str(dtype)))
+    return description
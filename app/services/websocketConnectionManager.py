@@ -1,22 +1,82 @@
 import logging
-from typing import List, Any
+import math
+import struct
+import time
+from dataclasses import dataclass, field
+from typing import Dict, List, Any, Optional, Tuple
 
 from starlette.websockets import WebSocket
 
+from app.models.liveSubscription import LiveSubscription
+from app.services.coalescingBroadcaster import CoalescingBroadcaster
+from app.services.jsonEncoding import encode_json
+from app.services.liveFrameEncoding import LiveFrameEncoding, LiveFrameSchema
+
 logger = logging.getLogger('uvicorn.error')
 
+# a rate limited subscription gets a sample once this share of its interval passed, so a subscription at the
+# broadcast rate does not skip samples because of timer jitter
+RATE_TOLERANCE = 0.9
+
+# connections with the same encoding, channels, rate and delta mode share their frames
+SubscriptionKey = Tuple[LiveFrameEncoding, Optional[Tuple[str, ...]], Optional[float], bool]
+
+
+@dataclass
+class DeltaState:
+    """
+    The values last sent to a delta subscription and when its last keyframe was sent.
+    """
+    keyframe_at: float
+    values: Dict[str, Any] = field(default_factory=dict)
+
+
+def _unchanged(previous: Any, value: Any) -> bool:
+    if previous is value:
+        return True
+    if isinstance(value, list) and isinstance(previous, list):
+        return len(previous) == len(value) and all(map(_unchanged, previous, value))
+    if isinstance(value, float) and isinstance(previous, float) and math.isnan(value) and math.isnan(previous):
+        return True
+    return previous == value
+
 
 class WebsocketConnectionManager:
-    def __init__(self, name: str):
+    def __init__(self, name: str, frame_schema: Optional[LiveFrameSchema] = None,
+                 broadcast_rate_hz: Optional[float] = None, keyframe_interval: float = 5.0):
+        """
+        :param frame_schema: Layout of binary frames, connections can only ask for binary frames if there is one.
+        :param broadcast_rate_hz: Maximum rate of the samples sent with publish, required to use publish.
+        :param keyframe_interval: Time in seconds between the keyframes of delta subscriptions.
+        """
         self.active_connections: List[WebSocket] = []
+        self.subscriptions: Dict[WebSocket, SubscriptionKey] = {}
         self.name = name
+        self.frame_schema = frame_schema
+        self.keyframe_interval = keyframe_interval
+        self._last_sent: Dict[SubscriptionKey, float] = {}
+        self._delta_states: Dict[SubscriptionKey, DeltaState] = {}
+        self._schemas: Dict[Tuple[str, ...], LiveFrameSchema] = {}
+        self.broadcaster = None if broadcast_rate_hz is None else \
+            CoalescingBroadcaster(name, self.broadcast_frame, broadcast_rate_hz)
 
-    async def connect(self, websocket: WebSocket):
+    async def connect(self, websocket: WebSocket, encoding: LiveFrameEncoding = "json"):
+        """
+        Accept a connection. Connections with binary encoding receive the frame schema as JSON first.
+        The connection is subscribed to all fields until it sends a subscription.
+        :param encoding: The encoding of the frames sent with broadcast_frame.
+        """
+        if encoding == "binary" and self.frame_schema is None:
+            raise ValueError(f"WebSocket {self.name} does not support binary frames")
         await websocket.accept()
+        if encoding == "binary":
+            await websocket.send_json(self.frame_schema.describe())
         self.active_connections.append(websocket)
-        logger.info(f"WebSocket {self.name} connected: {websocket}")
+        self.subscriptions[websocket] = (encoding, None, None, False)
+        logger.info(f"WebSocket {self.name} connected with {encoding} frames: {websocket}")
 
     def disconnect(self, websocket: WebSocket):
+        self.subscriptions.pop(websocket, None)
         if websocket in self.active_connections:
             self.active_connections.remove(websocket)
             logger.info(f"WebSocket {self.name} disconnected: {websocket}")
@@ -42,3 +102,120 @@ class WebsocketConnectionManager:
                 logger.debug(f"Skipping sender connection: {connection}")
                 continue
             await self._safe_send(connection, connection.send_json, message)
+
+    async def subscribe(self, websocket: WebSocket, subscription: LiveSubscription):
+        """
+        Limit the frames sent to a connection to the subscribed channels and rate. The connection receives a
+        confirmation with the channels that are sent, and connections with binary encoding the schema of their frames.
+        In delta mode the next frame of the subscription is a keyframe, so the new connection starts from a full state.
+        """
+        encoding = self.subscriptions.get(websocket, ("json", None, None, False))[0]
+        channels, unknown = None, []
+        if subscription.channels is not None:
+            known = set(self.frame_schema.field_names) if self.frame_schema is not None else None
+            unknown = [channel for channel in subscription.channels if known is not None and channel not in known]
+            # sorted, so connections that list the same channels in another order share their frames
+            channels = tuple(sorted(set(subscription.channels) - set(unknown)))
+        key = (encoding, channels, subscription.max_rate_hz, subscription.delta)
+        self.subscriptions[websocket] = key
+        self._delta_states.pop(key, None)
+
+        await websocket.send_json({"type": "subscribed", "channels": None if channels is None else list(channels),
+                                   "max_rate_hz": subscription.max_rate_hz, "delta": subscription.delta,
+                                   "unknown_channels": unknown})
+        if encoding == "binary":
+            await websocket.send_json(self._get_schema(channels).describe())
+        logger.info(f"WebSocket {self.name} subscribed to {'all' if channels is None else len(channels)} channels "
+                    f"at {subscription.max_rate_hz or 'full'} rate: {websocket}")
+
+    async def broadcast_frame(self, data: dict):
+        """
+        Send a sample to every connection, projected to the channels it subscribed to and in the encoding it asked
+        for. Connections with the same subscription share one encoded frame.
+        """
+        groups: Dict[SubscriptionKey, List[WebSocket]] = {}
+        for connection in list(self.active_connections):
+            groups.setdefault(self.subscriptions.get(connection, ("json", None, None, False)), []).append(connection)
+        # subscriptions without connections are forgotten
+        self._last_sent = {key: sent for key, sent in self._last_sent.items() if key in groups}
+        self._delta_states = {key: state for key, state in self._delta_states.items() if key in groups}
+
+        now = time.monotonic()
+        for key, connections in groups.items():
+            encoding, channels, max_rate_hz, delta = key
+            if max_rate_hz is not None:
+                last_sent = self._last_sent.get(key)
+                if last_sent is not None and now - last_sent < RATE_TOLERANCE / max_rate_hz:
+                    continue
+                self._last_sent[key] = now
+
+            if delta:
+                frame = self._encode_delta_frame(key, self._project(data, channels), now)
+            else:
+                frame = self._encode_frame(self._project(data, channels), encoding, channels)
+            if frame is None:
+                continue
+            for connection in connections:
+                if encoding == "binary":
+                    await self._safe_send(connection, connection.send_bytes, frame)
+                else:
+                    await self._safe_send(connection, connection.send_text, frame)
+
+    def publish(self, data: dict):
+        """
+        Broadcast a sample with broadcast_frame at the rate of the broadcaster, safe to call from any thread.
+        Samples arriving faster are coalesced, only the latest value of each field is sent.
+        """
+        self.broadcaster.submit(data)
+
+    @staticmethod
+    def _project(data: dict, channels: Optional[Tuple[str, ...]]) -> dict:
+        if channels is None:
+            return data
+        projected = {channel: data[channel] for channel in channels if channel in data}
+        if "timestamp" in data:
+            projected["timestamp"] = data["timestamp"]
+        return projected
+
+    def _get_schema(self, channels: Optional[Tuple[str, ...]]) -> LiveFrameSchema:
+        if channels is None:
+            return self.frame_schema
+        if channels not in self._schemas:
+            self._schemas[channels] = self.frame_schema.select(channels)
+        return self._schemas[channels]
+
+    def _encode_delta_frame(self, key: SubscriptionKey, data: dict, now: float) -> bytes | str | None:
+        """
+        Encode the fields that changed since the last frame of a delta subscription, or a keyframe with all fields
+        if the subscription has none yet or its last keyframe is older than the keyframe interval.
+        Fields missing from the sample are treated as unchanged.
+        """
+        encoding, channels, _, _ = key
+        state = self._delta_states.get(key)
+        if state is None or now - state.keyframe_at >= self.keyframe_interval:
+            self._delta_states[key] = DeltaState(now, dict(data))
+            if encoding == "json":
+                return self._encode_frame({**data, "keyframe": True}, encoding)
+            return self._encode_frame(data, encoding, channels)
+
+        changed = {name: value for name, value in data.items()
+                   if name == "timestamp" or not _unchanged(state.values.get(name), value)}
+        state.values.update(changed)
+        if encoding == "json":
+            return self._encode_frame(changed, encoding)
+        try:
+            return self._get_schema(channels).encode_delta(changed)
+        except (struct.error, TypeError) as e:
+            logger.warning(f"Websocket {self.name}: Failed to encode binary delta frame: {e}")
+            return None
+
+    def _encode_frame(self, data: dict, encoding: LiveFrameEncoding,
+                      channels: Optional[Tuple[str, ...]] = None) -> bytes | str | None:
+        if encoding == "json":
+            # NaN and infinite values become null, the standard encoder would write invalid JSON
+            return encode_json(data).decode()
+        try:
+            return self._get_schema(channels).encode(data)
+        except (struct.error, TypeError) as e:
+            logger.warning(f"Websocket {self.name}: Failed to encode binary frame: {e}")
+            return None
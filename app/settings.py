@@ -1,5 +1,6 @@
 import os
 from pathlib import Path
+from typing import Literal
 
 from pydantic_settings import BaseSettings, SettingsConfigDict
 from pydantic import Field
@@ -24,6 +25,33 @@ class Settings(BaseSettings):
     VIDEO_PATH: str = Field("videos", env="VIDEO_PATH")
     SPRITE_FOLDER: str = Field("./sprites", env="SPRITE_FOLDER")
 
+    # Data loading
+    DATA_CACHE_ENABLED: bool = Field(True, env="DATA_CACHE_ENABLED")
+    # pandas parses on one core, arrow on all cores
+    CSV_READER: Literal["pandas", "arrow"] = Field("pandas", env="CSV_READER")
+    COLUMN_CACHE_MAX_BYTES: int = Field(512 * 1024 * 1024, env="COLUMN_CACHE_MAX_BYTES")
+    DATASET_CACHE_MAX_BYTES: int = Field(512 * 1024 * 1024, env="DATASET_CACHE_MAX_BYTES")
+    DATASET_CACHE_MAX_ENTRIES: int = Field(8, env="DATASET_CACHE_MAX_ENTRIES")
+    # compressed data responses
+    RESPONSE_CACHE_MAX_BYTES: int = Field(128 * 1024 * 1024, env="RESPONSE_CACHE_MAX_BYTES")
+    # larger Arrow responses are streamed batch by batch instead of being built and cached as a whole
+    ARROW_STREAM_MIN_BYTES: int = Field(16 * 1024 * 1024, env="ARROW_STREAM_MIN_BYTES")
+    # recent live samples are served from memory, the buffer holds about this many minutes at the given rate
+    LIVE_BUFFER_MINUTES: float = Field(10.0, env="LIVE_BUFFER_MINUTES")
+    LIVE_SAMPLE_RATE_HZ: float = Field(10.0, env="LIVE_SAMPLE_RATE_HZ")
+    # live samples wait at most this many seconds before they are written, samples beyond the queue size are dropped
+    LIVE_WRITER_FLUSH_INTERVAL: float = Field(1.0, env="LIVE_WRITER_FLUSH_INTERVAL")
+    LIVE_WRITER_MAX_QUEUE_SIZE: int = Field(10_000, env="LIVE_WRITER_MAX_QUEUE_SIZE")
+    # maximum rate of the live samples sent to /ws/data and of the simulation time sent to /ws/simulationTime
+    LIVE_DATA_BROADCAST_RATE_HZ: float = Field(2.0, env="LIVE_DATA_BROADCAST_RATE_HZ")
+    SIMULATION_TIME_BROADCAST_RATE_HZ: float = Field(10.0, env="SIMULATION_TIME_BROADCAST_RATE_HZ")
+    # live data clients in delta mode receive all fields at least this often in seconds
+    LIVE_KEYFRAME_INTERVAL: float = Field(5.0, env="LIVE_KEYFRAME_INTERVAL")
+    # live sessions are also recorded to Parquet files, a new file is started after this size or time
+    LIVE_PARQUET_ENABLED: bool = Field(True, env="LIVE_PARQUET_ENABLED")
+    LIVE_PARQUET_MAX_FILE_BYTES: int = Field(256 * 1024 * 1024, env="LIVE_PARQUET_MAX_FILE_BYTES")
+    LIVE_PARQUET_MAX_FILE_SECONDS: float = Field(600.0, env="LIVE_PARQUET_MAX_FILE_SECONDS")
+
     # Derived upload paths
     @property
     def CSV_UPLOAD_DIR(self) -> Path:
@@ -31,6 +59,11 @@ class Settings(BaseSettings):
         path.mkdir(parents=True, exist_ok=True)
         return path
 
+    @property
+    def LIVE_RECORDING_DIR(self) -> Path:
+        # one directory per live session, created when the session is recorded
+        return Path(self.CSV_PATH) / "live"
+
     @property
     def VIDEO_UPLOAD_DIR(self) -> Path:
         path = Path("uploaded/videos")
@@ -0,0 +1,60 @@
+import argparse
+import csv
+import os
+import tempfile
+import time
+from pathlib import Path
+
+from app.services.csvReaders import CSV_READERS, get_csv_reader
+
+SAMPLE_RECORDING = Path(__file__).parent / "tests" / "test_recording.csv"
+
+
+def create_recording(path: Path, size_mb: int):
+    """
+    Create a large recording by repeating the rows of the sample recording with increasing timestamps.
+    """
+    with open(SAMPLE_RECORDING, "r", newline="") as f:
+        header, units, *rows = list(csv.reader(f))
+    timestamp_position = header.index("timestamp")
+    duration = float(rows[-1][timestamp_position]) - float(rows[0][timestamp_position]) + 0.01
+
+    target_size = size_mb * 1024 * 1024
+    with open(path, "w", newline="") as f:
+        writer = csv.writer(f, quoting=csv.QUOTE_ALL)
+        writer.writerows([header, units])
+        offset = 0.0
+        while f.tell() < target_size:
+            for row in rows:
+                row = list(row)
+                row[timestamp_position] = f"{float(row[timestamp_position]) + offset:.3f}"
+                writer.writerow(row)
+            offset += duration
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare the parse time of the CSV reader backends.")
+    parser.add_argument("--csv", help="Recording to parse. If omitted, a recording of --size-mb is generated.")
+    parser.add_argument("--size-mb", type=int, default=2048, help="Size of the generated recording in MB")
+    parser.add_argument("--repeat", type=int, default=3, help="Number of runs per reader")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        csv_path = Path(args.csv) if args.csv else Path(temp_dir) / "recording.csv"
+        if not args.csv:
+            print(f"Generating a {args.size_mb} MB recording")
+            create_recording(csv_path, args.size_mb)
+        print(f"{csv_path}: {os.path.getsize(csv_path) / 1024 / 1024:.0f} MB, {os.cpu_count()} cores")
+
+        timings = {}
+        for name in CSV_READERS:
+            reader = get_csv_reader(name)
+            runs = []
+            for _ in range(args.repeat):
+                start = time.perf_counter()
+                df = reader.read(csv_path)
+                runs.append(time.perf_counter() - start)
+            timings[name] = min(runs)
+            print(f"{name:>8}: {timings[name]:.2f} s, {len(df)} rows, {len(df.columns)} columns")
+
+        print(f"speedup arrow/pandas: {timings['pandas'] / timings['arrow']:.1f}x")
@@ -0,0 +1,27 @@
+import shutil
+from pathlib import Path
+
+import pytest
+
+RECORDING = Path(__file__).parent / "test_recording.csv"
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+
+@pytest.fixture
+def copy_recording(tmp_path):
+    """Provides a function that copies the test recording into a temporary folder and returns the copy."""
+    def copy(name: str = "recording.csv") -> Path:
+        path = tmp_path / name
+        shutil.copy(RECORDING, path)
+        return path
+    return copy
+
+
+@pytest.fixture
+def recording(copy_recording):
+    """Provides a copy of the test recording in a temporary folder."""
+    return copy_recording()
@@ -0,0 +1,44 @@
+import pytest
+
+from app.models.activationStatus import ActivationState
+from app.models.testDriveDataInfo import TestDriveDataInfo
+from app.models.testDriveProjectInfo import TestDriveProjectInfo
+from app.services.activationJob import ActivationJob
+from app.services.columnCache import ColumnCache
+from app.services.recordingCache import is_cache_valid
+
+
+@pytest.fixture
+def project_info(recording):
+    """Provides a project with a copy of the test recording."""
+    return TestDriveProjectInfo(id=1, test_drive_data_info=TestDriveDataInfo(csv_file_full_path=str(recording)))
+
+
+def test_chunked_load_reports_progress(project_info, monkeypatch):
+    monkeypatch.setattr(ActivationJob, "CHUNK_ROWS", 20)
+    progress = []
+    job = ActivationJob(project_info, ColumnCache(max_bytes=1024 * 1024), on_progress=progress.append)
+
+    dataset = job.run()
+
+    assert dataset is not None
+    assert job.status.state == ActivationState.COMPLETED
+    assert job.status.rows_read == 99
+    assert [status.rows_read for status in progress if status.state == ActivationState.LOADING] == \
+           [0, 20, 40, 60, 80, 99]
+    assert is_cache_valid(project_info.test_drive_data_info.csv_file_full_path)
+    assert len(dataset.get_columns(["car0_velocity"])) == 99
+
+
+def test_cancelled_load_returns_nothing(project_info, monkeypatch):
+    monkeypatch.setattr(ActivationJob, "CHUNK_ROWS", 20)
+
+    def cancel_after_first_chunk(status):
+        if status.rows_read > 0:
+            job.cancel()
+
+    job = ActivationJob(project_info, ColumnCache(max_bytes=1024 * 1024), on_progress=cancel_after_first_chunk)
+
+    assert job.run() is None
+    assert job.status.state == ActivationState.CANCELLED
+    assert job.status.rows_read == 20
@@ -0,0 +1,30 @@
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+from app.services.arrowStream import iter_ipc_stream, to_arrow_table
+
+
+def test_to_arrow_table_combines_vector_columns():
+    df = pd.DataFrame({
+        "timestamp": [0.0, 0.1],
+        "pos_x": [1.0, 4.0], "pos_y": [2.0, 5.0], "pos_z": [3.0, 6.0],
+        "name": ["a", None],
+    })
+
+    table = to_arrow_table(df, ["pos", "name", "timestamp", "unknown"])
+
+    assert table.column_names == ["pos", "name", "timestamp"]
+    assert table.schema.field("pos").type == pa.list_(pa.float64(), 3)
+    assert table.column("pos").to_pylist() == [[1.0, 2.0, 3.0], [4.0, 5.0, 6.0]]
+    assert table.column("name").to_pylist() == ["a", None]
+
+
+def test_iter_ipc_stream_is_readable():
+    table = pa.table({"timestamp": np.arange(10, dtype=np.float64), "speed": np.arange(10)})
+
+    stream = b"".join(bytes(chunk) for chunk in iter_ipc_stream(table, batch_rows=4))
+    result = pa.ipc.open_stream(stream).read_all()
+
+    assert result.equals(table)
+    assert len(result.to_batches()) == 3
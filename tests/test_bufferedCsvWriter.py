@@ -0,0 +1,67 @@
+import csv
+import time
+
+import pandas as pd
+
+from app.services.bufferedCsvWriter import BufferedCsvWriter
+from app.services.csvTailReader import CsvTailReader
+
+FIELDNAMES = ["car0_vehicle_pos", "car0_velocity", "timestamp"]
+
+
+def sample(i):
+    return {"car0_vehicle_pos": [1.0, 2.0, float(i)], "car0_velocity": i * 2.0, "timestamp": i * 0.001}
+
+
+def test_rows_follow_the_header(tmp_path):
+    path = tmp_path / "live.csv"
+    with open(path, "w", newline="") as f:
+        csv.writer(f).writerow(FIELDNAMES)
+    writer = BufferedCsvWriter(path, fieldnames=["timestamp"])
+
+    writer.enqueue({"timestamp": 0.0, "car0_velocity": 1.0})
+    writer.enqueue({"car0_velocity": 2.0, "unknown": 1, "timestamp": 0.1, "car0_vehicle_pos": [1, 2, 3]})
+    writer.shutdown()
+
+    df = pd.read_csv(path)
+    assert list(df.columns) == FIELDNAMES
+    assert df["car0_velocity"].tolist() == [1.0, 2.0]
+    assert df["car0_vehicle_pos"].isna().tolist() == [True, False]
+
+
+def test_drains_on_shutdown(tmp_path):
+    path = tmp_path / "live.csv"
+    writer = BufferedCsvWriter(path, fieldnames=FIELDNAMES, flush_interval=60)
+
+    for i in range(5000):
+        assert writer.enqueue(sample(i))
+    writer.shutdown()
+
+    reader = CsvTailReader(path)
+    assert reader.update() == 5000
+    assert reader.get_columns(["car0_vehicle_pos_z"])["car0_vehicle_pos_z"].tolist() == [float(i) for i in range(5000)]
+    statistics = writer.get_statistics()
+    assert statistics.rows_written == 5000 and statistics.rows_dropped == 0 and statistics.queue_depth == 0
+    assert not writer.enqueue(sample(5000))
+
+
+def test_full_queue_drops_samples(tmp_path):
+    writer = BufferedCsvWriter(tmp_path / "live.csv", fieldnames=FIELDNAMES, max_queue_size=10)
+    writer.shutdown_event.set()
+    writer.thread.join()
+
+    assert not writer.enqueue(sample(0))
+    assert writer.get_statistics().rows_dropped == 1
+
+
+def test_keeps_up_with_1khz(tmp_path):
+    writer = BufferedCsvWriter(tmp_path / "live.csv", fieldnames=FIELDNAMES, flush_interval=0.05)
+
+    for i in range(2000):
+        writer.enqueue(sample(i))
+        time.sleep(0.0005)
+    writer.shutdown()
+
+    statistics = writer.get_statistics()
+    assert statistics.rows_written == 2000
+    assert statistics.max_queue_depth < statistics.queue_capacity
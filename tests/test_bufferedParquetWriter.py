@@ -0,0 +1,138 @@
+import time
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from app.models.liveDataRow import get_float, get_int, get_vector3
+from app.models.testDriveDataInfo import TestDriveDataInfo
+from app.models.testDriveProjectInfo import TestDriveProjectInfo
+from app.services.bufferedParquetWriter import BufferedParquetWriter, live_parquet_schema, read_parquet_recording, \
+    recover_partial_files
+from app.services.testDriveDataService import TestDriveDataService
+from app.settings import Settings
+
+FIELD_MAP = [("car0_vehicle_pos", get_vector3), ("car0_velocity", get_float), ("car0_gear", get_int),
+             ("unread", None)]
+
+
+def sample(i):
+    return {"car0_vehicle_pos": [1.0, 2.0, float(i)], "car0_velocity": i * 2.0, "car0_gear": i % 5,
+            "timestamp": i * 0.001}
+
+
+def test_schema_has_sidecar_layout():
+    schema = live_parquet_schema(FIELD_MAP)
+
+    assert schema.names == ["car0_vehicle_pos_x", "car0_vehicle_pos_y", "car0_vehicle_pos_z", "car0_velocity",
+                            "car0_gear", "timestamp"]
+    assert schema.field("car0_gear").type == pa.int64()
+    assert schema.field("car0_vehicle_pos_z").type == pa.float64()
+
+
+def test_batches_are_combined_into_row_groups(tmp_path, monkeypatch):
+    monkeypatch.setattr("app.services.bufferedParquetWriter.ROW_GROUP_ROWS", 200)
+    writer = BufferedParquetWriter(tmp_path / "live", FIELD_MAP, batch_size=100, flush_interval=60)
+
+    for i in range(250):
+        writer.enqueue(sample(i))
+    writer.enqueue({"timestamp": 0.25})
+    writer.shutdown()
+
+    assert writer.files == [tmp_path / "live_0001.parquet"]
+    metadata = pq.read_metadata(writer.files[0])
+    assert metadata.num_rows == 251 and metadata.num_row_groups == 2
+    df = pq.read_table(writer.files[0]).to_pandas()
+    assert df["car0_vehicle_pos_z"].tolist()[:250] == [float(i) for i in range(250)]
+    assert df["car0_gear"].iloc[:250].tolist() == [i % 5 for i in range(250)]
+    assert df.iloc[-1][["car0_velocity", "car0_vehicle_pos_x", "car0_gear"]].isna().all()
+    assert writer.get_statistics().rows_written == 251
+    assert not list(tmp_path.glob("*.arrows"))
+
+
+def test_rotation_registers_closed_files(tmp_path):
+    closed = []
+    writer = BufferedParquetWriter(tmp_path / "live", FIELD_MAP, max_file_bytes=1, on_file_closed=closed.append,
+                                   batch_size=100, flush_interval=60)
+
+    for i in range(300):
+        writer.enqueue(sample(i))
+    writer.shutdown()
+
+    assert closed == writer.files
+    assert [path.name for path in closed] == ["live_0001.parquet", "live_0002.parquet", "live_0003.parquet"]
+    table = read_parquet_recording(closed, columns=["car0_velocity"])
+    assert table.column("car0_velocity").to_pylist() == [i * 2.0 for i in range(300)]
+    assert not list(tmp_path.glob("*.arrows"))
+
+
+def write_stream(path, batches):
+    with pa.OSFile(str(path), "wb") as sink:
+        writer = pa.ipc.new_stream(sink, batches[0].schema)
+        for batch in batches:
+            writer.write_batch(batch)
+        # no end of stream marker, like a file of a process that was killed
+
+
+def test_recovers_files_cut_off_by_a_crash(tmp_path):
+    batches = [pa.RecordBatch.from_pylist([{"timestamp": i * 0.1 + j} for i in range(10)]) for j in range(3)]
+    write_stream(tmp_path / "live_0001.arrows", batches)
+    # the last batch was only written in part
+    partial = tmp_path / "live_0002.arrows"
+    write_stream(partial, batches)
+    partial.write_bytes(partial.read_bytes()[:-20])
+    (tmp_path / "live_0003.arrows").write_bytes(b"not a stream")
+
+    assert recover_partial_files(tmp_path / "live") == [tmp_path / "live_0001.parquet", tmp_path / "live_0002.parquet"]
+    assert pq.read_table(tmp_path / "live_0001.parquet").num_rows == 30
+    assert pq.read_table(tmp_path / "live_0002.parquet").num_rows == 20
+    assert not (tmp_path / "live_0001.arrows").exists() and not partial.exists()
+    # a file without schema holds nothing to recover and is left as it is
+    assert (tmp_path / "live_0003.arrows").exists()
+
+    writer = BufferedParquetWriter(tmp_path / "live", FIELD_MAP)
+    writer.enqueue(sample(0))
+    writer.shutdown()
+    # the numbers of the left over files are not reused
+    assert [path.name for path in writer.files] == ["live_0004.parquet"]
+
+
+def test_open_file_is_readable_before_close(tmp_path):
+    writer = BufferedParquetWriter(tmp_path / "live", FIELD_MAP, batch_size=10, flush_interval=60)
+    for i in range(25):
+        writer.enqueue(sample(i))
+    while writer.get_statistics().rows_written < 20:
+        time.sleep(0.01)
+
+    # what a crash at this point would leave behind
+    crashed = tmp_path / "crashed_0001.arrows"
+    crashed.write_bytes((tmp_path / "live_0001.arrows").read_bytes())
+    writer.shutdown()
+
+    recovered = recover_partial_files(tmp_path / "crashed")
+    assert pq.read_table(recovered[0]).num_rows >= 20
+
+
+def test_service_finds_sessions_after_a_crash(tmp_path):
+    settings = Settings(CSV_PATH=str(tmp_path / "data"))
+    service = TestDriveDataService(settings, storage_path=str(tmp_path / "test_drive_data.json"))
+    project = TestDriveProjectInfo(id=0, is_live=True,
+                                   test_drive_data_info=TestDriveDataInfo(csv_file_full_path=str(tmp_path / "l.csv")))
+
+    writer = service.start_live_parquet_writer(project)
+    writer.enqueue({"car0_velocity": 1.0, "timestamp": 0.0})
+    writer.shutdown()
+    # the next session is still recording when the application is killed, its file is never closed
+    crashed = service.start_live_parquet_writer(project)
+    crashed._close = lambda: None
+    crashed.enqueue({"car0_velocity": 2.0, "timestamp": 0.0})
+    crashed.shutdown()
+    assert len(list(settings.LIVE_RECORDING_DIR.glob("*/*.arrows"))) == 1
+
+    restarted = TestDriveDataService(settings, storage_path=str(tmp_path / "test_drive_data.json"))
+
+    sessions = restarted.get_live_sessions()
+    assert [session.parquet_files for session in sessions] == [["live_0001.parquet"], ["live_0001.parquet"]]
+    assert sessions[0].csv_file_full_path == str(tmp_path / "l.csv")
+    table = restarted.read_live_session(sessions[1].name, ["car0_velocity"])
+    assert table.column("car0_velocity").to_pylist() == [2.0]
+    assert restarted.read_live_session("../data") is None
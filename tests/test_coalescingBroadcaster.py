@@ -0,0 +1,69 @@
+import asyncio
+import threading
+
+import pytest
+
+from app.services.coalescingBroadcaster import CoalescingBroadcaster
+
+
+class Recorder:
+    def __init__(self):
+        self.sent = []
+
+    async def send(self, data):
+        self.sent.append(data)
+
+
+@pytest.mark.anyio
+async def test_coalesces_to_latest_value_per_field():
+    recorder = Recorder()
+    broadcaster = CoalescingBroadcaster("data", recorder.send, rate_hz=20)
+    broadcaster.start(asyncio.get_running_loop())
+
+    broadcaster.submit({"speed": 1.0, "timestamp": 0.0})
+    await asyncio.sleep(0.01)
+    # these arrive within the interval and are sent together
+    broadcaster.submit({"speed": 2.0, "gear": 1, "timestamp": 0.1})
+    broadcaster.submit({"speed": 3.0, "timestamp": 0.2})
+    await asyncio.sleep(0.15)
+
+    assert recorder.sent == [{"speed": 1.0, "timestamp": 0.0}, {"speed": 3.0, "gear": 1, "timestamp": 0.2}]
+    statistics = broadcaster.get_statistics()
+    assert statistics.samples_received == 3 and statistics.samples_emitted == 2 and statistics.pending_fields == 0
+
+
+@pytest.mark.anyio
+async def test_limits_rate_of_other_threads():
+    recorder = Recorder()
+    broadcaster = CoalescingBroadcaster("data", recorder.send, rate_hz=10)
+    broadcaster.start(asyncio.get_running_loop())
+    threads_before = threading.active_count()
+
+    def produce():
+        for i in range(50):
+            broadcaster.submit({"timestamp": i * 0.01})
+            threading.Event().wait(0.01)
+
+    producer = threading.Thread(target=produce)
+    producer.start()
+    while producer.is_alive():
+        assert threading.active_count() <= threads_before + 1
+        await asyncio.sleep(0.01)
+    await asyncio.sleep(0.15)
+
+    # about 0.5 s of samples at 10 Hz
+    assert 4 <= len(recorder.sent) <= 8
+    assert recorder.sent[-1] == {"timestamp": 0.49}
+    assert broadcaster.get_statistics().samples_received == 50
+
+
+@pytest.mark.anyio
+async def test_samples_before_start_are_sent():
+    recorder = Recorder()
+    broadcaster = CoalescingBroadcaster("data", recorder.send, rate_hz=10)
+    broadcaster.submit({"timestamp": 1.0})
+    assert not recorder.sent
+
+    broadcaster.start(asyncio.get_running_loop())
+    await asyncio.sleep(0.01)
+    assert recorder.sent == [{"timestamp": 1.0}]
@@ -0,0 +1,87 @@
+import json
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from app.models.testDriveDataInfo import TestDriveDataInfo
+from app.services.backgroundTasks.dataAnalyzer import build_column_statistics
+from app.services.columnStatistics import compute_column_statistics, get_statistics_path, read_statistics, \
+    write_statistics
+from app.services.recordingCache import read_recording_csv
+
+
+def test_compute_column_statistics():
+    df = pd.DataFrame({
+        "timestamp": [0.0, 1.0, 2.0, 3.0, 4.0],
+        "speed": [1.0, 2.0, np.nan, 4.0, 4.0],
+        "gear": [1, 1, 2, 2, 2],
+        "name": ["a", "b", "c", "d", "e"],
+    })
+
+    statistics = {column.name: column for column in compute_column_statistics(df)}
+
+    assert set(statistics) == {"timestamp", "speed", "gear"}
+    speed = statistics["speed"]
+    assert speed.count == 4
+    assert speed.null_count == 1
+    assert speed.min == 1.0
+    assert speed.max == 4.0
+    assert speed.mean == pytest.approx(2.75)
+    assert speed.std == pytest.approx(np.nanstd(df["speed"]))
+    assert speed.percentiles["p50"] == pytest.approx(3.0)
+    assert speed.sample_rate_hz == pytest.approx(0.75)
+    assert statistics["gear"].change_rate_hz == pytest.approx(0.25)
+
+
+def test_compute_column_statistics_of_empty_column():
+    df = pd.DataFrame({"timestamp": [0.0, 1.0], "empty": [np.nan, np.nan]})
+
+    empty = {column.name: column for column in compute_column_statistics(df)}["empty"]
+
+    assert empty.count == 0
+    assert empty.min is None
+    assert empty.percentiles == {}
+
+
+def test_statistics_round_trip(recording):
+    statistics = compute_column_statistics(read_recording_csv(recording))
+
+    write_statistics(recording, statistics)
+    stored = read_statistics(recording)
+
+    assert get_statistics_path(recording).exists()
+    assert list(stored.values()) == statistics
+
+
+def test_statistics_invalid_after_recording_changed(recording):
+    write_statistics(recording, compute_column_statistics(read_recording_csv(recording)))
+
+    with open(recording, "a") as f:
+        f.write("\n")
+    os.utime(recording, ns=(0, 0))
+
+    assert read_statistics(recording) is None
+
+
+def test_statistics_of_another_format_are_ignored(recording):
+    write_statistics(recording, compute_column_statistics(read_recording_csv(recording)))
+    statistics_path = get_statistics_path(recording)
+    data = json.loads(statistics_path.read_text())
+
+    data["format"] = "3.1"
+    statistics_path.write_text(json.dumps(data))
+    assert read_statistics(recording) is None
+
+    del data["format"]
+    statistics_path.write_text(json.dumps(data))
+    assert read_statistics(recording) is None
+
+
+def test_uncached_statistics_have_the_columns_of_the_cache(recording):
+    build_column_statistics(TestDriveDataInfo(csv_file_full_path=str(recording)), use_cache=False)
+
+    statistics = read_statistics(recording)
+    assert "rrp_pos_x" in statistics and "rrp_quat_w" in statistics
+    assert "rrp_pos" not in statistics
@@ -0,0 +1,90 @@
+import pandas as pd
+import pyarrow as pa
+import pytest
+from httpx import ASGITransport, AsyncClient
+
+from app.dependencies import get_response_cache, get_settings, get_testdata_manager
+from app.main import app
+from app.services.responseCompression import ResponseCache
+from app.settings import Settings
+
+
+class VersionedDataService:
+    """Provides the columns of a data set with a fixed version."""
+
+    def __init__(self, version):
+        self.version = version
+        self.column_requests = 0
+        self.data_requests = 0
+
+    def get_dataset_version(self):
+        return self.version
+
+    def get_csv_data_columns(self):
+        self.column_requests += 1
+        return [("timestamp", "float64")]
+
+    def get_csv_data(self, columns, start=None, end=None, combine_vectors=True):
+        self.data_requests += 1
+        return pd.DataFrame({"timestamp": [i * 0.01 for i in range(1000)], "speed": [1.0] * 1000})
+
+    def get_column_statistics(self):
+        return {}
+
+    def get_derived_channels(self):
+        return []
+
+
+@pytest.fixture
+def service():
+    service = VersionedDataService("recording.csv|100|1")
+    app.dependency_overrides[get_testdata_manager] = lambda: service
+    yield service
+    app.dependency_overrides.clear()
+
+
+@pytest.mark.anyio
+async def test_columns_not_modified(service):
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+        response = await client.get("/api/v1/player/columns")
+        etag = response.headers["etag"]
+        assert response.headers["cache-control"] == "private, no-cache"
+
+        response = await client.get("/api/v1/player/columns", headers={"If-None-Match": etag})
+        assert response.status_code == 304
+        assert response.headers["etag"] == etag
+        assert service.column_requests == 1
+
+        service.version = "recording.csv|200|2"
+        response = await client.get("/api/v1/player/columns", headers={"If-None-Match": etag})
+        assert response.status_code == 200
+        assert response.headers["etag"] != etag
+
+
+@pytest.mark.anyio
+async def test_columns_of_live_data_are_not_stored(service):
+    service.version = None
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+        response = await client.get("/api/v1/player/columns", headers={"If-None-Match": "*"})
+
+        assert response.status_code == 200
+        assert "etag" not in response.headers
+        assert response.headers["cache-control"] == "no-store"
+
+
+@pytest.mark.anyio
+@pytest.mark.parametrize("stream_min_bytes, data_requests", [(1024 * 1024, 1), (0, 2)])
+async def test_arrow_responses_are_cached_unless_streamed(service, stream_min_bytes, data_requests):
+    cache = ResponseCache(max_bytes=1024 * 1024)
+    app.dependency_overrides[get_response_cache] = lambda: cache
+    app.dependency_overrides[get_settings] = lambda: Settings(ARROW_STREAM_MIN_BYTES=stream_min_bytes)
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+        for _ in range(2):
+            response = await client.get("/api/v1/player/data/arrow?columns=speed",
+                                        headers={"Accept-Encoding": "gzip"})
+
+            assert response.headers["content-encoding"] == "gzip"
+            table = pa.ipc.open_stream(response.content).read_all()
+            assert table.num_rows == 1000
+
+    assert service.data_requests == data_requests
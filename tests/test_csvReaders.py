@@ -0,0 +1,42 @@
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+from app.services.csvReaders import ArrowCsvReader, PandasCsvReader, get_csv_reader
+
+RECORDING = Path(__file__).parent / "test_recording.csv"
+
+
+def test_get_csv_reader():
+    assert isinstance(get_csv_reader("arrow"), ArrowCsvReader)
+    assert isinstance(get_csv_reader(None), PandasCsvReader)
+    assert isinstance(get_csv_reader("unknown"), PandasCsvReader)
+
+
+def test_arrow_reader_matches_pandas_reader():
+    expected = PandasCsvReader().read(RECORDING)
+
+    df = ArrowCsvReader().read(RECORDING)
+
+    pd.testing.assert_frame_equal(df, expected)
+
+
+@pytest.mark.parametrize("reader", [PandasCsvReader(), ArrowCsvReader()])
+def test_read_selected_rows_and_columns(reader):
+    df = reader.read(RECORDING, columns=["timestamp", "car0_velocity"], nrows=5)
+
+    assert sorted(df.columns) == ["car0_velocity", "timestamp"]
+    assert len(df) == 5
+    assert df["timestamp"].iloc[0] == pytest.approx(518.866)
+
+
+@pytest.mark.parametrize("reader", [PandasCsvReader(), ArrowCsvReader()])
+def test_read_chunks(reader, monkeypatch):
+    monkeypatch.setattr(ArrowCsvReader, "BLOCK_SIZE", 16 * 1024)
+
+    chunks = list(reader.read_chunks(RECORDING, 20))
+
+    assert sum(len(chunk) for chunk, _ in chunks) == 99
+    assert chunks[-1][1] == RECORDING.stat().st_size
+    assert len(chunks) > 1
@@ -0,0 +1,60 @@
+import csv
+
+import numpy as np
+
+from app.services.csvTailReader import CsvTailReader
+
+
+def write_rows(path, rows, header=False):
+    with open(path, "a", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=["car0_vehicle_pos", "car0_velocity", "timestamp"])
+        if header:
+            writer.writeheader()
+        for row in rows:
+            writer.writerow(row)
+
+
+def row(i):
+    return {"car0_vehicle_pos": [1.0, 2.0, float(i)], "car0_velocity": i * 2, "timestamp": i * 0.1}
+
+
+def test_reads_only_appended_rows(tmp_path):
+    path = tmp_path / "live.csv"
+    write_rows(path, [row(0), row(1)], header=True)
+    reader = CsvTailReader(path)
+
+    assert reader.update() == 2
+    assert reader.update() == 0
+
+    write_rows(path, [row(2)])
+    assert reader.update() == 1
+
+    df = reader.get_columns(["car0_vehicle_pos_z", "car0_velocity", "timestamp"])
+    assert df["car0_vehicle_pos_z"].tolist() == [0.0, 1.0, 2.0]
+    assert df["car0_velocity"].tolist() == [0.0, 2.0, 4.0]
+
+
+def test_incomplete_line_is_read_later(tmp_path):
+    path = tmp_path / "live.csv"
+    write_rows(path, [row(0)], header=True)
+    with open(path, "a") as f:
+        f.write('"[1.0, 2.0, 3.0]",6,0.')
+    reader = CsvTailReader(path)
+
+    assert reader.update() == 1
+
+    with open(path, "a") as f:
+        f.write("3\n")
+    assert reader.update() == 1
+    np.testing.assert_allclose(reader.get_columns(["timestamp"])["timestamp"], [0.0, 0.3])
+
+
+def test_time_range(tmp_path):
+    path = tmp_path / "live.csv"
+    write_rows(path, [row(i) for i in range(2000)], header=True)
+    reader = CsvTailReader(path)
+    reader.update()
+
+    df = reader.get_columns(["timestamp"], 10.0, 10.45)
+
+    np.testing.assert_allclose(df["timestamp"], [10.0, 10.1, 10.2, 10.3, 10.4])
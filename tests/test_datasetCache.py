@@ -0,0 +1,82 @@
+import pytest
+
+from app.models.testDriveDataInfo import TestDriveDataInfo
+from app.models.testDriveProjectInfo import TestDriveProjectInfo
+from app.services.columnCache import ColumnCache
+from app.services.datasetCache import DatasetCache
+from app.services.recordingDataSet import RecordingDataSet
+from app.services.testDriveDataService import TestDriveDataService
+from app.settings import Settings
+
+
+@pytest.fixture
+def recordings(copy_recording):
+    """Provides three copies of the test recording."""
+    return [copy_recording(f"recording{i}.csv") for i in range(3)]
+
+
+def test_get_returns_cached_dataset(recordings):
+    cache = DatasetCache(max_bytes=1024 * 1024, max_entries=2)
+    dataset = RecordingDataSet(recordings[0], ColumnCache(max_bytes=1024 * 1024), use_cache=False)
+
+    cache.put((1, dataset.fingerprint), dataset)
+
+    assert cache.get((1, dataset.fingerprint)) is dataset
+    assert cache.get((1, "other fingerprint")) is None
+    statistics = cache.get_statistics()
+    assert (statistics.entries, statistics.hits, statistics.misses) == (1, 1, 1)
+
+
+def test_put_evicts_least_recently_used(recordings):
+    column_cache = ColumnCache(max_bytes=1024 * 1024)
+    cache = DatasetCache(max_bytes=1024 * 1024, max_entries=2)
+    datasets = [RecordingDataSet(path, column_cache, use_cache=False) for path in recordings]
+    datasets[0].get_columns(["car0_velocity"])
+
+    cache.put((0, datasets[0].fingerprint), datasets[0])
+    cache.put((1, datasets[1].fingerprint), datasets[1])
+    cache.get((0, datasets[0].fingerprint))
+    cache.put((2, datasets[2].fingerprint), datasets[2])
+
+    assert (0, datasets[0].fingerprint) in cache
+    assert (1, datasets[1].fingerprint) not in cache
+    assert cache.evictions == 1
+
+
+def test_put_evicts_by_memory(recordings):
+    column_cache = ColumnCache(max_bytes=1024 * 1024)
+    cache = DatasetCache(max_bytes=1000, max_entries=8)
+    first, second = (RecordingDataSet(path, column_cache, use_cache=False) for path in recordings[:2])
+    first.get_columns(["timestamp", "car0_velocity"])
+    second.get_columns(["timestamp", "car0_velocity"])
+
+    cache.put((0, first.fingerprint), first)
+    cache.put((1, second.fingerprint), second)
+
+    assert len(cache) == 1
+    assert (1, second.fingerprint) in cache
+    # the columns of the evicted data set are dropped as well
+    assert (first.fingerprint, "car0_velocity") not in column_cache
+    assert first.memory_usage == 0
+
+
+def test_activation_looks_up_the_cached_dataset_once(recordings, tmp_path):
+    service = TestDriveDataService(Settings(CSV_PATH=str(tmp_path / "data")),
+                                   storage_path=str(tmp_path / "test_drive_data.json"))
+    projects = {i: TestDriveProjectInfo(id=i, test_drive_data_info=TestDriveDataInfo(csv_file_full_path=str(path)))
+                for i, path in enumerate(recordings[:2], start=1)}
+    service.test_drive_data_store = projects
+    service.activate_testdrive(1)
+    service.load_csv_data(projects[1])
+    service.activate_testdrive(2)
+    service.load_csv_data(projects[2])
+    dataset = service.active_dataset
+
+    service.activate_testdrive(1)
+    service.load_csv_data(projects[1])
+    service.activate_testdrive(2)
+    service.load_csv_data(projects[2])
+
+    assert service.active_dataset is dataset
+    statistics = service.dataset_cache.get_statistics()
+    assert (statistics.hits, statistics.misses) == (2, 2)
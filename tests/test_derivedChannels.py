@@ -0,0 +1,133 @@
+import numpy as np
+import pytest
+
+from app.models.testDriveDataInfo import TestDriveDataInfo
+from app.models.testDriveProjectInfo import TestDriveProjectInfo
+from app.services.columnCache import ColumnCache
+from app.services.derivedChannels import DerivedChannelRegistry, SafeExpression, quaternion_yaw, \
+    register_default_channels
+from app.services.recordingDataSet import RecordingDataSet
+from app.services.testDriveDataService import TestDriveDataService
+from app.services.vectorColumns import field_column_names
+from app.settings import Settings
+
+
+def test_safe_expression():
+    expression = SafeExpression("sqrt(vel_x**2 + vel_y**2) * 3.6 + pi * 0")
+
+    assert expression.inputs == ["vel_x", "vel_y"]
+    assert expression.evaluate({"vel_x": np.array([3.0]), "vel_y": np.array([4.0])}).tolist() == [18.0]
+
+
+@pytest.mark.parametrize("expression", [
+    "__import__('os').system('ls')",
+    "speed.real",
+    "speed[0]",
+    "lambda: 1",
+    "'text'",
+    "sqrt(speed, out=speed)",
+    "speed +",
+])
+def test_safe_expression_rejects(expression):
+    with pytest.raises(ValueError):
+        SafeExpression(expression)
+
+
+def test_quaternion_yaw():
+    half_angle = np.radians(45.0)
+
+    yaw = quaternion_yaw(np.array([1.0, np.cos(half_angle)]), np.zeros(2), np.zeros(2),
+                         np.array([0.0, np.sin(half_angle)]))
+
+    assert yaw.tolist() == pytest.approx([0.0, 90.0])
+
+
+def test_available_channels():
+    registry = DerivedChannelRegistry()
+    registry.register_expression("kmh", "speed * 3.6")
+    registry.register_expression("mph", "kmh / 1.609")
+    registry.register_expression("other", "unknown * 2")
+
+    assert [channel.name for channel in registry.available_channels(["speed"])] == ["kmh", "mph"]
+    assert registry.resolve_inputs(["mph", "timestamp"]) == ["speed", "timestamp"]
+
+
+def test_register_rejects_cycles():
+    registry = DerivedChannelRegistry()
+    registry.register_expression("a", "b * 2")
+    registry.register_expression("c", "a + 1")
+
+    with pytest.raises(ValueError):
+        registry.register_expression("b", "a / 2")
+    with pytest.raises(ValueError):
+        registry.register_expression("b", "c - 1")
+    # replacing a channel is checked against its new inputs
+    with pytest.raises(ValueError):
+        registry.register_expression("a", "c * 2")
+
+    assert registry.get("b") is None and registry.get("a").inputs == ["b"]
+    assert registry.resolve_inputs(["c"]) == ["b"]
+
+
+@pytest.mark.parametrize("name", ["speed kmh", "speed,kmh", "1st", "", "car0_velocity", "car0_steer_quat_w", "timestamp"])
+def test_register_rejects_invalid_names(name):
+    registry = DerivedChannelRegistry(field_column_names())
+
+    with pytest.raises(ValueError):
+        registry.register_expression(name, "car0_velocity * 2")
+    assert registry.get_channels() == []
+
+
+def test_service_rejects_columns_of_active_drive(recording, tmp_path):
+    service = TestDriveDataService(Settings(CSV_PATH=str(tmp_path / "data")),
+                                   storage_path=str(tmp_path / "test_drive_data.json"))
+    project = TestDriveProjectInfo(id=1, test_drive_data_info=TestDriveDataInfo(csv_file_full_path=str(recording)))
+    service.test_drive_data_store = {1: project}
+    service.activate_testdrive(1)
+    service.load_csv_data(project)
+
+    with pytest.raises(ValueError):
+        # recorded but not part of the live fields
+        service.register_derived_channel("rrp_quat_w", "car0_velocity * 2")
+    # a default channel can be replaced
+    channel = service.register_derived_channel("car0_velocity_kmh", "car0_velocity * 3.6 + 1")
+    assert service.derived_channels.get("car0_velocity_kmh") is channel
+
+
+def test_compute_rejects_values_that_are_not_rows():
+    registry = DerivedChannelRegistry()
+    channel = registry.register_expression("fast", "where(speed > 1)")
+
+    values = channel.compute({"speed": np.array([0.5, 2.0, 3.0])})
+
+    assert len(values) == 3 and np.isnan(values).all()
+
+
+def test_register_changes_version():
+    registry = DerivedChannelRegistry()
+    version = registry.version
+
+    registry.register_expression("kmh", "speed * 3.6")
+
+    assert registry.version != version
+
+
+def test_dataset_computes_derived_channels_once(recording):
+    registry = DerivedChannelRegistry()
+    register_default_channels(registry)
+    cache = ColumnCache(max_bytes=10 * 1024 * 1024)
+    dataset = RecordingDataSet(recording, cache, derived_channels=registry)
+
+    assert ("car0_velocity_kmh", "float64") in dataset.describe_columns()
+    df = dataset.select(["car0_velocity", "car0_velocity_kmh", "car0_vehicle_yaw"])
+
+    assert df["car0_velocity_kmh"].to_numpy() == pytest.approx(df["car0_velocity"].to_numpy() * 3.6)
+    assert df["car0_vehicle_yaw"].notna().all()
+    hits = cache.hits
+    dataset.get_columns(["car0_velocity_kmh"])
+    assert cache.hits == hits + 1
+
+    # a changed definition is computed again
+    registry.register_expression("car0_velocity_kmh", "car0_velocity * 3.6 + 1")
+    df = dataset.select(["car0_velocity", "car0_velocity_kmh"])
+    assert df["car0_velocity_kmh"].to_numpy() == pytest.approx(df["car0_velocity"].to_numpy() * 3.6 + 1)
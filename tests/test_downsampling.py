@@ -0,0 +1,60 @@
+import numpy as np
+
+from app.services.downsampling import DownsamplingPyramid, downsample, lttb, min_max_envelope
+
+
+def test_min_max_envelope_ignores_nan():
+    values = np.array([3.0, 1.0, np.nan, 5.0, 2.0])
+
+    min_positions, max_positions = min_max_envelope(values, 2)
+
+    assert min_positions.tolist() == [1, 3, 4]
+    assert max_positions.tolist() == [0, 3, 4]
+
+
+def test_pyramid_keeps_extremes():
+    rng = np.random.default_rng(1)
+    values = rng.normal(size=100_000)
+    values[12_345] = 100.0
+    values[54_321] = -100.0
+    pyramid = DownsamplingPyramid(values)
+
+    positions = pyramid.positions(0, len(values), 2000)
+
+    assert len(positions) <= 2000
+    assert np.all(np.diff(positions) > 0)
+    assert 12_345 in positions
+    assert 54_321 in positions
+
+
+def test_pyramid_returns_none_for_small_ranges():
+    pyramid = DownsamplingPyramid(np.arange(10_000, dtype=np.float64))
+
+    assert pyramid.positions(100, 600, 2000) is None
+
+    positions = pyramid.positions(1000, 9000, 500)
+    assert positions.min() >= 1000
+    assert positions.max() < 9000
+
+
+def test_lttb_keeps_first_last_and_peak():
+    timestamps = np.arange(1000, dtype=np.float64)
+    values = np.zeros(1000)
+    values[500] = 10.0
+
+    selected = lttb(timestamps, values, 50)
+
+    assert len(selected) == 50
+    assert selected[0] == 0
+    assert selected[-1] == 999
+    assert 500 in selected
+
+
+def test_downsample_without_pyramid():
+    timestamps = np.arange(10_000, dtype=np.float64)
+    values = np.sin(timestamps / 100)
+
+    t, v = downsample(timestamps, values, 1000)
+
+    assert len(t) <= 1000
+    assert v.max() == values.max()
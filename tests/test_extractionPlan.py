@@ -0,0 +1,72 @@
+import pytest
+
+from app.models.liveDataRow import get_double, get_float, get_int, get_quaternion, get_vector3
+from app.services.dataSources.extractionPlan import ExtractionPlan
+from app.services.dataSources.stepTimer import StepTimer
+
+
+class FakeField:
+    """ Stands in for a resolved panthera field """
+
+    def __init__(self, value, fail=False):
+        self.value = value
+        self.fail = fail
+        self.reads = 0
+
+    def _read(self, *args):
+        self.reads += 1
+        if self.fail:
+            raise RuntimeError("invalid field")
+        return self.value
+
+    GetFloat = GetDouble = GetInt = GetQuaternion = GetVector3 = _read
+
+
+FIELD_MAP = [("velocity", get_float), ("turbo", get_double), ("gear", get_int), ("pos", get_vector3),
+             ("quat", get_quaternion), ("custom", lambda field: field.value * 2), ("unread", None),
+             ("not_found", get_float)]
+
+
+def create_fields():
+    return {"velocity": FakeField(1.5), "turbo": FakeField(2), "gear": FakeField(3.0), "pos": FakeField((1, 2, 3)),
+            "quat": FakeField((0, 0, 0, 1)), "custom": FakeField(4), "unread": FakeField(5)}
+
+
+def test_plan_reads_the_sample():
+    plan = ExtractionPlan.compile(create_fields(), FIELD_MAP)
+
+    assert len(plan) == 6
+    assert [name for name, _, _ in plan.scalars] == ["velocity", "turbo", "gear"]
+    assert [name for name, _ in plan.vectors] == ["pos", "quat"]
+    data = plan.extract()
+    assert data == {"velocity": 1.5, "turbo": 2.0, "gear": 3, "pos": [1.0, 2.0, 3.0], "quat": [0.0, 0.0, 0.0, 1.0],
+                    "custom": 8}
+    assert type(data["gear"]) is int and type(data["turbo"]) is float
+
+
+def test_failing_field_is_removed(caplog):
+    fields = create_fields()
+    fields["pos"].fail = True
+    plan = ExtractionPlan.compile(fields, FIELD_MAP)
+
+    data = plan.extract()
+    assert "pos" not in data and data["velocity"] == 1.5 and data["custom"] == 8
+    assert "pos" in caplog.text
+
+    caplog.clear()
+    assert "pos" not in plan.extract()
+    assert fields["pos"].reads == 2 and not caplog.text
+
+
+def test_step_timer():
+    timer = StepTimer(0.1)
+    assert timer.get_statistics().steps == 0
+
+    timer.record(0.002, 0.003)
+    timer.record(0.1, 0.05)
+
+    statistics = timer.get_statistics()
+    assert statistics.steps == 2 and statistics.overruns == 1
+    assert statistics.max_read_ms == pytest.approx(100) and statistics.last_callback_ms == pytest.approx(50)
+    assert statistics.mean_read_ms == pytest.approx(51)
+    assert statistics.busy_percent == pytest.approx(77.5)
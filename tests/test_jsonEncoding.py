@@ -0,0 +1,55 @@
+import json
+
+import numpy as np
+import pandas as pd
+
+from app.services.jsonEncoding import encode_json, iter_ndjson, to_columnar
+
+
+def test_columnar_json():
+    df = pd.DataFrame({
+        "timestamp": [0.0, 0.1, 0.2],
+        "speed": [1.5, np.nan, 2.5],
+        "gear": [1, 2, 2],
+        "vel_x": [1.0, 2.0, 3.0], "vel_y": [4.0, 5.0, 6.0], "vel_z": [7.0, 8.0, 9.0],
+        "name": ["a", None, "c"],
+    })
+
+    content = json.loads(encode_json(to_columnar(df, ["speed", "gear", "vel", "name", "timestamp", "unknown"])))
+
+    assert list(content) == ["speed", "gear", "vel", "name", "timestamp"]
+    assert content["speed"] == [1.5, None, 2.5]
+    assert content["gear"] == [1, 2, 2]
+    assert content["vel"] == [[1.0, 4.0, 7.0], [2.0, 5.0, 8.0], [3.0, 6.0, 9.0]]
+    assert content["name"] == ["a", None, "c"]
+
+
+def test_columnar_json_of_non_contiguous_rows():
+    df = pd.DataFrame({"timestamp": np.arange(10, dtype=np.float64)}).iloc[np.array([3, 1, 2])]
+
+    content = json.loads(encode_json(to_columnar(df, ["timestamp"])))
+
+    assert content["timestamp"] == [3.0, 1.0, 2.0]
+
+
+def test_ndjson_records():
+    chunks = [pd.DataFrame({"timestamp": [0.0, 0.1], "speed": [1.5, np.nan]}),
+              pd.DataFrame({"timestamp": [], "speed": []}),
+              pd.DataFrame({"timestamp": [0.2], "speed": [2.5]})]
+
+    lines = b"".join(iter_ndjson(chunks, ["speed", "timestamp"])).splitlines()
+
+    assert [json.loads(line) for line in lines] == [{"timestamp": 0.0, "speed": 1.5}, {"timestamp": 0.1, "speed": None},
+                                                    {"timestamp": 0.2, "speed": 2.5}]
+
+
+def test_ndjson_columnar():
+    chunks = [pd.DataFrame({"timestamp": [0.0, 0.1], "vel_x": [1.0, 2.0], "vel_y": [3.0, 4.0], "vel_z": [5.0, 6.0]}),
+              pd.DataFrame({"timestamp": [0.2], "vel_x": [7.0], "vel_y": [8.0], "vel_z": [9.0]})]
+
+    lines = b"".join(iter_ndjson(chunks, ["vel", "timestamp"], "columnar")).splitlines()
+
+    assert [json.loads(line) for line in lines] == [
+        {"vel": [[1.0, 3.0, 5.0], [2.0, 4.0, 6.0]], "timestamp": [0.0, 0.1]},
+        {"vel": [[7.0, 8.0, 9.0]], "timestamp": [0.2]},
+    ]
@@ -0,0 +1,75 @@
+import json
+import math
+
+import pytest
+
+from app.models.liveDataRow import FIELD_NAME_MAP, create_random_instance
+from app.services.liveFrameEncoding import LiveFrameSchema
+from app.services.websocketConnectionManager import WebsocketConnectionManager
+
+
+class RecordingWebSocket:
+    """Records the messages sent to a client."""
+
+    def __init__(self):
+        self.messages = []
+
+    async def accept(self):
+        pass
+
+    async def send_json(self, message):
+        self.messages.append(json.dumps(message))
+
+    async def send_text(self, message):
+        self.messages.append(message)
+
+    async def send_bytes(self, message):
+        self.messages.append(message)
+
+
+def test_frame_round_trip():
+    schema = LiveFrameSchema.from_field_map()
+    sample = create_random_instance(FIELD_NAME_MAP, None)
+    sample["timestamp"] = 12.5
+    del sample["car0_gear"]
+
+    frame = schema.encode(sample)
+    decoded = schema.decode(frame)
+
+    assert len(frame) == schema.frame_size < len(json.dumps(sample)) / 4
+    assert decoded["timestamp"] == 12.5
+    assert decoded["car0_turbo_pressure"] == sample["car0_turbo_pressure"]
+    assert decoded["car0_vehicle_pos"] == pytest.approx(sample["car0_vehicle_pos"])
+    assert math.isnan(decoded["car0_gear"])
+    assert "Car_Status{1}.Car_Status" not in decoded
+
+
+def test_schema_offsets():
+    schema = LiveFrameSchema([("speed", "f", 1), ("pos", "d", 3), ("timestamp", "d", 1)])
+
+    description = schema.describe()
+
+    assert [(field["name"], field["offset"]) for field in description["fields"]] == \
+           [("speed", 4), ("pos", 8), ("timestamp", 32)]
+    assert description["frame_size"] == 40
+    assert schema.encode({"timestamp": 1.0})[:4] == description["schema_id"].to_bytes(4, "little")
+
+
+@pytest.mark.anyio
+async def test_broadcast_in_negotiated_encoding():
+    manager = WebsocketConnectionManager("data", LiveFrameSchema([("speed", "f", 1), ("timestamp", "d", 1)]))
+    json_client, binary_client = RecordingWebSocket(), RecordingWebSocket()
+    await manager.connect(json_client)
+    await manager.connect(binary_client, "binary")
+
+    await manager.broadcast_frame({"speed": float("nan"), "timestamp": 1.0})
+
+    assert json.loads(json_client.messages[0]) == {"speed": None, "timestamp": 1.0}
+    assert json.loads(binary_client.messages[0])["type"] == "schema"
+    assert manager.frame_schema.decode(binary_client.messages[1])["timestamp"] == 1.0
+
+
+@pytest.mark.anyio
+async def test_binary_needs_schema():
+    with pytest.raises(ValueError):
+        await WebsocketConnectionManager("tag").connect(RecordingWebSocket(), "binary")
@@ -0,0 +1,84 @@
+import csv
+
+import numpy as np
+import pytest
+
+from app.models.liveDataRow import get_float, get_int, get_vector3d_double
+from app.models.testDriveDataInfo import TestDriveDataInfo
+from app.models.testDriveProjectInfo import TestDriveProjectInfo
+from app.services.liveRingBuffer import LiveRingBuffer
+from app.services.testDriveDataService import TestDriveDataService
+from app.settings import Settings
+
+FIELD_MAP = [("car0_vehicle_pos", get_vector3d_double), ("car0_velocity", get_float), ("car0_gear", get_int),
+             ("sim_time", None)]
+
+
+def sample(i):
+    return {"car0_vehicle_pos": [1.0, 2.0, float(i)], "car0_velocity": i * 2.0, "car0_gear": i % 3,
+            "timestamp": i * 0.1}
+
+
+def test_columns_typed_from_field_map():
+    buffer = LiveRingBuffer(8, field_map=FIELD_MAP)
+    buffer.append(sample(1))
+
+    df = buffer.get_columns(buffer.columns)
+
+    assert buffer.columns == ["car0_vehicle_pos_x", "car0_vehicle_pos_y", "car0_vehicle_pos_z", "car0_velocity",
+                              "car0_gear", "timestamp"]
+    assert df["car0_gear"].dtype == np.int64
+    assert df["car0_vehicle_pos_z"].tolist() == [1.0]
+
+
+def test_oldest_samples_are_overwritten():
+    buffer = LiveRingBuffer(4, field_map=FIELD_MAP)
+    for i in range(10):
+        buffer.append(sample(i))
+
+    df = buffer.get_columns(["car0_velocity", "timestamp"], start=0.75)
+
+    assert len(buffer) == 4
+    assert buffer.get_columns(["car0_vehicle_pos_z"])["car0_vehicle_pos_z"].tolist() == [6.0, 7.0, 8.0, 9.0]
+    assert df["car0_velocity"].tolist() == [16.0, 18.0]
+    assert buffer.covers(0.65) and not buffer.covers(0.55) and not buffer.covers(None)
+    assert buffer.sample()["timestamp"].tolist() == [pytest.approx(0.9)]
+
+
+def test_missing_values():
+    buffer = LiveRingBuffer(4, field_map=FIELD_MAP)
+    buffer.append(sample(0))
+    buffer.append({"car0_vehicle_pos": [1.0, 2.0], "timestamp": 0.1})
+
+    df = buffer.get_columns(["car0_vehicle_pos_z", "car0_velocity", "car0_gear"])
+
+    assert np.isnan(df["car0_vehicle_pos_z"][1]) and np.isnan(df["car0_velocity"][1])
+    assert df["car0_gear"][0] == 0 and np.isnan(df["car0_gear"][1])
+
+
+def test_restarted_simulation_clears_buffer():
+    buffer = LiveRingBuffer(4, field_map=FIELD_MAP)
+    buffer.append(sample(5))
+    buffer.append(sample(1))
+
+    assert buffer.get_columns(["car0_velocity"])["car0_velocity"].tolist() == [2.0]
+    assert not buffer.covers(None)
+
+
+def test_service_reads_older_rows_from_recording(tmp_path):
+    path = tmp_path / "live.csv"
+    with open(path, "w", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=["car0_vehicle_pos", "car0_velocity", "car0_gear", "timestamp"])
+        writer.writeheader()
+        writer.writerows(sample(i) for i in range(10))
+    service = TestDriveDataService(Settings(), storage_path=str(tmp_path / "test_drive_data.json"))
+    service.current_project_info = TestDriveProjectInfo(
+        is_live=True, test_drive_data_info=TestDriveDataInfo(csv_file_full_path=str(path)))
+    service.live_buffer = LiveRingBuffer(4, path, field_map=FIELD_MAP)
+    for i in range(10):
+        service.live_buffer.append(sample(i))
+
+    assert service.get_csv_data(["car0_velocity"])["car0_velocity"].tolist() == [i * 2.0 for i in range(10)]
+    assert service.get_csv_data(["car0_vehicle_pos"], start=0.25, end=0.65)["car0_vehicle_pos"].tolist() == \
+           [[1.0, 2.0, float(i)] for i in range(3, 7)]
+    assert [name for name, _ in service.get_csv_data_columns()][:2] == ["car0_vehicle_pos", "car0_vehicle_pos_x"]
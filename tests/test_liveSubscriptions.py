@@ -0,0 +1,173 @@
+import json
+import math
+
+import pytest
+from fastapi import WebSocketDisconnect
+from fastapi.testclient import TestClient
+
+from app.dependencies import get_connection_manager_data
+from app.main import app
+from app.models.liveDataRow import FIELD_NAME_MAP, create_random_instance
+from app.models.liveSubscription import LiveSubscription
+from app.services.jsonEncoding import encode_json
+from app.services.liveFrameEncoding import LiveFrameSchema
+from app.services.websocketConnectionManager import WebsocketConnectionManager
+
+SCHEMA = LiveFrameSchema([("speed", "f", 1), ("gear", "d", 1), ("pos", "d", 3), ("timestamp", "d", 1)])
+SAMPLE = {"speed": 1.5, "gear": 3, "pos": [1.0, 2.0, 3.0], "timestamp": 0.0}
+
+
+class RecordingWebSocket:
+    """Records the messages sent to a client."""
+
+    def __init__(self):
+        self.messages = []
+
+    async def accept(self):
+        pass
+
+    async def send_json(self, message):
+        self.messages.append(json.dumps(message))
+
+    async def send_text(self, message):
+        self.messages.append(message)
+
+    async def send_bytes(self, message):
+        self.messages.append(message)
+
+
+async def connect(manager, encoding="json", **subscription):
+    client = RecordingWebSocket()
+    await manager.connect(client, encoding)
+    if subscription:
+        await manager.subscribe(client, LiveSubscription(**subscription))
+    client.messages.clear()
+    return client
+
+
+@pytest.mark.anyio
+async def test_frames_are_projected_and_shared():
+    manager = WebsocketConnectionManager("data", SCHEMA)
+    everything = await connect(manager)
+    speedometer = await connect(manager, channels=["speed", "unknown"])
+    other_speedometer = await connect(manager, channels=["speed"])
+
+    await manager.broadcast_frame(SAMPLE)
+
+    assert json.loads(everything.messages[0]) == SAMPLE
+    assert json.loads(speedometer.messages[0]) == {"speed": 1.5, "timestamp": 0.0}
+    # identical subscriptions receive the same encoded frame
+    assert speedometer.messages[0] is other_speedometer.messages[0]
+
+
+@pytest.mark.anyio
+async def test_binary_subscription_gets_its_schema():
+    manager = WebsocketConnectionManager("data", SCHEMA)
+    client = RecordingWebSocket()
+    await manager.connect(client, "binary")
+    await manager.subscribe(client, LiveSubscription(channels=["pos", "gear", "unknown"]))
+
+    confirmation, description = json.loads(client.messages[1]), json.loads(client.messages[2])
+    assert confirmation == {"type": "subscribed", "channels": ["gear", "pos"], "max_rate_hz": None,
+                            "delta": False, "unknown_channels": ["unknown"]}
+    assert [field["name"] for field in description["fields"]] == ["gear", "pos", "timestamp"]
+
+    await manager.broadcast_frame(SAMPLE)
+    schema = manager._get_schema(("gear", "pos"))
+    assert len(client.messages[3]) == schema.frame_size == description["frame_size"]
+    assert schema.decode(client.messages[3]) == {"gear": 3.0, "pos": [1.0, 2.0, 3.0], "timestamp": 0.0}
+
+
+@pytest.mark.anyio
+async def test_rate_is_limited_per_subscription(monkeypatch):
+    manager = WebsocketConnectionManager("data", SCHEMA)
+    slow = await connect(manager, channels=["speed"], max_rate_hz=1)
+    fast = await connect(manager, channels=["speed"])
+    now = [100.0]
+    monkeypatch.setattr("app.services.websocketConnectionManager.time.monotonic", lambda: now[0])
+
+    for i in range(5):
+        await manager.broadcast_frame({"speed": float(i), "timestamp": i * 0.5})
+        now[0] += 0.5
+
+    assert len(fast.messages) == 5
+    assert [json.loads(message)["speed"] for message in slow.messages] == [0.0, 2.0, 4.0]
+
+
+def test_subscription_message():
+    with TestClient(app).websocket_connect("/api/v1/ws/data") as websocket:
+        assert websocket.receive_text() == "ping"
+        websocket.send_text("not a subscription")
+        assert websocket.receive_json()["type"] == "error"
+
+        websocket.send_json({"type": "subscribe", "channels": ["car0_velocity"], "max_rate_hz": 5})
+        assert websocket.receive_json() == {"type": "subscribed", "channels": ["car0_velocity"], "max_rate_hz": 5,
+                                            "delta": False, "unknown_channels": []}
+        subscription = next(iter(get_connection_manager_data().subscriptions.values()))
+        assert subscription == ("json", ("car0_velocity",), 5, False)
+
+
+def test_binary_message_closes_connection():
+    manager = get_connection_manager_data()
+    with TestClient(app).websocket_connect("/api/v1/ws/data") as websocket:
+        assert websocket.receive_text() == "ping"
+        websocket.send_bytes(b"\x00\x01")
+        with pytest.raises(WebSocketDisconnect) as closed:
+            websocket.receive_text()
+
+    assert closed.value.code == 1008
+    assert not manager.active_connections and not manager.subscriptions
+
+
+@pytest.mark.anyio
+async def test_delta_frames_carry_changed_fields(monkeypatch):
+    manager = WebsocketConnectionManager("data", SCHEMA, keyframe_interval=5.0)
+    client = await connect(manager, delta=True)
+    now = [100.0]
+    monkeypatch.setattr("app.services.websocketConnectionManager.time.monotonic", lambda: now[0])
+
+    for i, speed in enumerate([1.5, 1.5, 2.0, 2.0]):
+        await manager.broadcast_frame({**SAMPLE, "speed": speed, "timestamp": i * 1.0})
+        now[0] += 1.0
+
+    frames = [json.loads(message) for message in client.messages]
+    assert frames[0] == {**SAMPLE, "keyframe": True}
+    assert frames[1:] == [{"timestamp": 1.0}, {"speed": 2.0, "timestamp": 2.0}, {"timestamp": 3.0}]
+
+    # a new subscriber and the keyframe interval both start from the full state
+    late = await connect(manager, delta=True)
+    await manager.broadcast_frame({**SAMPLE, "timestamp": 4.0})
+    assert json.loads(late.messages[0])["keyframe"] and late.messages[0] is client.messages[-1]
+    now[0] += 5.0
+    await manager.broadcast_frame({**SAMPLE, "timestamp": 5.0})
+    assert json.loads(client.messages[-1])["keyframe"]
+
+
+@pytest.mark.anyio
+async def test_binary_delta_frames():
+    manager = WebsocketConnectionManager("data", SCHEMA)
+    client = await connect(manager, "binary", delta=True)
+
+    await manager.broadcast_frame(SAMPLE)
+    await manager.broadcast_frame({**SAMPLE, "pos": [1.0, 2.0, float("nan")], "timestamp": 0.1})
+    await manager.broadcast_frame({**SAMPLE, "pos": [1.0, 2.0, float("nan")], "timestamp": 0.2})
+
+    keyframe, first_delta, second_delta = client.messages
+    assert len(keyframe) == SCHEMA.frame_size
+    assert SCHEMA.decode(keyframe)["gear"] == 3.0
+    decoded = SCHEMA.decode(first_delta)
+    assert decoded.keys() == {"pos", "timestamp"} and math.isnan(decoded["pos"][2])
+    # NaN is not a change
+    assert SCHEMA.decode(second_delta) == {"timestamp": 0.2}
+    assert len(second_delta) == 4 + 1 + 8
+
+
+def test_delta_saves_bandwidth():
+    schema = LiveFrameSchema.from_field_map()
+    sample = create_random_instance(FIELD_NAME_MAP, None)
+    # only the motion of the car changes between two samples, settings and states stay the same
+    changed = {name: sample[name] for name in ["car0_velocity", "car0_engine_rpm", "car0_vehicle_pos"]}
+    changed["timestamp"] = 0.5
+
+    assert len(encode_json(changed)) * 10 < len(encode_json(sample))
+    assert len(schema.encode_delta(changed)) * 10 < schema.frame_size
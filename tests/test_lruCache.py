@@ -0,0 +1,56 @@
+from app.services.lruCache import LruCache
+
+
+class StringCache(LruCache[str]):
+    def __init__(self, max_bytes, max_entries=None):
+        super().__init__("string cache", max_bytes, max_entries)
+        self.removed = []
+
+    def _size_of(self, value):
+        return len(value)
+
+    def _on_removed(self, key, value):
+        self.removed.append(key)
+
+
+def test_evicts_least_recently_used_entries():
+    cache = StringCache(max_bytes=10)
+    cache.put("a", "aaaa")
+    cache.put("b", "bbbb")
+    assert cache.get("a") == "aaaa"
+
+    cache.put("c", "cccc")
+
+    assert "b" not in cache and "a" in cache and "c" in cache
+    assert cache.current_bytes == 8
+    assert cache.removed == ["b"]
+    statistics = cache.get_statistics()
+    assert (statistics.hits, statistics.misses, statistics.evictions) == (1, 0, 1)
+
+
+def test_keeps_the_entry_just_added():
+    cache = StringCache(max_bytes=10, max_entries=2)
+    cache.put("a", "a")
+    cache.put("b", "b")
+    cache.put("c", "c")
+    assert len(cache) == 2 and "a" not in cache
+
+    cache.put("large", "x" * 20)
+
+    assert len(cache) == 1 and cache.get("large") is not None
+    assert cache.size_of("large") == 20
+
+
+def test_replacing_and_discarding_update_the_size():
+    cache = StringCache(max_bytes=10)
+    cache.put("a", "aaaa")
+    cache.put("a", "aa")
+    assert cache.current_bytes == 2
+
+    cache.discard("a")
+    assert cache.current_bytes == 0 and cache.get("a") is None
+    assert cache.removed == []
+
+    cache.put("b", "b")
+    cache.clear()
+    assert len(cache) == 0 and cache.removed == ["b"]
@@ -0,0 +1,41 @@
+from app.services.recordingCache import get_cache_path, is_cache_valid, load_recording, read_cache, \
+    read_recording_csv
+
+
+def test_load_recording_writes_cache(recording):
+    assert not is_cache_valid(recording)
+
+    df = load_recording(recording)
+
+    assert get_cache_path(recording).exists()
+    assert is_cache_valid(recording)
+    assert len(df) == 99
+
+
+def test_read_cache_matches_csv(recording):
+    load_recording(recording)
+
+    expected = read_recording_csv(recording)
+    cached = read_cache(recording)
+
+    assert list(cached.columns) == list(expected.columns)
+    assert cached.equals(expected)
+
+
+def test_read_cache_selects_columns(recording):
+    load_recording(recording)
+
+    cached = read_cache(recording, columns=["timestamp", "car0_velocity"])
+
+    assert list(cached.columns) == ["timestamp", "car0_velocity"]
+
+
+def test_cache_invalidated_on_change(recording):
+    load_recording(recording)
+    assert is_cache_valid(recording)
+
+    with open(recording, "a") as f:
+        f.write("\n")
+
+    assert not is_cache_valid(recording)
+    assert read_cache(recording) is None
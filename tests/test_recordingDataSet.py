@@ -0,0 +1,83 @@
+import pandas as pd
+import pytest
+
+from app.services.columnCache import ColumnCache
+from app.services.recordingCache import ensure_cache, read_recording_csv
+from app.services.recordingDataSet import RecordingDataSet
+
+
+@pytest.mark.parametrize("with_sidecar", [False, True])
+def test_columns_loaded_on_request(recording, with_sidecar):
+    if with_sidecar:
+        ensure_cache(recording)
+    cache = ColumnCache(max_bytes=1024 * 1024)
+    dataset = RecordingDataSet(recording, cache)
+
+    assert "car0_velocity" in dataset.columns
+    assert "car0_vehicle_pos_x" in dataset.columns
+    assert len(cache) == 0
+
+    df = dataset.get_columns(["car0_velocity", "timestamp"])
+
+    expected = read_recording_csv(recording)
+    pd.testing.assert_series_equal(df["car0_velocity"], expected["car0_velocity"])
+    assert (dataset.fingerprint, "car0_velocity") in cache
+    assert (dataset.fingerprint, "car0_engine_rpm") not in cache
+
+
+def test_select_combines_vector_columns(recording):
+    dataset = RecordingDataSet(recording, ColumnCache(max_bytes=1024 * 1024), use_cache=False)
+
+    df = dataset.select(["car0_vehicle_pos", "timestamp"])
+
+    assert list(df.columns) == ["car0_vehicle_pos", "timestamp"]
+    assert df["car0_vehicle_pos"].iloc[0] == [-1721.7, -1569.27, -1.97821]
+
+
+def test_column_cache_evicts_least_recently_used():
+    cache = ColumnCache(max_bytes=2 * 800)
+    for key in ["a", "b"]:
+        cache.put(key, pd.Series(range(100), dtype="int64"))
+
+    cache.get("a")
+    cache.put("c", pd.Series(range(100), dtype="int64"))
+
+    assert "a" in cache
+    assert "b" not in cache
+    assert "c" in cache
+    assert cache.evictions == 1
+    assert cache.current_bytes == 1600
+
+
+def test_select_time_range(recording):
+    dataset = RecordingDataSet(recording, ColumnCache(max_bytes=1024 * 1024), use_cache=False)
+    timestamps = read_recording_csv(recording)["timestamp"]
+    start, end = timestamps.iloc[10], timestamps.iloc[20]
+
+    df = dataset.select(["car0_velocity", "timestamp"], start, end)
+
+    assert len(df) == 11
+    assert df["timestamp"].iloc[0] == start
+    assert df["timestamp"].iloc[-1] == end
+
+
+def test_sample_combines_vector_columns(recording):
+    dataset = RecordingDataSet(recording, ColumnCache(max_bytes=10 * 1024 * 1024))
+
+    sampled = dataset.sample(["timestamp", "car0_vehicle_vel"], [519.0, 519.5])
+
+    assert len(sampled) == 2
+    assert sampled["timestamp"].tolist() == pytest.approx([519.002, 519.5], abs=0.01)
+    assert len(sampled["car0_vehicle_vel"].iloc[0]) == 3
+
+
+@pytest.mark.parametrize("combine_vectors", [True, False])
+def test_iter_select_in_chunks(recording, combine_vectors):
+    dataset = RecordingDataSet(recording, ColumnCache(max_bytes=1024 * 1024))
+    columns = ["car0_velocity", "car0_vehicle_vel", "timestamp"]
+    start, end = 518.87, 519.2
+
+    chunks = list(dataset.iter_select(columns, start, end, chunk_rows=4, combine_vectors=combine_vectors))
+
+    assert all(len(chunk) <= 4 for chunk in chunks)
+    pd.testing.assert_frame_equal(pd.concat(chunks), dataset.select(columns, start, end, combine_vectors))
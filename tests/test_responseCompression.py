@@ -0,0 +1,62 @@
+import gzip
+
+import pyarrow as pa
+import pytest
+
+from app.services.responseCompression import IDENTITY, ResponseCache, choose_encoding, compress, \
+    iter_compressed, parse_accept_encoding
+
+
+def test_parse_accept_encoding():
+    assert parse_accept_encoding("gzip, deflate;q=0.5, br;q=0") == ["gzip", "deflate"]
+    assert parse_accept_encoding(None) == []
+
+
+def test_choose_encoding():
+    assert choose_encoding("gzip, deflate, br, zstd") == "zstd"
+    assert choose_encoding("gzip, br") == "br"
+    assert choose_encoding("gzip;q=1.0") == "gzip"
+    assert choose_encoding("zstd;q=0, gzip") == "gzip"
+    assert choose_encoding("deflate") == IDENTITY
+    assert choose_encoding("") == IDENTITY
+
+
+def test_compress():
+    body = b'{"data": [1, 2, 3]}' * 100
+
+    compressed, encoding = compress(body, "gzip")
+
+    assert encoding == "gzip"
+    assert gzip.decompress(compressed) == body
+    assert compress(b"{}", "gzip") == (b"{}", IDENTITY)
+
+
+@pytest.mark.parametrize("encoding", ["gzip", "zstd", "br"])
+def test_iter_compressed_sends_every_chunk(encoding):
+    chunks = [b"batch %d " % i * 100 for i in range(3)]
+
+    compressed = list(iter_compressed(iter(chunks), encoding))
+
+    # one part per chunk and the end of the stream, each chunk is complete without the following ones
+    assert len(compressed) == 4
+    codec = {"gzip": "gzip", "zstd": "zstd", "br": "brotli"}[encoding]
+    first = pa.input_stream(pa.py_buffer(compressed[0]), compression=codec).read(len(chunks[0]))
+    assert first == chunks[0]
+    assert pa.input_stream(pa.py_buffer(b"".join(compressed)), compression=codec).read() == b"".join(chunks)
+    assert list(iter_compressed(chunks, IDENTITY)) == chunks
+
+
+def test_response_cache_evicts_least_recently_used():
+    cache = ResponseCache(max_bytes=10)
+
+    cache.put("a", b"12345", "gzip")
+    cache.put("b", b"12345", "gzip")
+    cache.get("a")
+    cache.put("c", b"12345", "gzip")
+    cache.put("too large", b"12345678901", "gzip")
+
+    assert cache.get("a") == (b"12345", "gzip")
+    assert cache.get("b") is None
+    assert cache.get("too large") is None
+    assert cache.current_bytes == 10
+    assert cache.evictions == 1
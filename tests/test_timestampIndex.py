@@ -0,0 +1,40 @@
+import numpy as np
+import pandas as pd
+
+from app.services.timestampIndex import TimestampIndex
+
+
+def test_rows_of_sorted_timestamps():
+    index = TimestampIndex(np.array([0.0, 0.1, 0.2, 0.3, 0.4]))
+
+    assert index.rows(0.1, 0.3) == slice(1, 4)
+    assert index.rows(None, 0.15) == slice(0, 2)
+    assert index.rows(0.25, None) == slice(3, 5)
+    assert index.rows(1.0, 2.0) == slice(5, 5)
+    assert index.rows(0.3, 0.1) == slice(3, 3)
+
+
+def test_rows_of_unsorted_timestamps():
+    index = TimestampIndex(np.array([0.2, 0.0, 0.1, 0.3]))
+
+    assert index.rows(0.05, 0.25).tolist() == [2, 0]
+
+
+def test_sample_nearest():
+    index = TimestampIndex(np.array([0.2, 0.0, 0.1, 0.3]))
+    df = pd.DataFrame({"timestamp": [0.2, 0.0, 0.1, 0.3], "name": ["c", "a", "b", "d"]})
+
+    sampled = index.sample(df, np.array([0.04, 0.06, 0.29, 5.0, -1.0]))
+
+    assert sampled["name"].tolist() == ["a", "b", "d", "d", "a"]
+
+
+def test_sample_linear():
+    index = TimestampIndex(np.array([0.0, 1.0, 2.0]))
+    df = pd.DataFrame({"timestamp": [0.0, 1.0, 2.0], "speed": [10, 20, 40], "name": ["a", "b", "c"]})
+
+    sampled = index.sample(df, np.array([0.25, 1.5, 3.0]), method="linear")
+
+    assert sampled["timestamp"].tolist() == [0.25, 1.5, 2.0]
+    assert sampled["speed"].tolist() == [12.5, 30.0, 40.0]
+    assert sampled["name"].tolist() == ["a", "c", "c"]
@@ -0,0 +1,60 @@
+import numpy as np
+import pandas as pd
+
+from app.services.vectorColumns import VECTOR_FIELD_LAYOUTS, expand_vector_columns, find_vector_columns, \
+    parse_vector_column, select_columns
+
+
+def test_field_layouts_from_field_name_map():
+    assert VECTOR_FIELD_LAYOUTS["car0_vehicle_pos"].size == 3
+    assert VECTOR_FIELD_LAYOUTS["car0_vehicle_pos"].dtype == np.float64
+    assert VECTOR_FIELD_LAYOUTS["car0_vehicle_quat"].size == 4
+    assert "car0_velocity" not in VECTOR_FIELD_LAYOUTS
+
+
+def test_parse_vector_column():
+    values = pd.Series(["0,-0,0.000250629", "[1.5, 2, 3]", None, "1,2", "1,2,x", "1,,3", "-1e-05,+.5,nan"])
+
+    parsed = parse_vector_column(values, VECTOR_FIELD_LAYOUTS["car0_vehicle_pos"])
+
+    assert parsed.shape == (7, 3)
+    np.testing.assert_allclose(parsed[0], [0.0, 0.0, 0.000250629])
+    np.testing.assert_allclose(parsed[1], [1.5, 2.0, 3.0])
+    assert np.isnan(parsed[2:6]).all()
+    np.testing.assert_allclose(parsed[6], [-1e-05, 0.5, np.nan])
+
+
+def test_parse_vector_column_of_malformed_cells_only():
+    parsed = parse_vector_column(pd.Series(["1,2,x", "1,,3"]), VECTOR_FIELD_LAYOUTS["car0_vehicle_pos"])
+
+    assert np.isnan(parsed).all()
+
+
+def test_expand_vector_columns():
+    df = pd.DataFrame({
+        "car0_vehicle_quat": ["1,0,0,0", "0.5,0.5,0.5,0.5"],
+        "rrp_pos": ["1,2,3", "4,5,6"],
+        "car0_velocity": [1.0, 2.0],
+    })
+
+    expanded = expand_vector_columns(df)
+
+    assert list(expanded.columns) == ["car0_vehicle_quat_w", "car0_vehicle_quat_x", "car0_vehicle_quat_y",
+                                      "car0_vehicle_quat_z", "rrp_pos_x", "rrp_pos_y", "rrp_pos_z", "car0_velocity"]
+    assert expanded["car0_vehicle_quat_w"].dtype == np.float64
+    assert expanded["car0_vehicle_quat_w"].tolist() == [1.0, 0.5]
+    assert expanded["rrp_pos_z"].tolist() == [3.0, 6.0]
+    assert find_vector_columns(list(expanded.columns)) == {
+        "car0_vehicle_quat": ["car0_vehicle_quat_w", "car0_vehicle_quat_x", "car0_vehicle_quat_y",
+                              "car0_vehicle_quat_z"],
+        "rrp_pos": ["rrp_pos_x", "rrp_pos_y", "rrp_pos_z"],
+    }
+
+
+def test_select_columns_combines_vectors():
+    df = expand_vector_columns(pd.DataFrame({"rrp_pos": ["1,2,3", "4,5,6"], "timestamp": [0.0, 0.1]}))
+
+    selected = select_columns(df, ["rrp_pos", "rrp_pos_y", "unknown", "timestamp"])
+
+    assert list(selected.columns) == ["rrp_pos", "rrp_pos_y", "timestamp"]
+    assert selected["rrp_pos"].tolist() == [[1.0, 2.0, 3.0], [4.0, 5.0, 6.0]]